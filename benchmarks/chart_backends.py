@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Comparaison des moteurs de graphiques : matplotlib (PNG) contre ReportLab (vectoriel)
+Mesure le temps de rendu et la taille du fichier par fiche pour chaque moteur
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "nutrition_generator"))
+
+from core.calculations import NutritionCalculator
+from core.chart_cache import ChartCache
+from core.data_models import ClientData, NutritionParams
+from core.pdf_generator import PremiumPDFGenerator
+from core.section_cache import SectionCache
+
+BACKENDS = ("matplotlib", "vector")
+VARIANTES = {
+    "sublime": "generate_sublime_pdf",
+    "enriched": "generate_enriched_pdf",
+}
+
+
+def sample_clients(count: int):
+    """Clients de test déterministes (poids et objectifs variés)"""
+    for i in range(count):
+        client = ClientData(
+            nom=f"Client{i}", prenom="Test", age=25 + i % 40,
+            taille_cm=160 + i % 30, poids_kg=55.0 + (i * 3.7) % 50,
+            sexe="male" if i % 2 else "female"
+        )
+        params = NutritionParams(
+            formule_metabolisme="mifflin_st_jeor", facteur_activite=1.55,
+            deficit_surplus_kcal=(-500, 0, 300)[i % 3],
+            proteines_g_par_kg=1.8, lipides_g_par_kg=1.0
+        )
+        yield client, params
+
+
+def run(sheets: int):
+    calculator = NutritionCalculator()
+    report = []
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for backend in BACKENDS:
+            generator = PremiumPDFGenerator()
+            generator.chart_backend = backend
+            # Caches désactivés : on mesure le coût réel du rendu des graphiques
+            generator.chart_cache = ChartCache(enabled=False)
+            generator.section_cache = SectionCache(enabled=False)
+
+            for variante, method_name in VARIANTES.items():
+                durations, sizes = [], []
+                for i, (client, params) in enumerate(sample_clients(sheets)):
+                    results = calculator.calculate_complete_nutrition(client, params)
+                    path = os.path.join(output_dir, f"{backend}_{variante}_{i}.pdf")
+                    start = time.perf_counter()
+                    getattr(generator, method_name)(client, results, params.to_dict(), path)
+                    durations.append(time.perf_counter() - start)
+                    sizes.append(os.path.getsize(path))
+
+                report.append({
+                    "backend": backend,
+                    "variante": variante,
+                    "fiches": sheets,
+                    "temps_moyen_s": round(statistics.mean(durations), 4),
+                    "temps_median_s": round(statistics.median(durations), 4),
+                    "taille_moyenne_octets": int(statistics.mean(sizes)),
+                })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sheets", type=int, default=5, help="Fiches par combinaison")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    report = run(args.sheets)
+
+    print(f"{'Moteur':<12}{'Variante':<10}{'Temps moyen':>14}{'Taille moyenne':>16}")
+    for row in report:
+        print(f"{row['backend']:<12}{row['variante']:<10}"
+              f"{row['temps_moyen_s'] * 1000:>11.0f} ms"
+              f"{row['taille_moyenne_octets'] / 1024:>13.0f} Ko")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handler:
+            json.dump(report, handler, indent=2)
+
+
+if __name__ == "__main__":
+    main()
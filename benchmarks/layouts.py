@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Coût de construction d'une story par fiche : mise en page décidée à chaque fiche
+(compilation de layouts.json puis construction) contre plan compilé réutilisé
+Seule la story est mesurée (pas la mise en page ReportLab ni l'écriture du PDF)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "nutrition_generator"))
+
+from core.calculations import NutritionCalculator
+from core.layouts import compile_layout
+from core.pdf_generator import PremiumPDFGenerator
+
+from chart_backends import sample_clients
+
+
+def run(sheets: int, repeat: int):
+    generator = PremiumPDFGenerator()
+    calculator = NutritionCalculator()
+    samples = []
+    for client, params in sample_clients(sheets):
+        samples.append((client, calculator.calculate_complete_nutrition(client, params), params.to_dict()))
+    variables = {"weeks": generator.projection_weeks}
+    report = []
+
+    for variante, layout in generator.layouts.items():
+        plan = generator._render_plan(variante)
+        # Premier passage hors mesure : graphiques mis en cache pour les deux modes
+        for client, results, params_dict in samples:
+            plan.build({"client": client, "results": results, "params": params_dict, "conseils": None})
+
+        modes = {
+            "par_fiche": lambda: compile_layout(variante, layout, generator, variables),
+            "plan": lambda: plan,
+        }
+        row = {"variante": variante, "fiches": sheets * repeat, "sections": plan.sections}
+        for mode, get_plan in modes.items():
+            durations = []
+            for _ in range(repeat):
+                for client, results, params_dict in samples:
+                    start = time.perf_counter()
+                    get_plan().build({"client": client, "results": results, "params": params_dict, "conseils": None})
+                    durations.append(time.perf_counter() - start)
+            row[f"{mode}_ms"] = round(statistics.median(durations) * 1000, 3)
+        report.append(row)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sheets", type=int, default=6, help="Clients différents par variante")
+    parser.add_argument("--repeat", type=int, default=50, help="Passages sur ces clients")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    report = run(args.sheets, args.repeat)
+
+    print(f"{'Variante':<10}{'Sections':>10}{'Par fiche':>14}{'Plan':>12}{'Gain':>10}")
+    for row in report:
+        print(f"{row['variante']:<10}{row['sections']:>10}"
+              f"{row['par_fiche_ms']:>11.2f} ms{row['plan_ms']:>9.2f} ms"
+              f"{row['par_fiche_ms'] - row['plan_ms']:>7.2f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handler:
+            json.dump(report, handler, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Re-rendu d'une fiche après un changement du seul ratio de protéines
+Fiche complète (story, mise en page, PDF en mémoire), cache des sections désactivé
+contre activé ; indique les sections reconstruites au dernier passage.
+Les graphiques sont rendus une fois avant la mesure (cache des graphiques) :
+seul le coût des sections et de la mise en page est comparé.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "nutrition_generator"))
+
+from core.calculations import CalculationCache, NutritionCalculator
+from core.data_models import ClientData, NutritionParams
+from core.pdf_generator import PremiumPDFGenerator
+from core.section_cache import SectionCache
+
+# Premier ratio de protéines (g/kg) et pas entre deux re-rendus
+RATIO_INITIAL = 1.6
+PAS_RATIO = 0.05
+
+
+def run(renders: int):
+    calculator = NutritionCalculator(CalculationCache(enabled=False))
+    client = ClientData(nom="Dupont", prenom="Jean", age=35, taille_cm=180, poids_kg=90.0)
+    ratios = [round(RATIO_INITIAL + PAS_RATIO * i, 2) for i in range(renders + 1)]
+    samples = []
+    for ratio in ratios:
+        params = NutritionParams("mifflin_st_jeor", 1.55, -500, ratio, 1.0)
+        samples.append((params.to_dict(), calculator.calculate_complete_nutrition(client, params)))
+    report = []
+
+    for variante in ("clean", "sublime", "enriched"):
+        row = {"variante": variante, "rendus": renders}
+        for enabled in (False, True):
+            generator = PremiumPDFGenerator()
+            generator.section_cache = SectionCache(enabled=enabled)
+            if not enabled:
+                # Hors mesure : graphiques de tous les ratios dans le cache des graphiques
+                for params_dict, results in samples:
+                    generator.render_to_bytes(client, results, params_dict, variante=variante)
+            durations = []
+            for i, (params_dict, results) in enumerate(samples):
+                # Ratio inédit à chaque passage : seules les sections qui en dépendent changent
+                start = time.perf_counter()
+                generator.render_to_bytes(client, results, params_dict, variante=variante)
+                if i:  # Le premier rendu remplit le cache des sections
+                    durations.append(time.perf_counter() - start)
+            mode = "cache" if enabled else "sans_cache"
+            row[f"{mode}_ms"] = round(statistics.median(durations) * 1000, 1)
+            if enabled:
+                sections = generator.last_section_report
+                row["recalculees"] = sections.recomputed
+                row["reprises"] = len(sections.reused)
+        report.append(row)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=20, help="Re-rendus mesurés par variante")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    report = run(args.renders)
+
+    print(f"{'Variante':<10}{'Sans cache':>13}{'Cache':>11}{'Reprises':>10}  Recalculées")
+    for row in report:
+        print(f"{row['variante']:<10}{row['sans_cache_ms']:>10.1f} ms{row['cache_ms']:>8.1f} ms"
+              f"{row['reprises']:>10}  {', '.join(row['recalculees'])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handler:
+            json.dump(report, handler, indent=2)
+
+
+if __name__ == "__main__":
+    main()
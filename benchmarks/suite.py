@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks : calculs, graphiques et génération PDF complète
+Effectifs synthétiques fixes (100 / 10k / 1M clients), mesures déterministes et hors ligne
+
+Chaque cas s'exécute dans un processus neuf pour que le pic de mémoire (RSS)
+lui soit propre. Les octets sont ceux produits (PNG, PDF) ou, pour les cas
+memoire.*, la mémoire retenue par l'effectif complet (clients, paramètres et
+résultats) selon sa représentation. Les rapports peuvent être enregistrés comme référence puis
+comparés : une régression au-delà du seuil fait échouer la commande.
+
+    python benchmarks/suite.py --roster small --save-baseline
+    python benchmarks/suite.py --roster small --check
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "nutrition_generator"))
+
+try:
+    import resource
+except ImportError:  # Windows : pic mémoire non mesuré
+    resource = None
+
+# Effectifs synthétiques
+ROSTERS = {
+    "small": 100,
+    "medium": 10_000,
+    "large": 1_000_000,
+}
+SEED = 20240917
+
+# Les graphiques et PDF ne dépendent pas de la taille de l'effectif :
+# ils sont mesurés sur les premiers clients seulement
+CHART_SAMPLES = 5
+PDF_SAMPLES = 3
+
+CHARTS = {
+    "pie_flat": "_create_flat_pie_chart",
+    "pie_controlled": "create_controlled_pie_chart",
+    "weight_grid": "_create_weight_chart_with_grid",
+}
+CHART_BACKENDS = ("matplotlib", "vector")
+PDF_VARIANTES = {
+    "clean": "generate_clean_layout_pdf",
+    "sublime": "generate_sublime_pdf",
+    "enriched": "generate_enriched_pdf",
+}
+
+# Représentations comparées par les cas memoire.*
+MEMORY_LAYOUTS = ("dataclasses", "enregistrements", "colonnes")
+
+BASELINE_DIR = os.path.join(ROOT, "benchmarks", "baselines")
+DEFAULT_THRESHOLD = 0.25  # +25 %
+# En dessous, la variation de temps est du bruit de mesure
+MIN_SIGNIFICANT_S = 0.01
+COMPARED_METRICS = ("wall_s", "cpu_s", "peak_rss_kb", "output_bytes")
+DEFAULT_REPEAT = 3  # Meilleur temps sur plusieurs passes, moins sensible au bruit
+
+
+# ----------------------------------------------------------------------
+# Effectif synthétique
+# ----------------------------------------------------------------------
+def roster_columns(size: int, seed: int = SEED) -> Dict[str, Any]:
+    """
+    Colonnes d'un effectif synthétique reproductible
+
+    Args:
+        size: Nombre de clients
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        Tableaux NumPy indexés par champ de ClientData / NutritionParams
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    return {
+        "age": rng.integers(18, 76, size),
+        "taille_cm": rng.integers(150, 201, size),
+        "poids_kg": np.round(rng.uniform(45.0, 130.0, size), 1),
+        "sexe": np.where(rng.random(size) < 0.5, "male", "female"),
+        "facteur_activite": rng.choice([1.2, 1.375, 1.55, 1.725, 1.9], size),
+        "deficit_surplus_kcal": rng.choice([-500, -300, 0, 250, 400], size),
+        "proteines_g_par_kg": rng.choice([1.6, 1.8, 2.0, 2.2], size),
+        "lipides_g_par_kg": rng.choice([0.8, 1.0, 1.2], size),
+    }
+
+
+def iter_clients(columns: Dict[str, Any], limit: Optional[int] = None):
+    """Parcourt l'effectif sous forme de (ClientData, NutritionParams) sans tout matérialiser"""
+    from core.data_models import ClientData, NutritionParams
+
+    size = len(columns["age"]) if limit is None else min(limit, len(columns["age"]))
+    for i in range(size):
+        client = ClientData(
+            nom=f"Client{i}", prenom="Bench", age=int(columns["age"][i]),
+            taille_cm=int(columns["taille_cm"][i]), poids_kg=float(columns["poids_kg"][i]),
+            sexe=str(columns["sexe"][i])
+        )
+        params = NutritionParams(
+            formule_metabolisme="mifflin_st_jeor",
+            facteur_activite=float(columns["facteur_activite"][i]),
+            deficit_surplus_kcal=int(columns["deficit_surplus_kcal"][i]),
+            proteines_g_par_kg=float(columns["proteines_g_par_kg"][i]),
+            lipides_g_par_kg=float(columns["lipides_g_par_kg"][i])
+        )
+        yield client, params
+
+
+# ----------------------------------------------------------------------
+# Cas mesurés (chacun retourne (nombre d'opérations, octets produits))
+# ----------------------------------------------------------------------
+def _generator(backend: Optional[str] = None):
+    from core.chart_cache import ChartCache
+    from core.pdf_generator import PremiumPDFGenerator
+    from core.section_cache import SectionCache
+
+    generator = PremiumPDFGenerator()
+    if backend:
+        generator.chart_backend = backend  # Sinon celui de settings.json
+    # Caches désactivés : on mesure le coût réel du rendu
+    generator.chart_cache = ChartCache(enabled=False)
+    generator.section_cache = SectionCache(enabled=False)
+    return generator
+
+
+def bench_calcul(columns: Dict[str, Any]) -> Tuple[int, int]:
+    """calculate_complete_nutrition client par client"""
+    from core.calculations import CalculationCache, NutritionCalculator
+
+    # Cache désactivé : on mesure le coût réel du calcul
+    calculator = NutritionCalculator(CalculationCache(enabled=False))
+    count = 0
+    for client, params in iter_clients(columns):
+        calculator.calculate_complete_nutrition(client, params)
+        count += 1
+    return count, 0
+
+
+def bench_calcul_batch(columns: Dict[str, Any]) -> Tuple[int, int]:
+    """Calcul vectorisé de tout l'effectif (référence)"""
+    from core.batch_calculations import BatchNutritionCalculator
+
+    results = BatchNutritionCalculator().calculate_batch(**columns)
+    return len(results), 0
+
+
+def bench_simulation(columns: Dict[str, Any]) -> Tuple[int, int]:
+    """Projection du poids de tout l'effectif sur 52 semaines"""
+    from core.weight_simulation import WeightSimulator
+
+    projection = WeightSimulator(adaptation=0.1).simulate(
+        poids_kg=columns["poids_kg"], taille_cm=columns["taille_cm"], age=columns["age"],
+        sexe=columns["sexe"], facteur_activite=columns["facteur_activite"],
+        deficit_surplus_kcal=columns["deficit_surplus_kcal"], semaines=52
+    )
+    return projection.poids.size, 0
+
+
+def _bench_chart(columns: Dict[str, Any], chart: str, backend: str) -> Tuple[int, int]:
+    from core.calculations import NutritionCalculator
+
+    generator = _generator(backend)
+    calculator = NutritionCalculator()
+    builder = getattr(generator, CHARTS[chart])
+    rasterized: List[int] = []
+
+    # Taille des PNG rastérisés (le cache désactivé rend à chaque appel)
+    get_or_render = generator.chart_cache.get_or_render
+
+    def measured(kind, inputs, render):
+        png_data = get_or_render(kind, inputs, render)
+        rasterized.append(len(png_data))
+        return png_data
+
+    generator.chart_cache.get_or_render = measured
+
+    count = 0
+    for client, params in iter_clients(columns, CHART_SAMPLES):
+        if chart == "weight_grid":
+            builder(client, params.to_dict())
+        else:
+            builder(calculator.calculate_complete_nutrition(client, params))
+        count += 1
+    return count, sum(rasterized)
+
+
+def _bench_pdf(columns: Dict[str, Any], variante: str) -> Tuple[int, int]:
+    from core.calculations import NutritionCalculator
+
+    generator = _generator()
+    calculator = NutritionCalculator()
+    method = getattr(generator, PDF_VARIANTES[variante])
+    count = output_bytes = 0
+    with tempfile.TemporaryDirectory() as output_dir:
+        for i, (client, params) in enumerate(iter_clients(columns, PDF_SAMPLES)):
+            results = calculator.calculate_complete_nutrition(client, params)
+            path = os.path.join(output_dir, f"{variante}_{i}.pdf")
+            method(client, results, params.to_dict(), path)
+            count += 1
+            output_bytes += os.path.getsize(path)
+    return count, output_bytes
+
+
+def _bench_memory(columns: Dict[str, Any], layout: str) -> Tuple[int, int]:
+    """Mémoire retenue par l'effectif complet (clients, paramètres, résultats)"""
+    from core.batch_calculations import BatchNutritionCalculator
+    from core.columnar import ClientColumns, ClientRecord, ParamsRecord, ResultsRecord
+
+    tracemalloc.start()
+    if layout == "colonnes":
+        store = ClientColumns.from_rows(iter_clients(columns))
+        store.calculate()
+    else:
+        results = BatchNutritionCalculator().calculate_batch(**columns)
+        store = []
+        for index, (client, params) in enumerate(iter_clients(columns)):
+            row = results.row(index)
+            if layout == "enregistrements":
+                client = ClientRecord.from_dataclass(client)
+                params = ParamsRecord.from_dataclass(params)
+                row = ResultsRecord.from_dataclass(row)
+            store.append((client, params, row))
+        del results
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(store), retained
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    """Cas mesuré et préparation qu'il demande"""
+    run: Callable[[Dict[str, Any]], Tuple[int, int]]
+    # matplotlib, ReportLab et contexte de rendu chargés hors mesure ; les autres
+    # cas ne les importent pas, leur pic de mémoire reste le leur
+    needs_pdf: bool = False
+
+
+def build_cases() -> Dict[str, BenchCase]:
+    """Tous les cas de la suite, par nom"""
+    cases = {
+        "calcul": BenchCase(bench_calcul),
+        "calcul_batch": BenchCase(bench_calcul_batch),
+        "simulation": BenchCase(bench_simulation),
+    }
+    for chart in CHARTS:
+        for backend in CHART_BACKENDS:
+            cases[f"chart.{chart}.{backend}"] = BenchCase(
+                lambda columns, chart=chart, backend=backend: _bench_chart(columns, chart, backend),
+                needs_pdf=True
+            )
+    for variante in PDF_VARIANTES:
+        cases[f"pdf.{variante}"] = BenchCase(
+            lambda columns, variante=variante: _bench_pdf(columns, variante), needs_pdf=True
+        )
+    for layout in MEMORY_LAYOUTS:
+        cases[f"memoire.{layout}"] = BenchCase(
+            lambda columns, layout=layout: _bench_memory(columns, layout)
+        )
+    return cases
+
+
+def _peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_case(name: str, roster: str, repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """
+    Exécute un cas dans le processus courant (meilleur temps sur `repeat` passes)
+
+    Args:
+        name: Nom du cas (voir build_cases)
+        roster: Taille d'effectif (clé de ROSTERS)
+        repeat: Nombre de passes
+
+    Returns:
+        Mesures du cas
+    """
+    case = build_cases()[name]
+    if case.needs_pdf:
+        import matplotlib
+        matplotlib.use("Agg")
+        from reportlab import rl_config
+        rl_config.invariant = 1  # PDF reproductibles (pas de date ni d'identifiant aléatoire)
+        # Préparation (imports, contexte de rendu) hors mesure
+        _generator()
+    else:
+        # Imports des calculs (numpy) hors mesure
+        import core.batch_calculations
+        import core.calculations
+        import core.columnar
+        import core.weight_simulation
+
+    columns = roster_columns(ROSTERS[roster])
+    wall_s = cpu_s = float("inf")
+    for _ in range(max(1, repeat)):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        operations, output_bytes = case.run(columns)
+        wall_s = min(wall_s, time.perf_counter() - wall_start)
+        cpu_s = min(cpu_s, time.process_time() - cpu_start)
+
+    return {
+        "case": name,
+        "operations": operations,
+        "wall_s": round(wall_s, 4),
+        "cpu_s": round(cpu_s, 4),
+        "per_op_ms": round(wall_s / operations * 1000, 4) if operations else 0.0,
+        "peak_rss_kb": _peak_rss_kb(),
+        "output_bytes": output_bytes,
+    }
+
+
+def run_isolated(name: str, roster: str, repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """Exécute un cas dans un processus neuf et retourne ses mesures"""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--roster", roster,
+         "--repeat", str(repeat), "--run-case", name],
+        capture_output=True, text=True, check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Échec du cas {name}:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_suite(roster: str, selected: Optional[List[str]] = None,
+              repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """
+    Exécute la suite complète (ou les cas sélectionnés)
+
+    Args:
+        roster: Taille d'effectif
+        selected: Préfixes de cas à exécuter (None pour tous)
+        repeat: Passes par cas (le meilleur temps est retenu)
+
+    Returns:
+        Rapport JSON
+    """
+    names = [
+        name for name in build_cases()
+        if not selected or any(name.startswith(prefix) for prefix in selected)
+    ]
+    cases = {}
+    for name in names:
+        cases[name] = run_isolated(name, roster, repeat)
+        print(f"  {name:<32}{cases[name]['wall_s']:>10.3f} s", file=sys.stderr)
+
+    return {
+        "roster": roster,
+        "clients": ROSTERS[roster],
+        "seed": SEED,
+        "repeat": repeat,
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "cases": cases,
+    }
+
+
+# ----------------------------------------------------------------------
+# Références
+# ----------------------------------------------------------------------
+def baseline_path(roster: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{roster}.json")
+
+
+def compare_reports(report: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Compare un rapport à sa référence
+
+    Args:
+        report: Rapport courant
+        baseline: Rapport de référence
+        threshold: Hausse relative tolérée (0.25 = +25 %)
+
+    Returns:
+        Description des régressions (vide si aucune)
+    """
+    regressions = []
+    for name, current in report["cases"].items():
+        reference = baseline["cases"].get(name)
+        if reference is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = reference.get(metric), current.get(metric)
+            if before is None or after is None:
+                continue
+            if metric in ("wall_s", "cpu_s") and after < MIN_SIGNIFICANT_S:
+                continue
+            if after > before * (1 + threshold):
+                change = (after / before - 1) * 100 if before else float("inf")
+                regressions.append(f"{name} {metric}: {before} -> {after} (+{change:.0f}%)")
+    return regressions
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"Effectif {report['roster']} ({report['clients']} clients)")
+    print(f"{'Cas':<32}{'Ops':>9}{'Temps':>11}{'CPU':>11}{'ms/op':>11}{'RSS max':>11}{'Octets':>11}")
+    for name, case in report["cases"].items():
+        rss = f"{case['peak_rss_kb'] / 1024:.0f} Mo" if case["peak_rss_kb"] else "-"
+        print(f"{name:<32}{case['operations']:>9}{case['wall_s']:>9.3f} s{case['cpu_s']:>9.3f} s"
+              f"{case['per_op_ms']:>11.3f}{rss:>11}{case['output_bytes']:>11}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Suite de benchmarks du générateur de fiches")
+    parser.add_argument("--roster", choices=sorted(ROSTERS), default="small",
+                        help="Taille de l'effectif synthétique")
+    parser.add_argument("--case", action="append", dest="cases",
+                        help="Préfixe des cas à exécuter (répétable, ex: pdf, chart.pie_flat)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Passes par cas, le meilleur temps est retenu (défaut: 3)")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Enregistrer le rapport comme référence")
+    parser.add_argument("--check", action="store_true",
+                        help="Comparer à la référence et échouer en cas de régression")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Hausse relative tolérée par --check (défaut: 0.25)")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)  # Processus isolé
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.roster, args.repeat)))
+        return 0
+
+    report = run_suite(args.roster, args.cases, args.repeat)
+    _print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handler:
+            json.dump(report, handler, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(args.roster), "w", encoding="utf-8") as handler:
+            json.dump(report, handler, indent=2)
+        print(f"Référence enregistrée: {baseline_path(args.roster)}")
+
+    if args.check:
+        path = baseline_path(args.roster)
+        if not os.path.exists(path):
+            print(f"Aucune référence: {path} (lancer avec --save-baseline)", file=sys.stderr)
+            return 2
+        with open(path, "r", encoding="utf-8") as handler:
+            regressions = compare_reports(report, json.load(handler), args.threshold)
+        if regressions:
+            print(f"RÉGRESSION (seuil +{args.threshold:.0%}) :", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"Aucune régression (seuil +{args.threshold:.0%})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,30 @@ Générateur de fiches nutritionnelles professionnelles
 __version__ = "1.0.0"
 __author__ = "Virtus Training"
 
-# Imports principaux pour faciliter l'utilisation
-from .core.calculations import NutritionCalculator
-from .core.pdf_generator import PDFGenerator
-from .gui.main_window import MainWindow
\ No newline at end of file
+import os as _os
+import sys as _sys
+
+# Les modules du paquet s'importent entre eux par `core.` et `gui.`
+_PACKAGE_DIR = _os.path.dirname(_os.path.abspath(__file__))
+if _PACKAGE_DIR not in _sys.path:
+    _sys.path.insert(0, _PACKAGE_DIR)
+
+# Imports principaux pour faciliter l'utilisation, chargés à la demande
+# (évite d'importer matplotlib/ReportLab/customtkinter avec le paquet)
+_LAZY_EXPORTS = {
+    "NutritionCalculator": ".core.calculations",
+    "PDFGenerator": ".core.pdf_generator",
+    "MainWindow": ".gui.main_window",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
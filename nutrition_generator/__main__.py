@@ -0,0 +1,11 @@
+"""
+Point d'entrée `python -m nutrition_generator`
+(l'import du paquet ajoute son dossier au chemin des modules)
+"""
+
+import sys
+
+from cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,481 @@
+"""
+Interface en ligne de commande (sans interface graphique)
+Usage: python -m nutrition_generator batch clients.csv --workers 4
+       python -m nutrition_generator serve --port 8765
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.batch_renderer import VARIANTES_PDF, BatchPDFRenderer, RenderJob
+from core.fiche_index import DEFAULT_INDEX_PATH, FicheIndex
+from core.roster import RosterRow, iter_roster
+
+
+# Nombre maximal d'erreurs détaillées dans le bilan (les compteurs restent exacts)
+ERREURS_MAX_DETAILLEES = 1000
+
+# Nombre de fiches enregistrées par transaction dans l'index
+INDEX_FLUSH_SIZE = 200
+
+# Correspondance settings.json (default_values) -> colonnes de la liste
+_DEFAULTS_CONFIG = {
+    "activity_factor": "facteur_activite",
+    "protein_ratio": "proteines_g_par_kg",
+    "fat_ratio": "lipides_g_par_kg",
+    "deficit_surplus": "deficit_surplus_kcal",
+    "gender": "sexe",
+}
+
+
+def _default_config_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "settings.json")
+
+
+def load_defaults(config_path: Optional[str]) -> Dict[str, Any]:
+    """
+    Paramètres par défaut des lignes, lus dans settings.json
+
+    Args:
+        config_path: Chemin vers settings.json (None pour celui du paquet)
+
+    Returns:
+        Valeurs par défaut indexées par nom de colonne
+    """
+    path = config_path or _default_config_path()
+    try:
+        with open(path, "r", encoding="utf-8") as handler:
+            values = json.load(handler).get("default_values", {})
+    except (OSError, ValueError):
+        return {}
+    return {column: values[key] for key, column in _DEFAULTS_CONFIG.items() if key in values}
+
+
+def batch_filename(row: RosterRow) -> str:
+    """
+    Nom de fichier stable d'une ligne (permet la reprise après interruption)
+
+    Args:
+        row: Ligne validée
+
+    Returns:
+        Nom du PDF
+    """
+    row_id = "".join(c for c in row.row_id if c.isalnum() or c in "-_")
+    prenom_clean = "".join(c for c in row.client.prenom if c.isalnum())
+    nom_clean = "".join(c for c in row.client.nom if c.isalnum())
+    return f"Fiche_{row_id}_{prenom_clean}_{nom_clean}.pdf"
+
+
+class BatchRun:
+    """Exécution d'un lot : lecture en flux, reprise, rendu et bilan"""
+
+    def __init__(self, roster_path: str, output_dir: str,
+                 variante: str = "sublime",
+                 workers: Optional[int] = None,
+                 max_in_flight: Optional[int] = None,
+                 config_path: Optional[str] = None,
+                 roster_format: Optional[str] = None,
+                 resume: bool = True,
+                 progress_every: int = 50,
+                 index: Optional[FicheIndex] = None):
+        self.roster_path = roster_path
+        self.output_dir = output_dir
+        self.roster_format = roster_format
+        self.resume = resume
+        self.progress_every = progress_every
+        self.config_path = config_path
+        self.renderer = BatchPDFRenderer(workers, max_in_flight, variante, config_path)
+        self.index = index
+        self._pending: Dict[str, tuple] = {}  # job_id -> (client, params, identifiant) en cours
+        self._to_index: List[tuple] = []
+
+        self.lines = 0
+        self.skipped = 0
+        self.invalid: List[Dict[str, Any]] = []
+        self.invalid_count = 0
+        self.invalid_by_field: Dict[str, int] = {}
+        self.failures: List[Dict[str, Any]] = []
+        self.failure_count = 0
+        self.rendered = 0
+        self.output_bytes = 0
+        self.image_bytes_saved = 0
+        self.stage_totals: Dict[str, float] = {"lecture_validation": 0.0}
+
+    def _jobs(self) -> Iterator[RenderJob]:
+        """Transforme la liste en fiches à rendre (consommée paresseusement)"""
+        rows = iter_roster(self.roster_path, self.roster_format,
+                           load_defaults(self.config_path))
+        while True:
+            stage = time.perf_counter()
+            row = next(rows, None)
+            self.stage_totals["lecture_validation"] += time.perf_counter() - stage
+            if row is None:
+                return
+
+            self.lines += 1
+            if not row.ok:
+                self.invalid_count += 1
+                for field in row.error_fields:
+                    self.invalid_by_field[field] = self.invalid_by_field.get(field, 0) + 1
+                if len(self.invalid) < ERREURS_MAX_DETAILLEES:
+                    self.invalid.append({"line": row.line, "id": row.row_id, "error": row.error})
+                continue
+
+            output_path = os.path.join(self.output_dir, batch_filename(row))
+            if self.resume and os.path.exists(output_path):
+                self.skipped += 1
+                continue
+
+            if self.index is not None:
+                self._pending[row.row_id] = (row.client, row.params, row.identifiant)
+            yield RenderJob(row.client, row.params, output_path, row.row_id)
+
+    def _flush_index(self) -> None:
+        if self.index is not None and self._to_index:
+            self.index.record_fiches(self._to_index)
+            self._to_index = []
+
+    def _clean_partial_files(self) -> None:
+        """Supprime les fichiers .part laissés par une exécution interrompue"""
+        for path in glob.glob(os.path.join(self.output_dir, "*.pdf.part")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Exécute le lot
+
+        Returns:
+            Bilan lisible par machine (voir summary)
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._clean_partial_files()
+
+        self.started_at = datetime.now()
+        start = time.perf_counter()
+        for result in self.renderer.iter_render(self._jobs()):
+            for stage, duration in result.timings.items():
+                self.stage_totals[stage] = self.stage_totals.get(stage, 0.0) + duration
+
+            pending = self._pending.pop(result.job_id, None)
+            if result.ok:
+                self.rendered += 1
+                self.output_bytes += os.path.getsize(result.output_path)
+                self.image_bytes_saved += result.image_bytes_saved
+                if pending is not None:
+                    client, params, identifiant = pending
+                    self._to_index.append(
+                        (result.output_path, client, params, result.results, None, identifiant)
+                    )
+                    if len(self._to_index) >= INDEX_FLUSH_SIZE:
+                        self._flush_index()
+            else:
+                self.failure_count += 1
+                if len(self.failures) < ERREURS_MAX_DETAILLEES:
+                    self.failures.append({"id": result.job_id, "error": result.error})
+
+            done = self.rendered + self.failure_count
+            if self.progress_every and done % self.progress_every == 0:
+                print(f"{done} fiches traitées ({self.failure_count} échecs)", file=sys.stderr)
+
+        self._flush_index()
+        self.duration_s = time.perf_counter() - start
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        """Bilan : débit, durées par étape et erreurs"""
+        processed = self.rendered + self.failure_count
+        stages = {}
+        for stage, total in self.stage_totals.items():
+            count = self.lines if stage == "lecture_validation" else processed
+            stages[stage] = {
+                "total_s": round(total, 4),
+                "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+            }
+
+        return {
+            "roster": self.roster_path,
+            "output_dir": self.output_dir,
+            "variante": self.renderer.variante,
+            "workers": self.renderer.max_workers,
+            "max_in_flight": self.renderer.max_in_flight,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "duration_s": round(self.duration_s, 3),
+            "rows": self.lines,
+            "rendered": self.rendered,
+            "skipped_existing": self.skipped,
+            "invalid": self.invalid_count,
+            "invalid_by_field": self.invalid_by_field,
+            "failed": self.failure_count,
+            # Processus de rendu perdus : pool recréé, lot arrêté au-delà de la limite
+            "pool_restarts": self.renderer.pool_restarts,
+            "aborted": self.renderer.aborted,
+            "throughput_per_s": round(self.rendered / self.duration_s, 3) if self.duration_s else 0.0,
+            "output_bytes": self.output_bytes,
+            # Images réduites à leur taille de placement (core/image_pipeline.py)
+            "image_bytes_saved": self.image_bytes_saved,
+            "image_bytes_saved_per_sheet": round(self.image_bytes_saved / self.rendered) if self.rendered else 0,
+            # Somme des durées dans les processus de rendu (> durée réelle en parallèle)
+            "stages": stages,
+            "invalid_rows": self.invalid,
+            "failures": self.failures,
+        }
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m nutrition_generator",
+        description="Générateur de fiches nutritionnelles (sans argument: interface graphique)"
+    )
+    # Options de l'interface graphique (lues par main.main)
+    parser.add_argument("--debug", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="Affiche la durée des étapes du démarrage de l'interface")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser("batch", help="Génère une fiche PDF par ligne d'une liste de clients")
+    batch.add_argument("roster", help="Liste de clients (.csv ou .jsonl)")
+    batch.add_argument("-o", "--output-dir", default=os.path.join("output", "fiches", "batch"),
+                       help="Dossier des PDF générés")
+    batch.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                       help="Format de la liste (déduit de l'extension par défaut)")
+    batch.add_argument("--variante", choices=sorted(VARIANTES_PDF), default="sublime",
+                       help="Mise en page des fiches")
+    batch.add_argument("-j", "--workers", type=int, default=None,
+                       help="Nombre de processus de rendu (défaut: nombre de cœurs)")
+    batch.add_argument("--max-in-flight", type=int, default=None,
+                       help="Fiches en cours au maximum (défaut: 2 x workers)")
+    batch.add_argument("--config", default=None, help="Chemin vers settings.json")
+    batch.add_argument("--no-resume", action="store_true",
+                       help="Régénère aussi les fiches déjà présentes")
+    batch.add_argument("--index", default=DEFAULT_INDEX_PATH,
+                       help="Base SQLite où enregistrer les fiches générées")
+    batch.add_argument("--no-index", action="store_true",
+                       help="N'enregistre pas les fiches dans l'index")
+    batch.add_argument("--summary", default=None,
+                       help="Fichier JSON du bilan (défaut: <output-dir>/batch_summary.json)")
+    batch.add_argument("--progress-every", type=int, default=50,
+                       help="Fréquence des messages de progression (0 pour désactiver)")
+
+    binder = subparsers.add_parser("binder", help="Réunit les fiches d'une liste de clients dans un seul PDF")
+    binder.add_argument("roster", help="Liste de clients (.csv ou .jsonl)")
+    binder.add_argument("-o", "--output", default=os.path.join("output", "fiches", "classeur.pdf"),
+                        help="PDF généré (un signet par client)")
+    binder.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                        help="Format de la liste (déduit de l'extension par défaut)")
+    binder.add_argument("--variante", choices=sorted(VARIANTES_PDF), default="sublime",
+                        help="Mise en page des fiches")
+    binder.add_argument("--title", default="Fiches Nutritionnelles", help="Titre du document")
+    binder.add_argument("--config", default=None, help="Chemin vers settings.json")
+
+    trace = subparsers.add_parser("trace", help="Mesure la durée de chaque étape du rendu de quelques fiches")
+    trace.add_argument("roster", help="Liste de clients (.csv ou .jsonl)")
+    trace.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                       help="Format de la liste (déduit de l'extension par défaut)")
+    trace.add_argument("--limit", type=int, default=1, help="Nombre de fiches à tracer")
+    trace.add_argument("--variante", choices=sorted(VARIANTES_PDF), default="sublime",
+                       help="Mise en page des fiches")
+    trace.add_argument("--config", default=None, help="Chemin vers settings.json")
+    trace.add_argument("--no-cache", action="store_true",
+                       help="Désactive les caches des graphiques et des sections (mesure la rastérisation)")
+    trace.add_argument("-o", "--output-dir", default=os.path.join("output", "traces"),
+                       help="Dossier des traces (trace.jsonl et trace.chrome.json)")
+
+    serve = subparsers.add_parser("serve", help="Service HTTP local de génération de fiches")
+    serve.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    serve.add_argument("--port", type=int, default=8765, help="Port d'écoute")
+    serve.add_argument("-j", "--workers", type=int, default=2,
+                       help="Processus de rendu (préchauffés au démarrage)")
+    serve.add_argument("--max-pending", type=int, default=None,
+                       help="Rendus distincts en cours au maximum, au-delà réponse 429 "
+                            "(défaut: 2 x workers)")
+    serve.add_argument("--config", default=None, help="Chemin vers settings.json")
+    return parser
+
+
+def run_trace(args: argparse.Namespace) -> int:
+    """Rend quelques fiches en mémoire avec le traçage actif et exporte les spans"""
+    from core.calculations import NutritionCalculator
+    from core.chart_cache import ChartCache
+    from core.pdf_generator import PDFGenerator
+    from core.section_cache import SectionCache
+    from core.tracing import get_tracer
+
+    generator = PDFGenerator(args.config)
+    if args.no_cache:
+        generator.chart_cache = ChartCache(enabled=False)
+        generator.section_cache = SectionCache(enabled=False)
+    calculator = NutritionCalculator()
+    tracer = get_tracer()
+    tracer.clear()
+    tracer.enable()
+
+    traced_count = 0
+    try:
+        for row in iter_roster(args.roster, args.format, load_defaults(args.config)):
+            if traced_count >= args.limit:
+                break
+            if not row.ok:
+                continue
+            results = calculator.calculate_complete_nutrition(row.client, row.params)
+            pdf_bytes = generator.render_to_bytes(row.client, results, row.params.to_dict(),
+                                                  variante=args.variante)
+            report = generator.last_image_report
+            sections = generator.last_section_report
+            print(f"{row.client.prenom} {row.client.nom}: {len(pdf_bytes)} octets, "
+                  f"{report.images} images ({report.bytes_before} -> {report.bytes_after} octets), "
+                  f"sections: {len(sections.recomputed)} recalculées, {len(sections.reused)} reprises")
+            traced_count += 1
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 2
+    finally:
+        tracer.disable()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jsonl_path = os.path.join(args.output_dir, "trace.jsonl")
+    chrome_path = os.path.join(args.output_dir, "trace.chrome.json")
+    tracer.export_jsonl(jsonl_path)
+    tracer.export_chrome_trace(chrome_path)
+
+    print(f"{traced_count} fiche(s) tracée(s)")
+    print(f"{'Étape':<44}{'Appels':>8}{'Total':>12}{'Moyenne':>12}")
+    for name, stats in tracer.summary().items():
+        print(f"{name:<44}{stats['count']:>8}{stats['total_ms']:>9.1f} ms{stats['mean_ms']:>9.1f} ms")
+    print(f"Spans: {jsonl_path}")
+    print(f"Chrome trace: {chrome_path} (chrome://tracing ou ui.perfetto.dev)")
+    return 0
+
+
+def run_binder(args: argparse.Namespace) -> int:
+    """Rend toutes les lignes valides de la liste dans un seul document"""
+    from core.calculations import NutritionCalculator
+    from core.pdf_generator import PDFGenerator
+
+    generator = PDFGenerator(args.config)
+    calculator = NutritionCalculator()
+    invalid: List[RosterRow] = []
+    invalid_count = 0
+
+    def items():
+        nonlocal invalid_count
+        for row in iter_roster(args.roster, args.format, load_defaults(args.config)):
+            if not row.ok:
+                invalid_count += 1
+                if len(invalid) < ERREURS_MAX_DETAILLEES:
+                    invalid.append(row)
+                continue
+            results = calculator.calculate_complete_nutrition(row.client, row.params)
+            yield row.client, results, row.params.to_dict(), None
+
+    started = time.perf_counter()
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    try:
+        with open(args.output, "wb") as stream:
+            count = generator.render_clients_to_stream(items(), stream, args.variante, args.title)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 2
+
+    for row in invalid:
+        print(f"Ligne {row.line} ({row.row_id}): {row.error}", file=sys.stderr)
+    print(
+        f"{count} fiches réunies, {invalid_count} lignes invalides "
+        f"en {time.perf_counter() - started:.1f}s: {args.output}"
+    )
+    report = generator.last_image_report
+    print(f"Images: {report.images} placées, {report.bytes_saved} octets économisés avant intégration")
+    return 0 if invalid_count == 0 else 1
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    """Lance le service HTTP jusqu'à Ctrl+C"""
+    import asyncio
+
+    from server import RenderService, serve
+
+    service = RenderService(args.workers, args.max_pending, args.config, load_defaults(args.config))
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, RuntimeError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 2
+    finally:
+        service.close()
+    return 0
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Exécute la sous-commande batch et écrit le bilan"""
+    try:
+        run = BatchRun(
+            roster_path=args.roster,
+            output_dir=args.output_dir,
+            variante=args.variante,
+            workers=args.workers,
+            max_in_flight=args.max_in_flight,
+            config_path=args.config,
+            roster_format=args.format,
+            resume=not args.no_resume,
+            progress_every=args.progress_every,
+            index=None if args.no_index else FicheIndex(args.index)
+        )
+        summary = run.run()
+    except (OSError, ValueError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 2
+
+    summary_path = args.summary or os.path.join(args.output_dir, "batch_summary.json")
+    with open(summary_path, "w", encoding="utf-8") as handler:
+        json.dump(summary, handler, indent=2, ensure_ascii=False)
+
+    print(
+        f"{summary['rendered']} fiches générées, {summary['skipped_existing']} déjà présentes, "
+        f"{summary['invalid']} lignes invalides, {summary['failed']} échecs "
+        f"en {summary['duration_s']:.1f}s ({summary['throughput_per_s']:.2f} fiches/s)"
+    )
+    if summary["aborted"]:
+        print(f"Lot interrompu après {summary['pool_restarts']} redémarrages du pool de rendu",
+              file=sys.stderr)
+    print(f"Bilan: {summary_path}")
+    return 0 if summary["invalid"] == 0 and summary["failed"] == 0 else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Point d'entrée de la ligne de commande
+
+    Args:
+        argv: Arguments (défaut: sys.argv[1:])
+
+    Returns:
+        Code de sortie
+    """
+    args = _build_parser().parse_args(argv)
+
+    if args.command == "batch":
+        return run_batch(args)
+    if args.command == "binder":
+        return run_binder(args)
+    if args.command == "trace":
+        return run_trace(args)
+    if args.command == "serve":
+        return run_serve(args)
+
+    # Sans sous-commande : interface graphique
+    from main import main as gui_main
+    gui_main()
+    return 0
@@ -0,0 +1,278 @@
+"""
+Calculs nutritionnels vectorisés pour des effectifs complets de clients
+Reproduit exactement le chemin scalaire de NutritionCalculator (arrondis compris)
+"""
+
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from core.data_models import (
+    ClientData, NutritionParams, NutritionResults, FORMULES_METABOLISME
+)
+
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+# Ordre des codes de formule utilisé dans les tableaux `formule`
+FORMULES_ORDRE = tuple(FORMULES_METABOLISME.keys())
+
+
+def round_like_python(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    Arrondi vectorisé identique à la fonction native round()
+
+    np.round multiplie par 10**ndigits avant d'arrondir, ce qui peut faire
+    basculer une valeur proche d'une demi-unité. Ces cas limites sont repris
+    un par un avec round() pour garantir un résultat identique au scalaire.
+
+    Args:
+        values: Tableau de flottants
+        ndigits: Nombre de décimales
+
+    Returns:
+        Tableau arrondi
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+    if ndigits == 0:
+        return rounded
+
+    scaled = values * (10 ** ndigits)
+    ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    ambiguous &= np.isfinite(values)
+    for index in np.flatnonzero(ambiguous):
+        rounded[index] = round(float(values[index]), ndigits)
+    return rounded
+
+
+@dataclass
+class BatchNutritionResults:
+    """Résultats vectorisés (structure de tableaux, une ligne par client)"""
+    bmr_harris_benedict: np.ndarray
+    bmr_mifflin_st_jeor: np.ndarray
+    bmr_katch_mcardle: np.ndarray  # NaN si le % de graisse est inconnu
+    bmr: np.ndarray
+    tdee: np.ndarray
+    calories_maintenance: np.ndarray
+    calories_objectif: np.ndarray
+    proteines_g: np.ndarray
+    proteines_kcal: np.ndarray
+    lipides_g: np.ndarray
+    lipides_kcal: np.ndarray
+    glucides_g: np.ndarray
+    glucides_kcal: np.ndarray
+    hydratation_ml: np.ndarray
+    valide: np.ndarray  # False si la formule demandée n'est pas calculable
+
+    def __len__(self) -> int:
+        return len(self.bmr)
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """Conversion en dictionnaire de colonnes"""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+    def row(self, index: int) -> NutritionResults:
+        """
+        Extrait une ligne sous forme de NutritionResults
+
+        Args:
+            index: Indice du client
+
+        Returns:
+            Résultats du client, identiques au calcul scalaire
+        """
+        if not self.valide[index]:
+            raise ValueError(
+                "Le pourcentage de graisse corporelle est requis pour Katch-McArdle"
+            )
+        return NutritionResults(
+            bmr=float(self.bmr[index]),
+            tdee=float(self.tdee[index]),
+            calories_maintenance=float(self.calories_maintenance[index]),
+            calories_objectif=float(self.calories_objectif[index]),
+            proteines_g=float(self.proteines_g[index]),
+            proteines_kcal=float(self.proteines_kcal[index]),
+            lipides_g=float(self.lipides_g[index]),
+            lipides_kcal=float(self.lipides_kcal[index]),
+            glucides_g=float(self.glucides_g[index]),
+            glucides_kcal=float(self.glucides_kcal[index]),
+            hydratation_ml=float(self.hydratation_ml[index])
+        )
+
+
+class BatchNutritionCalculator:
+    """Calculateur vectorisé équivalent à NutritionCalculator"""
+
+    @staticmethod
+    def harris_benedict(weight: np.ndarray, height: np.ndarray, age: np.ndarray,
+                        is_male: np.ndarray) -> np.ndarray:
+        """Harris-Benedict vectorisé (même ordre d'opérations que le scalaire)"""
+        male = 88.362 + (13.397 * weight) + (4.799 * height) - (5.677 * age)
+        female = 447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age)
+        return np.where(is_male, male, female)
+
+    @staticmethod
+    def mifflin_st_jeor(weight: np.ndarray, height: np.ndarray, age: np.ndarray,
+                        is_male: np.ndarray) -> np.ndarray:
+        """Mifflin-St Jeor vectorisé"""
+        base = (10 * weight) + (6.25 * height) - (5 * age)
+        return np.where(is_male, base + 5, base - 161)
+
+    @staticmethod
+    def katch_mcardle(weight: np.ndarray, body_fat_percentage: np.ndarray) -> np.ndarray:
+        """Katch-McArdle vectorisé (NaN si le % de graisse est absent)"""
+        lean_mass = weight * (1 - body_fat_percentage / 100)
+        return 370 + (21.6 * lean_mass)
+
+    def formule_codes(self, formule: Union[str, Iterable[str]], size: int) -> np.ndarray:
+        """
+        Convertit une formule (ou une formule par ligne) en codes entiers
+
+        Args:
+            formule: Nom de formule unique ou séquence de noms
+            size: Nombre de lignes
+
+        Returns:
+            Tableau d'indices dans FORMULES_ORDRE
+        """
+        if isinstance(formule, str):
+            if formule not in FORMULES_ORDRE:
+                raise ValueError(f"Formule inconnue: {formule}")
+            return np.full(size, FORMULES_ORDRE.index(formule), dtype=np.int8)
+
+        names = np.asarray(list(formule), dtype=object)
+        if len(names) != size:
+            raise ValueError("Le tableau de formules n'a pas la bonne longueur")
+        codes = np.full(size, -1, dtype=np.int8)
+        for code, name in enumerate(FORMULES_ORDRE):
+            codes[names == name] = code
+        if (codes < 0).any():
+            inconnue = names[np.flatnonzero(codes < 0)[0]]
+            raise ValueError(f"Formule inconnue: {inconnue}")
+        return codes
+
+    def calculate_batch(self,
+                        poids_kg: ArrayLike,
+                        taille_cm: ArrayLike,
+                        age: ArrayLike,
+                        sexe: Union[Sequence[str], np.ndarray],
+                        facteur_activite: ArrayLike,
+                        deficit_surplus_kcal: ArrayLike,
+                        proteines_g_par_kg: ArrayLike,
+                        lipides_g_par_kg: ArrayLike,
+                        pourcentage_graisse: Optional[ArrayLike] = None,
+                        formule: Union[str, Iterable[str]] = "mifflin_st_jeor"
+                        ) -> BatchNutritionResults:
+        """
+        Calcule tous les besoins nutritionnels d'un effectif en une passe
+
+        Les trois formules de BMR sont toujours calculées ; `formule` choisit
+        celle qui sert de base au TDEE, aux macros et à l'objectif.
+
+        Args:
+            poids_kg: Poids en kg
+            taille_cm: Taille en cm
+            age: Âge en années
+            sexe: 'male' ou 'female' par client
+            facteur_activite: Facteur d'activité
+            deficit_surplus_kcal: Déficit (-) ou surplus (+) en kcal
+            proteines_g_par_kg: Protéines en g/kg
+            lipides_g_par_kg: Lipides en g/kg
+            pourcentage_graisse: % de graisse (NaN ou None si inconnu)
+            formule: Formule unique ou une formule par client
+
+        Returns:
+            Résultats vectorisés
+        """
+        weight = np.asarray(poids_kg, dtype=np.float64)
+        size = weight.shape[0]
+        height = np.asarray(taille_cm, dtype=np.float64)
+        ages = np.asarray(age, dtype=np.float64)
+        is_male = np.asarray(sexe) == 'male'
+        activity = np.asarray(facteur_activite, dtype=np.float64)
+        deficit = np.asarray(deficit_surplus_kcal, dtype=np.float64)
+        protein_ratio = np.asarray(proteines_g_par_kg, dtype=np.float64)
+        fat_ratio = np.asarray(lipides_g_par_kg, dtype=np.float64)
+        if pourcentage_graisse is None:
+            body_fat = np.full(size, np.nan)
+        else:
+            body_fat = np.array(
+                [np.nan if value is None else value for value in pourcentage_graisse],
+                dtype=np.float64
+            )
+        codes = self.formule_codes(formule, size)
+
+        # Métabolisme de base pour les trois formules
+        bmr_hb = self.harris_benedict(weight, height, ages, is_male)
+        bmr_msj = self.mifflin_st_jeor(weight, height, ages, is_male)
+        bmr_km = self.katch_mcardle(weight, body_fat)
+        bmr = np.choose(codes, (bmr_hb, bmr_msj, bmr_km))
+        valide = np.isfinite(bmr)
+
+        # Dépense énergétique et objectif
+        tdee = bmr * activity
+        calories_objectif = tdee + deficit
+
+        # Macronutriments (glucides = calories restantes, minimum 0 g)
+        proteines_g = protein_ratio * weight
+        lipides_g = fat_ratio * weight
+        proteines_kcal = proteines_g * 4
+        lipides_kcal = lipides_g * 9
+        glucides_g = np.maximum(0, (calories_objectif - proteines_kcal - lipides_kcal) / 4)
+        glucides_kcal = glucides_g * 4
+
+        # Hydratation : 35 ml/kg + bonus selon l'activité
+        activity_bonus = np.where(activity >= 1.55, 500, np.where(activity >= 1.375, 250, 0))
+        hydratation_ml = weight * 35 + activity_bonus
+
+        return BatchNutritionResults(
+            bmr_harris_benedict=bmr_hb,
+            bmr_mifflin_st_jeor=bmr_msj,
+            bmr_katch_mcardle=bmr_km,
+            bmr=round_like_python(bmr, 0),
+            tdee=round_like_python(tdee, 0),
+            calories_maintenance=round_like_python(tdee, 0),
+            calories_objectif=round_like_python(calories_objectif, 0),
+            proteines_g=round_like_python(proteines_g, 1),
+            proteines_kcal=round_like_python(proteines_kcal, 0),
+            lipides_g=round_like_python(lipides_g, 1),
+            lipides_kcal=round_like_python(lipides_kcal, 0),
+            glucides_g=round_like_python(glucides_g, 1),
+            glucides_kcal=round_like_python(glucides_kcal, 0),
+            hydratation_ml=round_like_python(hydratation_ml, 0),
+            valide=valide
+        )
+
+    def calculate_roster(self, clients: Sequence[ClientData],
+                         params: Sequence[NutritionParams]) -> BatchNutritionResults:
+        """
+        Variante prenant des listes de ClientData / NutritionParams
+
+        Args:
+            clients: Données des clients
+            params: Paramètres nutritionnels, un par client
+
+        Returns:
+            Résultats vectorisés
+        """
+        if len(clients) != len(params):
+            raise ValueError("Il faut autant de paramètres que de clients")
+
+        return self.calculate_batch(
+            poids_kg=[c.poids_kg for c in clients],
+            taille_cm=[c.taille_cm for c in clients],
+            age=[c.age for c in clients],
+            sexe=[c.sexe for c in clients],
+            pourcentage_graisse=[c.pourcentage_graisse for c in clients],
+            facteur_activite=[p.facteur_activite for p in params],
+            deficit_surplus_kcal=[p.deficit_surplus_kcal for p in params],
+            proteines_g_par_kg=[p.proteines_g_par_kg for p in params],
+            lipides_g_par_kg=[p.lipides_g_par_kg for p in params],
+            formule=[p.formule_metabolisme for p in params]
+        )
+
+    def rows(self, results: BatchNutritionResults) -> List[NutritionResults]:
+        """Convertit les résultats vectorisés en liste de NutritionResults"""
+        return [results.row(i) for i in range(len(results))]
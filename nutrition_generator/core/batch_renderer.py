@@ -0,0 +1,262 @@
+"""
+Rendu PDF en lot réparti sur un pool de processus
+Chaque processus prépare une seule fois son générateur (styles, palette, logo)
+"""
+
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from core.data_models import ClientData, NutritionParams, NutritionResults
+
+
+# Variantes de fiche disponibles -> méthode du générateur
+VARIANTES_PDF = {
+    "sublime": "generate_sublime_pdf",
+    "enriched": "generate_enriched_pdf",
+    "clean": "generate_clean_layout_pdf",
+    "premium": "generate_premium_pdf",
+}
+
+# Recréations du pool après la mort d'un processus (mémoire, plantage natif) avant abandon du lot
+REDEMARRAGES_POOL_MAX = 3
+
+
+@dataclass
+class RenderJob:
+    """Une fiche à produire"""
+    client: ClientData
+    params: NutritionParams
+    output_path: str
+    job_id: Optional[str] = None
+
+    def __post_init__(self):
+        if self.job_id is None:
+            self.job_id = self.output_path
+
+
+@dataclass
+class RenderResult:
+    """Résultat du rendu d'une fiche"""
+    job_id: str
+    output_path: Optional[str]
+    duree_s: float
+    error: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)  # Durée par étape
+    results: Optional[NutritionResults] = None
+    image_bytes_saved: int = 0  # Octets d'images économisés par le pipeline d'images
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchRenderReport:
+    """Bilan d'un rendu en lot"""
+    results: List[RenderResult] = field(default_factory=list)
+    duree_s: float = 0.0
+
+    @property
+    def errors(self) -> List[RenderResult]:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def succeeded(self) -> List[RenderResult]:
+        return [result for result in self.results if result.ok]
+
+
+# État propre à chaque processus du pool
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(config_path: Optional[str]) -> None:
+    """Initialise le générateur et le calculateur une fois par processus"""
+    from core.calculations import NutritionCalculator
+    from core.pdf_generator import PremiumPDFGenerator
+
+    _worker_state["generator"] = PremiumPDFGenerator(config_path)
+    _worker_state["calculator"] = NutritionCalculator()
+
+
+def render_job(job: RenderJob, variante: str = "sublime") -> RenderResult:
+    """
+    Calcule puis rend une fiche dans le processus courant
+
+    Args:
+        job: Fiche à produire
+        variante: Variante de mise en page (voir VARIANTES_PDF)
+
+    Returns:
+        Résultat du rendu (l'erreur éventuelle est capturée)
+
+    Le PDF est écrit dans un fichier `.part` puis renommé : un fichier
+    présent sous son nom final est toujours complet.
+    """
+    start = time.perf_counter()
+    timings: Dict[str, float] = {}
+    part_path = f"{job.output_path}.part"
+    try:
+        if "generator" not in _worker_state:
+            _init_worker(None)
+        generator = _worker_state["generator"]
+        calculator = _worker_state["calculator"]
+
+        stage = time.perf_counter()
+        results = calculator.calculate_complete_nutrition(job.client, job.params)
+        objectif_type = calculator.get_objectif_description(job.params.deficit_surplus_kcal)
+        conseils = calculator.get_conseils_nutritionnels(job.client, results, objectif_type)
+        timings["calcul"] = time.perf_counter() - stage
+
+        output_dir = os.path.dirname(job.output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        stage = time.perf_counter()
+        render = getattr(generator, VARIANTES_PDF[variante])
+        render(job.client, results, job.params.to_dict(), part_path, conseils)
+        timings["rendu"] = time.perf_counter() - stage
+
+        stage = time.perf_counter()
+        os.replace(part_path, job.output_path)
+        timings["publication"] = time.perf_counter() - stage
+        return RenderResult(job.job_id, job.output_path, time.perf_counter() - start,
+                            timings=timings, results=results,
+                            image_bytes_saved=generator.last_image_report.bytes_saved)
+
+    except Exception as exc:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        error = f"{exc}\n{traceback.format_exc()}"
+        return RenderResult(job.job_id, None, time.perf_counter() - start, error, timings)
+
+
+class BatchPDFRenderer:
+    """Rendu de nombreuses fiches sur plusieurs cœurs"""
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 max_in_flight: Optional[int] = None,
+                 variante: str = "sublime",
+                 config_path: Optional[str] = None,
+                 max_pool_restarts: int = REDEMARRAGES_POOL_MAX):
+        """
+        Initialise le moteur de rendu en lot
+
+        Args:
+            max_workers: Nombre de processus (défaut: nombre de cœurs)
+            max_in_flight: Nombre maximal de fiches soumises non terminées
+                (défaut: 2 x max_workers), borne la mémoire utilisée
+            variante: Variante de mise en page (voir VARIANTES_PDF)
+            config_path: Chemin vers settings.json
+            max_pool_restarts: Recréations du pool tolérées après la mort d'un processus
+        """
+        if variante not in VARIANTES_PDF:
+            raise ValueError(f"Variante inconnue: {variante}")
+
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max(1, max_in_flight or 2 * self.max_workers)
+        self.variante = variante
+        self.config_path = config_path
+        self.max_pool_restarts = max_pool_restarts
+        self.pool_restarts = 0  # Recréations du pool pendant le dernier lot
+        self.aborted = False  # Lot arrêté après trop de processus perdus
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.config_path,)
+        )
+
+    @staticmethod
+    def _crashed(job: RenderJob, error: BaseException) -> RenderResult:
+        """Échec d'une fiche dont le processus de rendu est mort (fichier .part retiré)"""
+        part_path = f"{job.output_path}.part"
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return RenderResult(job.job_id, None, 0.0, f"Processus de rendu interrompu: {error!r}")
+
+    def iter_render(self, jobs: Iterable[RenderJob]) -> Iterator[RenderResult]:
+        """
+        Rend les fiches et produit les résultats au fil de l'eau
+
+        Les jobs sont consommés paresseusement : au plus `max_in_flight`
+        fiches sont en mémoire à la fois, quelle que soit la taille du lot.
+
+        Si un processus meurt (BrokenProcessPool), les fiches en cours sont
+        rendues en échec et le pool est recréé ; après `max_pool_restarts`
+        recréations, le lot s'arrête (`aborted`) sans consommer la suite.
+
+        Args:
+            jobs: Itérable de fiches à produire
+
+        Yields:
+            Résultats dans l'ordre de fin de rendu
+        """
+        jobs_iter = iter(jobs)
+        self.pool_restarts = 0
+        self.aborted = False
+        executor = self._new_pool()
+        in_flight: Dict[Future, RenderJob] = {}
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(in_flight) < self.max_in_flight:
+                    job = next(jobs_iter, None)
+                    if job is None:
+                        exhausted = True
+                        break
+                    in_flight[executor.submit(render_job, job, self.variante)] = job
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                broken: Optional[BaseException] = None
+                for future in done:
+                    job = in_flight.pop(future)
+                    error = future.exception()
+                    if isinstance(error, BrokenProcessPool):
+                        broken = error
+                        yield self._crashed(job, error)
+                    else:
+                        yield future.result()
+                if broken is None:
+                    continue
+
+                # Pool inutilisable : les fiches non terminées sont perdues
+                for future, job in list(in_flight.items()):
+                    if future.done() and future.exception() is None:
+                        yield future.result()
+                    else:
+                        yield self._crashed(job, broken)
+                in_flight.clear()
+                executor.shutdown(wait=True)
+                if self.pool_restarts >= self.max_pool_restarts:
+                    self.aborted = True
+                    break
+                self.pool_restarts += 1
+                executor = self._new_pool()
+        finally:
+            executor.shutdown(wait=True)
+
+    def render(self, jobs: Iterable[RenderJob]) -> BatchRenderReport:
+        """
+        Rend toutes les fiches et retourne le bilan complet
+
+        Args:
+            jobs: Itérable de fiches à produire
+
+        Returns:
+            Bilan avec résultats et erreurs par fiche
+        """
+        start = time.perf_counter()
+        report = BatchRenderReport()
+        for result in self.iter_render(jobs):
+            report.results.append(result)
+        report.duree_s = time.perf_counter() - start
+        return report
@@ -4,10 +4,86 @@ Contient les formules pour BMR, TDEE et répartition des macronutriments
 """
 
 import math
-from typing import Tuple, Dict, Any
+import threading
+from collections import OrderedDict
+from dataclasses import fields
+from operator import attrgetter
+from typing import Tuple, Dict, Any, Callable, Hashable, Optional
 from core.data_models import ClientData, NutritionParams, NutritionResults
 
 
+# Résultats de calculs complets mémorisés par processus
+CALCULS_EN_CACHE = 512
+
+# Instantanés hashables des entrées : tuple des valeurs des champs
+_client_key = attrgetter(*(field.name for field in fields(ClientData)))
+_params_key = attrgetter(*(field.name for field in fields(NutritionParams)))
+
+
+class CalculationCache:
+    """
+    Mémoïsation LRU bornée des calculs
+
+    Les clés sont des instantanés des entrées (valeurs des champs) : modifier
+    un ClientData après coup ne touche pas les entrées existantes. Les
+    valeurs sont immuables (NutritionResults gelé, pourcentages en lecture
+    seule) et peuvent donc être partagées entre appelants.
+    """
+
+    def __init__(self, max_entries: int = CALCULS_EN_CACHE, enabled: bool = True):
+        """
+        Initialise le cache
+
+        Args:
+            max_entries: Nombre maximal de résultats gardés
+            enabled: False pour toujours recalculer
+        """
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Résultat en cache pour `key`, ou calculé par `compute` puis mémorisé"""
+        if not self.enabled:
+            return compute()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()  # Hors verrou ; une exception n'est pas mémorisée
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            size = len(self._entries)
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": size}
+
+
+# Cache partagé par les calculateurs du processus (formulaire, panneau, générateur PDF)
+_shared_cache = CalculationCache()
+
+
+def get_calculation_cache() -> CalculationCache:
+    """Retourne le cache des calculs partagé du processus"""
+    return _shared_cache
+
+
 class MetabolismCalculator:
     """Calculateur pour différentes formules de métabolisme de base"""
 
@@ -70,8 +146,15 @@ class MetabolismCalculator:
 class NutritionCalculator:
     """Calculateur principal pour toutes les valeurs nutritionnelles"""
 
-    def __init__(self):
+    def __init__(self, cache: Optional[CalculationCache] = None):
+        """
+        Initialise le calculateur
+
+        Args:
+            cache: Cache des résultats (défaut: cache partagé du processus)
+        """
         self.metabolism_calc = MetabolismCalculator()
+        self.cache = cache if cache is not None else get_calculation_cache()
 
     def calculate_bmr(self, client: ClientData, formule: str) -> float:
         """
@@ -238,8 +321,12 @@ class NutritionCalculator:
             params: Paramètres nutritionnels
 
         Returns:
-            Résultats complets des calculs nutritionnels
+            Résultats complets des calculs nutritionnels (instance partagée, immuable)
         """
+        key = (_client_key(client), _params_key(params))
+        return self.cache.get_or_compute(key, lambda: self._compute_nutrition(client, params))
+
+    def _compute_nutrition(self, client: ClientData, params: NutritionParams) -> NutritionResults:
         # Calcul du métabolisme de base
         bmr = self.calculate_bmr(client, params.formule_metabolisme)
 
@@ -0,0 +1,260 @@
+"""
+Cache des images de graphiques indexé par les données d'entrée
+Mémoire (LRU borné en octets) + disque (borné en octets, les moins récemment
+lus sont supprimés), avec compteurs de succès/échecs
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# À incrémenter quand le rendu d'un graphique change, pour invalider le cache
+CHART_CACHE_VERSION = 1
+
+_DEFAULT_MEMORY_BUDGET = 32 * 1024 * 1024
+_DEFAULT_DISK_BUDGET = 64 * 1024 * 1024
+
+
+class ChartCache:
+    """Cache adressé par contenu pour les PNG de graphiques"""
+
+    def __init__(self, memory_budget_bytes: int = _DEFAULT_MEMORY_BUDGET,
+                 disk_dir: Optional[str] = None, enabled: bool = True,
+                 disk_budget_bytes: int = _DEFAULT_DISK_BUDGET):
+        """
+        Initialise le cache
+
+        Args:
+            memory_budget_bytes: Taille maximale des images gardées en mémoire
+            disk_dir: Dossier du cache disque (None pour désactiver le disque)
+            enabled: False pour toujours recalculer
+            disk_budget_bytes: Taille maximale du cache disque
+        """
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_dir = disk_dir
+        self.enabled = enabled
+        self.disk_budget_bytes = disk_budget_bytes
+
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_total: Optional[int] = None  # Taille connue du disque (calculée au premier ajout)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+    @staticmethod
+    def make_key(kind: str, inputs: Sequence[Any]) -> str:
+        """
+        Construit la clé d'un graphique à partir de ses données d'entrée
+
+        Args:
+            kind: Type de graphique
+            inputs: Valeurs dont dépend le rendu
+
+        Returns:
+            Empreinte SHA-256 hexadécimale
+        """
+        normalized = [repr(float(v)) if isinstance(v, (int, float)) else str(v) for v in inputs]
+        payload = json.dumps([CHART_CACHE_VERSION, kind, normalized])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.png")
+
+    def get(self, key: str, persist: bool = True) -> Optional[bytes]:
+        """
+        Retourne l'image en cache ou None (met à jour les compteurs)
+
+        Args:
+            key: Clé du graphique
+            persist: False pour ne consulter que la mémoire
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return data
+
+        if self.disk_dir and persist:
+            path = self._disk_path(key)
+            try:
+                with open(path, "rb") as handler:
+                    data = handler.read()
+                os.utime(path)  # Récemment utilisée
+            except OSError:
+                data = None
+            if data:
+                self._store_memory(key, data)
+                with self._lock:
+                    self.disk_hits += 1
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes, persist: bool = True) -> None:
+        """
+        Ajoute une image en mémoire et sur disque
+
+        Args:
+            key: Clé du graphique
+            data: Octets PNG
+            persist: False pour ne garder l'image qu'en mémoire
+        """
+        self._store_memory(key, data)
+
+        if self.disk_dir and persist:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as handler:
+                    handler.write(data)
+                with self._disk_lock:
+                    try:
+                        previous = os.path.getsize(path)
+                    except OSError:
+                        previous = 0
+                    os.replace(tmp_path, path)
+                    if self._disk_total is None:
+                        self._disk_total = sum(size for _, size, _ in self._disk_entries())
+                    else:
+                        self._disk_total += len(data) - previous
+                    if self._disk_total > self.disk_budget_bytes:
+                        self._evict_disk(keep=path)
+            except OSError:
+                pass  # Le cache disque est facultatif
+
+    def _disk_entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        try:
+            with os.scandir(self.disk_dir) as shards:
+                for shard in shards:
+                    if not shard.is_dir():
+                        continue
+                    with os.scandir(shard.path) as scan:
+                        for entry in scan:
+                            if entry.name.endswith(".png"):
+                                stats = entry.stat()
+                                entries.append((stats.st_mtime, stats.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _evict_disk(self, keep: str) -> None:
+        """
+        Supprime les images les moins récemment lues jusqu'à 90 % du budget disque
+
+        Args:
+            keep: Image qui vient d'être enregistrée (jamais supprimée)
+        """
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.disk_budget_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.disk_evictions += 1
+        self._disk_total = total
+
+    def _store_memory(self, key: str, data: bytes) -> None:
+        if len(data) > self.memory_budget_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._entries[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.memory_budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get_or_render(self, kind: str, inputs: Sequence[Any],
+                      render: Callable[[], bytes], persist: bool = True) -> bytes:
+        """
+        Retourne l'image en cache ou la produit avec `render`
+
+        Args:
+            kind: Type de graphique
+            inputs: Valeurs dont dépend le rendu
+            render: Fonction produisant les octets PNG
+            persist: False pour un graphique propre à un client (mémoire seulement)
+
+        Returns:
+            Octets PNG du graphique
+        """
+        if not self.enabled:
+            return render()
+
+        key = self.make_key(kind, inputs)
+        data = self.get(key, persist)
+        if data is None:
+            data = render()
+            self.put(key, data, persist)
+        return data
+
+    def clear(self) -> None:
+        """Vide le cache mémoire (le cache disque est conservé)"""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs de succès/échecs et occupation mémoire"""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "disk_evictions": self.disk_evictions,
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+            }
+
+
+# Caches partagés par configuration (un par dossier et budgets)
+_shared_caches: Dict[Tuple[Optional[str], int, bool, int], ChartCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_chart_cache(disk_dir: Optional[str] = None,
+                    memory_budget_bytes: int = _DEFAULT_MEMORY_BUDGET,
+                    enabled: bool = True,
+                    disk_budget_bytes: int = _DEFAULT_DISK_BUDGET) -> ChartCache:
+    """
+    Retourne le cache partagé du processus pour cette configuration
+
+    Args:
+        disk_dir: Dossier du cache disque
+        memory_budget_bytes: Budget mémoire en octets
+        enabled: Activation du cache
+        disk_budget_bytes: Budget disque en octets
+
+    Returns:
+        Instance de ChartCache partagée
+    """
+    key = (disk_dir, memory_budget_bytes, enabled, disk_budget_bytes)
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = ChartCache(memory_budget_bytes, disk_dir, enabled, disk_budget_bytes)
+            _shared_caches[key] = cache
+        return cache
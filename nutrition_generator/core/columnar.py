@@ -0,0 +1,335 @@
+"""
+Représentations compactes pour le traitement d'effectifs complets
+
+- Enregistrements immuables à __slots__ (pas de __dict__ par instance)
+- Stockage en colonnes typées (un tableau par champ) avec vues de ligne sans copie
+Les conversions depuis / vers les dataclasses de data_models sont sans perte.
+"""
+
+from array import array
+from dataclasses import MISSING, FrozenInstanceError, fields
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from core.batch_calculations import FORMULES_ORDRE, BatchNutritionResults
+from core.data_models import ClientData, NutritionParams, NutritionResults, macros_pourcentages
+
+
+# ----------------------------------------------------------------------
+# Enregistrements immuables
+# ----------------------------------------------------------------------
+class _FrozenRecord:
+    """Base des enregistrements : champs dans des slots, modification interdite"""
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _dataclass: type = object
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        if len(args) > len(self._fields):
+            raise TypeError(f"{type(self).__name__} attend au plus {len(self._fields)} arguments")
+        values = dict(zip(self._fields, args))
+        values.update(kwargs)
+        defaults = self._defaults()
+        for name in self._fields:
+            if name in values:
+                object.__setattr__(self, name, values.pop(name))
+            elif name in defaults:
+                object.__setattr__(self, name, defaults[name])
+            else:
+                raise TypeError(f"Champ manquant: {name}")
+        if values:
+            raise TypeError(f"Champs inconnus: {', '.join(values)}")
+
+    @classmethod
+    def _defaults(cls) -> Dict[str, Any]:
+        return {
+            field.name: field.default for field in fields(cls._dataclass)
+            if field.default is not MISSING
+        }
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash(self._values())
+
+    def __repr__(self) -> str:
+        body = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({body})"
+
+    def __reduce__(self):
+        return (type(self), self._values())
+
+    @classmethod
+    def from_dataclass(cls, instance: Any) -> "_FrozenRecord":
+        """Conversion depuis la dataclass correspondante (sans nouvelle validation)"""
+        record = object.__new__(cls)
+        for name in cls._fields:
+            object.__setattr__(record, name, getattr(instance, name))
+        return record
+
+    def to_dataclass(self) -> Any:
+        """Conversion vers la dataclass correspondante"""
+        return self._dataclass(*self._values())
+
+
+class ClientRecord(_FrozenRecord):
+    """Équivalent immuable et compact de ClientData"""
+    __slots__ = ("nom", "prenom", "age", "taille_cm", "poids_kg", "sexe", "pourcentage_graisse")
+    _fields = __slots__
+    _dataclass = ClientData
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        ClientData.__post_init__(self)  # Mêmes règles de validation
+
+
+class ParamsRecord(_FrozenRecord):
+    """Équivalent immuable et compact de NutritionParams"""
+    __slots__ = ("formule_metabolisme", "facteur_activite", "deficit_surplus_kcal",
+                 "proteines_g_par_kg", "lipides_g_par_kg")
+    _fields = __slots__
+    _dataclass = NutritionParams
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        NutritionParams.__post_init__(self)
+
+    to_dict = NutritionParams.to_dict
+
+
+class ResultsRecord(_FrozenRecord):
+    """Équivalent immuable et compact de NutritionResults, pourcentages mis en cache"""
+    __slots__ = ("bmr", "tdee", "calories_maintenance", "calories_objectif",
+                 "proteines_g", "proteines_kcal", "lipides_g", "lipides_kcal",
+                 "glucides_g", "glucides_kcal", "hydratation_ml", "_macros")
+    _fields = __slots__[:-1]
+    _dataclass = NutritionResults
+
+    @property
+    def macros_pourcentages(self) -> Dict[str, float]:
+        """Pourcentages des macronutriments (calculés une fois, lecture seule)"""
+        try:
+            return self._macros
+        except AttributeError:
+            macros = macros_pourcentages(self.proteines_kcal, self.lipides_kcal, self.glucides_kcal)
+            object.__setattr__(self, "_macros", macros)
+            return macros
+
+    to_dict = NutritionResults.to_dict
+
+
+# ----------------------------------------------------------------------
+# Stockage en colonnes
+# ----------------------------------------------------------------------
+# Champs numériques : (colonne, code de type array / numpy)
+_NUMERIC_COLUMNS = (
+    ("age", "H"),
+    ("taille_cm", "H"),
+    ("poids_kg", "d"),
+    ("pourcentage_graisse", "d"),  # NaN si inconnu
+    ("facteur_activite", "d"),
+    ("deficit_surplus_kcal", "i"),
+    ("proteines_g_par_kg", "d"),
+    ("lipides_g_par_kg", "d"),
+)
+_SEXES = ("female", "male")
+
+
+class _TextColumn:
+    """Chaînes UTF-8 concaténées et décalages de fin (pas d'objet str par ligne)"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array("q")
+
+    def append(self, value: str) -> None:
+        self.data += value.encode("utf-8")
+        self.ends.append(len(self.data))
+
+    def __getitem__(self, index: int) -> str:
+        start = self.ends[index - 1] if index else 0
+        return self.data[start:self.ends[index]].decode("utf-8")
+
+    def nbytes(self) -> int:
+        return len(self.data) + self.ends.itemsize * len(self.ends)
+
+
+class ClientColumns:
+    """
+    Effectif en colonnes typées : un tableau par champ de ClientData / NutritionParams
+
+    Les colonnes numériques sont des array.array exposés sans copie en
+    tableaux NumPy (`column(name)`), directement utilisables par le
+    calculateur vectorisé. `row(i)` retourne une vue légère de la ligne.
+    """
+
+    def __init__(self):
+        self._numeric: Dict[str, array] = {name: array(code) for name, code in _NUMERIC_COLUMNS}
+        self._sexe = array("B")
+        self._formule = array("B")
+        self._nom = _TextColumn()
+        self._prenom = _TextColumn()
+        self.results: Optional[BatchNutritionResults] = None
+
+    def __len__(self) -> int:
+        return len(self._sexe)
+
+    def append(self, client: Any, params: Any) -> None:
+        """
+        Ajoute une ligne (ClientData / NutritionParams ou enregistrements équivalents)
+
+        Args:
+            client: Données du client
+            params: Paramètres nutritionnels
+        """
+        numeric = self._numeric
+        numeric["age"].append(client.age)
+        numeric["taille_cm"].append(client.taille_cm)
+        numeric["poids_kg"].append(client.poids_kg)
+        graisse = client.pourcentage_graisse
+        numeric["pourcentage_graisse"].append(float("nan") if graisse is None else graisse)
+        numeric["facteur_activite"].append(params.facteur_activite)
+        numeric["deficit_surplus_kcal"].append(params.deficit_surplus_kcal)
+        numeric["proteines_g_par_kg"].append(params.proteines_g_par_kg)
+        numeric["lipides_g_par_kg"].append(params.lipides_g_par_kg)
+        self._sexe.append(_SEXES.index(client.sexe))
+        self._formule.append(FORMULES_ORDRE.index(params.formule_metabolisme))
+        self._nom.append(client.nom)
+        self._prenom.append(client.prenom)
+        self.results = None  # Résultats éventuels devenus incomplets
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Any, Any]]) -> "ClientColumns":
+        """Construit le stockage à partir de couples (client, params), consommés en flux"""
+        store = cls()
+        for client, params in rows:
+            store.append(client, params)
+        return store
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Vue NumPy (sans copie) d'une colonne
+
+        Args:
+            name: Champ numérique, 'sexe' (1 = male) ou 'formule' (indice dans FORMULES_ORDRE)
+
+        Returns:
+            Tableau partageant la mémoire de la colonne (append() lève
+            BufferError tant qu'une vue est conservée)
+        """
+        if name == "sexe":
+            source = self._sexe
+        elif name == "formule":
+            source = self._formule
+        else:
+            source = self._numeric[name]
+        return np.frombuffer(source, dtype=source.typecode) if len(source) else np.array([], dtype=source.typecode)
+
+    def calculate(self, calculator: Optional[Any] = None) -> BatchNutritionResults:
+        """
+        Calcule tout l'effectif en une passe vectorisée et conserve les résultats
+
+        Args:
+            calculator: BatchNutritionCalculator (un nouveau par défaut)
+
+        Returns:
+            Résultats vectorisés (aussi disponibles dans `results`)
+        """
+        from core.batch_calculations import BatchNutritionCalculator
+
+        calculator = calculator or BatchNutritionCalculator()
+        self.results = calculator.calculate_batch(
+            poids_kg=self.column("poids_kg"),
+            taille_cm=self.column("taille_cm"),
+            age=self.column("age"),
+            sexe=np.where(self.column("sexe") == 1, "male", "female"),
+            pourcentage_graisse=self.column("pourcentage_graisse"),
+            facteur_activite=self.column("facteur_activite"),
+            deficit_surplus_kcal=self.column("deficit_surplus_kcal"),
+            proteines_g_par_kg=self.column("proteines_g_par_kg"),
+            lipides_g_par_kg=self.column("lipides_g_par_kg"),
+            formule=np.asarray(FORMULES_ORDRE)[self.column("formule")]
+        )
+        return self.results
+
+    def row(self, index: int) -> "RowView":
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return RowView(self, index % len(self))
+
+    __getitem__ = row
+
+    def __iter__(self) -> Iterator["RowView"]:
+        for index in range(len(self)):
+            yield RowView(self, index)
+
+    def client(self, index: int) -> ClientData:
+        """Ligne convertie en ClientData"""
+        return self.row(index).client()
+
+    def params(self, index: int) -> NutritionParams:
+        """Ligne convertie en NutritionParams"""
+        return self.row(index).params()
+
+    def nbytes(self) -> int:
+        """Mémoire occupée par les colonnes (hors résultats)"""
+        total = sum(column.itemsize * len(column) for column in self._numeric.values())
+        total += len(self._sexe) + len(self._formule)
+        return total + self._nom.nbytes() + self._prenom.nbytes()
+
+
+class RowView:
+    """Vue d'une ligne de ClientColumns : les valeurs sont lues dans les colonnes à la demande"""
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: ClientColumns, index: int):
+        self._store = store
+        self._index = index
+
+    def __getattr__(self, name: str) -> Any:
+        store = self._store
+        index = self._index
+        if name in store._numeric:
+            value = store._numeric[name][index]
+            if name == "pourcentage_graisse" and value != value:  # NaN
+                return None
+            return value
+        if name == "sexe":
+            return _SEXES[store._sexe[index]]
+        if name == "formule_metabolisme":
+            return FORMULES_ORDRE[store._formule[index]]
+        if name == "nom":
+            return store._nom[index]
+        if name == "prenom":
+            return store._prenom[index]
+        if store.results is not None and name in NutritionResults.__dataclass_fields__:
+            return float(getattr(store.results, name)[index])
+        raise AttributeError(name)
+
+    def client(self) -> ClientData:
+        return ClientData(*(getattr(self, name) for name in ClientRecord._fields))
+
+    def params(self) -> NutritionParams:
+        return NutritionParams(*(getattr(self, name) for name in ParamsRecord._fields))
+
+    def results(self) -> NutritionResults:
+        """Résultats de la ligne (après ClientColumns.calculate)"""
+        if self._store.results is None:
+            raise ValueError("Résultats non calculés (appeler calculate)")
+        return self._store.results.row(self._index)
+
+    def __repr__(self) -> str:
+        return f"RowView({self._index}, {self.prenom} {self.nom})"
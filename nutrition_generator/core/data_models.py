@@ -3,10 +3,13 @@ Modèles de données pour les informations clients et nutritionnelles
 """
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping, Tuple
 from datetime import datetime
 import json
 
+from core.validation import CLIENT_RULES, PARAMS_RULES, ensure_valid
+
 
 @dataclass
 class ClientData:
@@ -21,14 +24,7 @@ class ClientData:
 
     def __post_init__(self):
         """Validation des données après initialisation"""
-        if self.age < 10 or self.age > 100:
-            raise ValueError("L'âge doit être entre 10 et 100 ans")
-        if self.taille_cm < 100 or self.taille_cm > 250:
-            raise ValueError("La taille doit être entre 100 et 250 cm")
-        if self.poids_kg < 30 or self.poids_kg > 300:
-            raise ValueError("Le poids doit être entre 30 et 300 kg")
-        if self.sexe not in ['male', 'female']:
-            raise ValueError("Le sexe doit être 'male' ou 'female'")
+        ensure_valid(CLIENT_RULES, self)
 
 
 @dataclass
@@ -42,19 +38,36 @@ class NutritionParams:
 
     def __post_init__(self):
         """Validation des paramètres nutritionnels"""
-        if self.facteur_activite < 1.0 or self.facteur_activite > 2.5:
-            raise ValueError("Le facteur d'activité doit être entre 1.0 et 2.5")
-        if self.deficit_surplus_kcal < -1000 or self.deficit_surplus_kcal > 1000:
-            raise ValueError("Le déficit/surplus doit être entre -1000 et +1000 kcal")
-        if self.proteines_g_par_kg < 0.5 or self.proteines_g_par_kg > 4.0:
-            raise ValueError("Les protéines doivent être entre 0.5 et 4.0 g/kg")
-        if self.lipides_g_par_kg < 0.3 or self.lipides_g_par_kg > 2.0:
-            raise ValueError("Les lipides doivent être entre 0.3 et 2.0 g/kg")
+        ensure_valid(PARAMS_RULES, self)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Conversion en dictionnaire (format attendu par le générateur PDF)"""
+        return {
+            "formule_metabolisme": self.formule_metabolisme,
+            "facteur_activite": self.facteur_activite,
+            "deficit_surplus_kcal": self.deficit_surplus_kcal,
+            "proteines_g_par_kg": self.proteines_g_par_kg,
+            "lipides_g_par_kg": self.lipides_g_par_kg
+        }
 
-@dataclass
+
+def macros_pourcentages(proteines_kcal: float, lipides_kcal: float,
+                        glucides_kcal: float) -> Dict[str, float]:
+    """Pourcentages des macronutriments dans les calories totales"""
+    total_kcal = proteines_kcal + lipides_kcal + glucides_kcal
+    if total_kcal == 0:
+        return {"proteines": 0, "lipides": 0, "glucides": 0}
+
+    return {
+        "proteines": round((proteines_kcal / total_kcal) * 100, 1),
+        "lipides": round((lipides_kcal / total_kcal) * 100, 1),
+        "glucides": round((glucides_kcal / total_kcal) * 100, 1)
+    }
+
+
+@dataclass(frozen=True)
 class NutritionResults:
-    """Résultats des calculs nutritionnels"""
+    """Résultats des calculs nutritionnels (immuables : partagés par le cache des calculs)"""
     bmr: float  # Métabolisme de base
     tdee: float  # Dépense énergétique totale
     calories_maintenance: float
@@ -68,17 +81,13 @@ class NutritionResults:
     hydratation_ml: float
 
     @property
-    def macros_pourcentages(self) -> Dict[str, float]:
-        """Pourcentages des macronutriments"""
-        total_kcal = self.proteines_kcal + self.lipides_kcal + self.glucides_kcal
-        if total_kcal == 0:
-            return {"proteines": 0, "lipides": 0, "glucides": 0}
-
-        return {
-            "proteines": round((self.proteines_kcal / total_kcal) * 100, 1),
-            "lipides": round((self.lipides_kcal / total_kcal) * 100, 1),
-            "glucides": round((self.glucides_kcal / total_kcal) * 100, 1)
-        }
+    def macros_pourcentages(self) -> Mapping[str, float]:
+        """Pourcentages des macronutriments (calculés une fois, lecture seule)"""
+        cached = self.__dict__.get("_macros_cache")
+        if cached is None:
+            cached = macros_pourcentages(self.proteines_kcal, self.lipides_kcal, self.glucides_kcal)
+            self.__dict__["_macros_cache"] = cached
+        return MappingProxyType(cached)
 
     def to_dict(self) -> Dict[str, Any]:
         """Conversion en dictionnaire pour sauvegarde"""
@@ -94,7 +103,7 @@ class NutritionResults:
             "glucides_g": self.glucides_g,
             "glucides_kcal": self.glucides_kcal,
             "hydratation_ml": self.hydratation_ml,
-            "macros_pourcentages": self.macros_pourcentages
+            "macros_pourcentages": dict(self.macros_pourcentages)
         }
 
 
@@ -106,7 +115,14 @@ class FicheMetadata:
     client_prenom: str
     date_creation: datetime
     calories_objectif: float
-    objectif_type: str  # 'perte', 'maintenance', 'prise'
+    objectif_type: Optional[str]  # 'perte', 'maintenance', 'prise' (None : inconnu)
+    chemin: Optional[str] = None  # Chemin complet du PDF
+    fiche_id: Optional[int] = None  # Identifiant dans l'index des fiches
+
+    @property
+    def sort_key(self) -> Tuple[str, int]:
+        """Position dans l'ordre de l'index (pagination par clé)"""
+        return self.date_creation.isoformat(timespec="seconds"), self.fiche_id or 0
 
     def to_dict(self) -> Dict[str, Any]:
         """Conversion en dictionnaire pour sauvegarde"""
@@ -116,7 +132,8 @@ class FicheMetadata:
             "client_prenom": self.client_prenom,
             "date_creation": self.date_creation.isoformat(),
             "calories_objectif": self.calories_objectif,
-            "objectif_type": self.objectif_type
+            "objectif_type": self.objectif_type,
+            "chemin": self.chemin
         }
 
     @classmethod
@@ -128,7 +145,8 @@ class FicheMetadata:
             client_prenom=data["client_prenom"],
             date_creation=datetime.fromisoformat(data["date_creation"]),
             calories_objectif=data["calories_objectif"],
-            objectif_type=data["objectif_type"]
+            objectif_type=data["objectif_type"],
+            chemin=data.get("chemin")
         )
 
 
@@ -0,0 +1,535 @@
+"""
+Index persistant (SQLite) des clients et des fiches générées
+Alimenté à chaque PDF produit, interrogé par page sans parcourir le disque
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.data_models import ClientData, FicheMetadata, NutritionParams, NutritionResults
+
+
+DEFAULT_INDEX_PATH = os.path.join("output", "fiches_index.db")
+
+OBJECTIFS = ("perte", "maintenance", "prise")
+
+# Borne haute d'une recherche par préfixe (plus grand point de code)
+_FIN_PREFIXE = "\U0010ffff"
+
+# Fiches écrites par transaction lors d'une synchronisation avec le disque
+SYNCHRO_LOT = 1000
+
+# Version du schéma (PRAGMA user_version)
+SCHEMA_VERSION = 1
+
+# Un client est identifié par `identifiant` (colonne id de la liste de clients) ;
+# sans identifiant, chaque fiche a sa propre ligne client (deux homonymes ne
+# sont jamais confondus). objectif_type est NULL pour une fiche trouvée sur
+# disque sans paramètres connus.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    id INTEGER PRIMARY KEY,
+    identifiant TEXT UNIQUE,
+    nom TEXT NOT NULL,
+    prenom TEXT NOT NULL,
+    age INTEGER,
+    sexe TEXT,
+    taille_cm INTEGER,
+    poids_kg REAL,
+    pourcentage_graisse REAL,
+    date_maj TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS fiches (
+    id INTEGER PRIMARY KEY,
+    chemin TEXT NOT NULL UNIQUE,
+    nom_fichier TEXT NOT NULL,
+    dossier TEXT NOT NULL,
+    client_id INTEGER NOT NULL REFERENCES clients (id),
+    date_creation TEXT NOT NULL,
+    objectif_type TEXT,
+    calories_objectif REAL,
+    params_json TEXT,
+    results_json TEXT,
+    taille_octets INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_clients_nom ON clients (nom COLLATE NOCASE, prenom COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_clients_prenom ON clients (prenom COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_fiches_date ON fiches (date_creation DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_fiches_client ON fiches (client_id, date_creation DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_fiches_objectif ON fiches (objectif_type, date_creation DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_fiches_dossier ON fiches (dossier);
+"""
+
+def objectif_from_deficit(deficit_surplus_kcal: float) -> str:
+    """Type d'objectif (mêmes seuils que NutritionCalculator)"""
+    if deficit_surplus_kcal < -100:
+        return "perte"
+    if deficit_surplus_kcal > 100:
+        return "prise"
+    return "maintenance"
+
+
+def guess_client_from_filename(filename: str) -> Tuple[str, str]:
+    """
+    Devine prénom et nom d'une fiche non indexée à partir de son nom
+
+    Args:
+        filename: Nom du fichier (ex: Fiche_Premium_Marie_Dupont_20250926.pdf)
+
+    Returns:
+        Tuple (prenom, nom), nom vide si impossible à deviner
+    """
+    parts = os.path.splitext(filename)[0].split("_")
+    parts = [p for p in parts if p and p not in ("Fiche", "Premium") and not p.isdigit()]
+    if len(parts) >= 2:
+        return parts[-2], parts[-1]
+    return os.path.splitext(filename)[0], ""
+
+
+class FicheIndex:
+    """Index SQLite des clients, paramètres, résultats et fiches"""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        """
+        Ouvre (ou crée) l'index
+
+        Args:
+            db_path: Chemin de la base SQLite (":memory:" pour les tests)
+        """
+        self.db_path = db_path
+        if db_path != ":memory:" and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        # Partagé entre l'interface et les threads de génération
+        self._lock = threading.Lock()
+        self._revision = 0  # Écritures de cette connexion (voir version)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Ferme la connexion"""
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+    def _upsert_client(self, client: ClientData, now: str, chemin: str,
+                       identifiant: Optional[str]) -> int:
+        """
+        Ligne client d'une fiche
+
+        Avec un identifiant, le client est partagé par toutes ses fiches et mis
+        à jour ; sans identifiant, la ligne est propre à la fiche (réutilisée si
+        la fiche est régénérée au même chemin).
+        """
+        values = (client.nom, client.prenom, client.age, client.sexe, client.taille_cm,
+                  client.poids_kg, client.pourcentage_graisse, now)
+        if identifiant is None:
+            row = self._conn.execute(
+                "SELECT c.id FROM fiches f JOIN clients c ON c.id = f.client_id "
+                "WHERE f.chemin = ? AND c.identifiant IS NULL",
+                (chemin,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    """
+                    UPDATE clients SET nom = ?, prenom = ?, age = ?, sexe = ?, taille_cm = ?,
+                        poids_kg = ?, pourcentage_graisse = ?, date_maj = ?
+                    WHERE id = ?
+                    """,
+                    values + (row["id"],)
+                )
+                return row["id"]
+            return self._conn.execute(
+                """
+                INSERT INTO clients (nom, prenom, age, sexe, taille_cm, poids_kg,
+                                     pourcentage_graisse, date_maj)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                values
+            ).lastrowid
+
+        self._conn.execute(
+            """
+            INSERT INTO clients (nom, prenom, age, sexe, taille_cm, poids_kg,
+                                 pourcentage_graisse, date_maj, identifiant)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (identifiant) DO UPDATE SET
+                nom = excluded.nom, prenom = excluded.prenom,
+                age = excluded.age, sexe = excluded.sexe,
+                taille_cm = excluded.taille_cm, poids_kg = excluded.poids_kg,
+                pourcentage_graisse = excluded.pourcentage_graisse,
+                date_maj = excluded.date_maj
+            """,
+            values + (identifiant,)
+        )
+        row = self._conn.execute(
+            "SELECT id FROM clients WHERE identifiant = ?", (identifiant,)
+        ).fetchone()
+        return row["id"]
+
+    def _drop_orphan_clients(self, client_ids: Iterable[int]) -> None:
+        """Supprime les clients sans identifiant dont plus aucune fiche ne dépend"""
+        self._conn.executemany(
+            "DELETE FROM clients WHERE id = ? AND identifiant IS NULL "
+            "AND NOT EXISTS (SELECT 1 FROM fiches WHERE client_id = ?)",
+            [(client_id, client_id) for client_id in set(client_ids)]
+        )
+
+    def _insert_fiche(self, chemin: str, client: ClientData, params: NutritionParams,
+                      results: NutritionResults, date_creation: datetime,
+                      taille_octets: Optional[int], identifiant: Optional[str]) -> FicheMetadata:
+        date_iso = date_creation.isoformat(timespec="seconds")
+        chemin = os.path.abspath(chemin)
+        previous = self._conn.execute(
+            "SELECT client_id FROM fiches WHERE chemin = ?", (chemin,)
+        ).fetchone()
+        client_id = self._upsert_client(client, date_iso, chemin, identifiant)
+        objectif_type = objectif_from_deficit(params.deficit_surplus_kcal)
+
+        self._conn.execute(
+            """
+            INSERT INTO fiches (chemin, nom_fichier, dossier, client_id, date_creation,
+                                objectif_type, calories_objectif, params_json,
+                                results_json, taille_octets)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (chemin) DO UPDATE SET
+                client_id = excluded.client_id, date_creation = excluded.date_creation,
+                objectif_type = excluded.objectif_type,
+                calories_objectif = excluded.calories_objectif,
+                params_json = excluded.params_json, results_json = excluded.results_json,
+                taille_octets = excluded.taille_octets
+            """,
+            (chemin, os.path.basename(chemin), os.path.dirname(chemin), client_id,
+             date_iso, objectif_type, results.calories_objectif,
+             json.dumps(params.to_dict()), json.dumps(results.to_dict()), taille_octets)
+        )
+        if previous is not None and previous["client_id"] != client_id:
+            self._drop_orphan_clients([previous["client_id"]])
+        return FicheMetadata(
+            nom_fichier=os.path.basename(chemin),
+            client_nom=client.nom,
+            client_prenom=client.prenom,
+            date_creation=date_creation,
+            calories_objectif=results.calories_objectif,
+            objectif_type=objectif_type,
+            chemin=chemin
+        )
+
+    def record_fiche(self, chemin: str, client: ClientData, params: NutritionParams,
+                     results: NutritionResults,
+                     date_creation: Optional[datetime] = None,
+                     identifiant: Optional[str] = None) -> FicheMetadata:
+        """
+        Enregistre une fiche produite (et met à jour son client)
+
+        Args:
+            chemin: Chemin du PDF
+            client: Données du client
+            params: Paramètres utilisés
+            results: Résultats des calculs
+            date_creation: Date de génération (défaut: maintenant)
+            identifiant: Identifiant du client (colonne id de la liste) ; sans
+                identifiant, le client n'est rattaché qu'à cette fiche
+
+        Returns:
+            Métadonnées de la fiche
+        """
+        return self.record_fiches([(chemin, client, params, results, date_creation, identifiant)])[0]
+
+    def record_fiches(self, entries: Iterable[Tuple]) -> List[FicheMetadata]:
+        """
+        Enregistre plusieurs fiches dans une seule transaction
+
+        Args:
+            entries: Tuples (chemin, client, params, results, date_creation[, identifiant])
+
+        Returns:
+            Métadonnées des fiches, dans l'ordre
+        """
+        recorded = []
+        with self._lock, self._conn:
+            for entry in entries:
+                chemin, client, params, results, date_creation = entry[:5]
+                identifiant = entry[5] if len(entry) > 5 else None
+                try:
+                    taille = os.path.getsize(chemin)
+                except OSError:
+                    taille = None
+                recorded.append(self._insert_fiche(
+                    chemin, client, params, results, date_creation or datetime.now(), taille,
+                    identifiant
+                ))
+            self._revision += 1
+        return recorded
+
+    def remove_fiche(self, chemin: str) -> None:
+        """Retire une fiche de l'index (le fichier n'est pas supprimé)"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT client_id FROM fiches WHERE chemin = ?", (os.path.abspath(chemin),)
+            ).fetchone()
+            self._conn.execute("DELETE FROM fiches WHERE chemin = ?", (os.path.abspath(chemin),))
+            if row is not None:
+                self._drop_orphan_clients([row["client_id"]])
+            self._revision += 1
+
+    def sync_directory(self, directory: str) -> Dict[str, int]:
+        """
+        Aligne l'index sur le contenu d'un dossier
+
+        Un seul listdir : les PDF absents de l'index sont ajoutés (client
+        deviné depuis le nom de fichier, objectif inconnu : ces fiches sont
+        exclues des filtres par objectif), les entrées dont le fichier a
+        disparu sont retirées. Le parcours du dossier se fait sans verrou et
+        les écritures par lots de SYNCHRO_LOT : les lectures d'un autre thread
+        (l'interface) n'attendent jamais toute la synchronisation.
+
+        Args:
+            directory: Dossier des fiches
+
+        Returns:
+            Nombre de fiches ajoutées et retirées
+        """
+        dossier = os.path.abspath(directory)
+        try:
+            on_disk = {name for name in os.listdir(dossier) if name.endswith(".pdf")}
+        except FileNotFoundError:
+            on_disk = set()
+
+        with self._lock:
+            indexed = {
+                row["nom_fichier"]: row["client_id"] for row in self._conn.execute(
+                    "SELECT nom_fichier, client_id FROM fiches WHERE dossier = ?", (dossier,)
+                )
+            }
+
+        removed = sorted(indexed.keys() - on_disk)
+        added = sorted(on_disk - indexed.keys())
+        counts = {"added": 0, "removed": 0}
+
+        for first in range(0, len(removed), SYNCHRO_LOT):
+            batch = [name for name in removed[first:first + SYNCHRO_LOT]
+                     if not os.path.exists(os.path.join(dossier, name))]  # Recréée entre-temps
+            with self._lock, self._conn:
+                deleted = self._conn.executemany(
+                    "DELETE FROM fiches WHERE chemin = ?",
+                    [(os.path.join(dossier, name),) for name in batch]
+                ).rowcount
+                self._drop_orphan_clients(indexed[name] for name in batch)
+                if deleted:
+                    counts["removed"] += deleted
+                    self._revision += 1
+
+        for first in range(0, len(added), SYNCHRO_LOT):
+            rows = []
+            for name in added[first:first + SYNCHRO_LOT]:
+                try:
+                    stats = os.stat(os.path.join(dossier, name))
+                except OSError:
+                    continue
+                date_iso = datetime.fromtimestamp(stats.st_mtime).isoformat(timespec="seconds")
+                rows.append((name, date_iso, stats.st_size))
+
+            with self._lock, self._conn:
+                inserted = 0
+                for name, date_iso, size in rows:
+                    chemin = os.path.join(dossier, name)
+                    if self._conn.execute("SELECT 1 FROM fiches WHERE chemin = ?", (chemin,)).fetchone():
+                        continue  # Indexée entre-temps (génération en cours)
+                    prenom, nom = guess_client_from_filename(name)
+                    client_id = self._conn.execute(
+                        "INSERT INTO clients (nom, prenom, date_maj) VALUES (?, ?, ?)",
+                        (nom, prenom, date_iso)
+                    ).lastrowid
+                    self._conn.execute(
+                        """
+                        INSERT INTO fiches (chemin, nom_fichier, dossier, client_id,
+                                            date_creation, taille_octets)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        (chemin, name, dossier, client_id, date_iso, size)
+                    )
+                    inserted += 1
+                if inserted:
+                    counts["added"] += inserted
+                    self._revision += 1
+
+        return counts
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+    def version(self) -> Tuple[int, int]:
+        """
+        Jeton de changement de l'index
+
+        Varie après chaque écriture, de ce processus (compteur interne) ou
+        d'un autre (PRAGMA data_version, ex. une génération en ligne de
+        commande) ; la comparaison ne coûte qu'une requête constante.
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        return self._revision, data_version
+
+    @staticmethod
+    def _client_clause(text: str) -> Tuple[str, List[Any]]:
+        """
+        Filtre client : chaque mot doit commencer le nom ou le prénom
+
+        Le premier mot est cherché par plage sur les index des clients, les
+        suivants ne sont vérifiés que sur les clients retenus.
+        """
+        words = text.split()
+        first = words[0]
+        conditions = [
+            "(nom >= ? COLLATE NOCASE AND nom < ? COLLATE NOCASE"
+            " OR prenom >= ? COLLATE NOCASE AND prenom < ? COLLATE NOCASE)"
+        ]
+        args: List[Any] = [first, first + _FIN_PREFIXE, first, first + _FIN_PREFIXE]
+        for word in words[1:]:
+            conditions.append("(nom LIKE ? ESCAPE '\\' OR prenom LIKE ? ESCAPE '\\')")
+            pattern = word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            args.extend([pattern, pattern])
+        return f"f.client_id IN (SELECT id FROM clients WHERE {' AND '.join(conditions)})", args
+
+    def _where(self, client: Optional[str], date_from: Optional[datetime],
+               date_to: Optional[datetime], objectif_type: Optional[str],
+               dossier: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses, args = [], []
+        if client and client.strip():
+            clause, client_args = self._client_clause(client)
+            clauses.append(clause)
+            args.extend(client_args)
+        if date_from:
+            clauses.append("f.date_creation >= ?")
+            args.append(date_from.isoformat(timespec="seconds"))
+        if date_to:
+            clauses.append("f.date_creation < ?")
+            args.append(date_to.isoformat(timespec="seconds"))
+        if objectif_type:
+            if objectif_type not in OBJECTIFS:
+                raise ValueError(f"Objectif inconnu: {objectif_type}")
+            clauses.append("f.objectif_type = ?")
+            args.append(objectif_type)
+        if dossier:
+            clauses.append("f.dossier = ?")
+            args.append(os.path.abspath(dossier))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def query(self, client: Optional[str] = None,
+              date_from: Optional[datetime] = None,
+              date_to: Optional[datetime] = None,
+              objectif_type: Optional[str] = None,
+              dossier: Optional[str] = None,
+              limit: int = 50, offset: int = 0,
+              after: Optional[Tuple[str, int]] = None) -> List[FicheMetadata]:
+        """
+        Fiches triées de la plus récente à la plus ancienne, par page
+
+        Args:
+            client: Début du nom et/ou du prénom du client (sans casse)
+            date_from: Date minimale (incluse)
+            date_to: Date maximale (exclue)
+            objectif_type: 'perte', 'maintenance' ou 'prise' (les fiches d'objectif
+                inconnu, ajoutées par sync_directory, sont exclues)
+            dossier: Restreint à un dossier de sortie
+            limit: Taille de la page
+            offset: Nombre de fiches à sauter
+            after: Clé de la dernière fiche de la page précédente (FicheMetadata.sort_key) ;
+                la page suivante est alors lue directement dans l'index, sans offset
+
+        Returns:
+            Métadonnées des fiches de la page
+        """
+        where, args = self._where(client, date_from, date_to, objectif_type, dossier)
+        if after is not None:
+            where += (" AND " if where else " WHERE ") + "(f.date_creation, f.id) < (?, ?)"
+            args.extend(after)
+        # Les fiches sautées ne sont parcourues que dans l'index des dates,
+        # la jointure avec les clients ne porte que sur la page retenue
+        sql = (
+            "SELECT f.id, f.chemin, f.nom_fichier, f.date_creation, f.calories_objectif, "
+            "f.objectif_type, c.nom, c.prenom "
+            "FROM fiches f JOIN clients c ON c.id = f.client_id "
+            "WHERE f.id IN ("
+            f"SELECT f.id FROM fiches f{where} "
+            "ORDER BY f.date_creation DESC, f.id DESC LIMIT ? OFFSET ?"
+            ") ORDER BY f.date_creation DESC, f.id DESC"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, args + [limit, offset]).fetchall()
+
+        return [
+            FicheMetadata(
+                nom_fichier=row["nom_fichier"],
+                client_nom=row["nom"],
+                client_prenom=row["prenom"],
+                date_creation=datetime.fromisoformat(row["date_creation"]),
+                calories_objectif=row["calories_objectif"] or 0.0,
+                objectif_type=row["objectif_type"],
+                chemin=row["chemin"],
+                fiche_id=row["id"]
+            )
+            for row in rows
+        ]
+
+    def count(self, client: Optional[str] = None,
+              date_from: Optional[datetime] = None,
+              date_to: Optional[datetime] = None,
+              objectif_type: Optional[str] = None,
+              dossier: Optional[str] = None) -> int:
+        """Nombre de fiches correspondant aux filtres (voir query)"""
+        where, args = self._where(client, date_from, date_to, objectif_type, dossier)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM fiches f{where}", args).fetchone()[0]
+
+    def get_details(self, chemin: str) -> Optional[Dict[str, Any]]:
+        """
+        Paramètres et résultats enregistrés pour une fiche
+
+        Args:
+            chemin: Chemin du PDF
+
+        Returns:
+            Dictionnaire {'params', 'results'} ou None si inconnue
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT params_json, results_json FROM fiches WHERE chemin = ?",
+                (os.path.abspath(chemin),)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "params": json.loads(row["params_json"]) if row["params_json"] else None,
+            "results": json.loads(row["results_json"]) if row["results_json"] else None,
+        }
+
+
+# Index partagés par chemin (un par base)
+_shared_indexes: Dict[str, FicheIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def get_fiche_index(db_path: str = DEFAULT_INDEX_PATH) -> FicheIndex:
+    """Retourne l'index partagé du processus pour cette base"""
+    key = os.path.abspath(db_path)
+    with _shared_lock:
+        index = _shared_indexes.get(key)
+        if index is None:
+            index = FicheIndex(db_path)
+            _shared_indexes[key] = index
+        return index
@@ -0,0 +1,193 @@
+"""
+Préparation des images intégrées aux PDF (logo, graphiques)
+Rééchantillonnage à la taille réellement placée et choix du format selon le contenu
+"""
+
+import hashlib
+import io
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+
+# Au-delà de ce nombre de couleurs (après réduction), l'image est traitée comme une photo (JPEG)
+SEUIL_COULEURS_PHOTO = 4096
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """Image prête à intégrer et octets économisés"""
+    data: bytes
+    format: str  # 'png' ou 'jpeg'
+    size_px: Tuple[int, int]
+    original_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - len(self.data)
+
+
+class ImagePipeline:
+    """
+    Réduit les images PNG avant leur intégration
+
+    - rééchantillonnage à la taille placée pour `target_dpi` (jamais agrandie)
+    - canal alpha supprimé quand l'image est entièrement opaque
+    - PNG à palette pour les aplats (graphiques, logo), JPEG pour les photos
+    Les résultats sont gardés en cache par empreinte des octets d'origine.
+    """
+
+    def __init__(self, target_dpi: int = 200, jpeg_quality: int = 85,
+                 enabled: bool = True, cache_entries: int = 128):
+        """
+        Initialise le pipeline
+
+        Args:
+            target_dpi: Résolution visée à la taille imprimée
+            jpeg_quality: Qualité JPEG (1-95)
+            enabled: False pour intégrer les images telles quelles
+            cache_entries: Nombre d'images préparées gardées en mémoire
+        """
+        self.target_dpi = target_dpi
+        self.jpeg_quality = jpeg_quality
+        self.enabled = enabled
+        self.cache_entries = cache_entries
+        self._cache: "OrderedDict[tuple, PreparedImage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def target_size(self, width_pt: float, height_pt: float) -> Tuple[int, int]:
+        """Taille en pixels d'une image placée sur width_pt x height_pt points"""
+        return (
+            max(1, math.ceil(width_pt / 72 * self.target_dpi)),
+            max(1, math.ceil(height_pt / 72 * self.target_dpi)),
+        )
+
+    def prepare(self, png_data: bytes, width_pt: float, height_pt: float) -> PreparedImage:
+        """
+        Image optimisée pour sa taille de placement
+
+        Args:
+            png_data: Octets PNG d'origine
+            width_pt: Largeur placée (points)
+            height_pt: Hauteur placée (points)
+
+        Returns:
+            Image préparée (l'originale si l'optimisation n'apporte rien)
+        """
+        if not self.enabled:
+            return PreparedImage(png_data, "png", (0, 0), len(png_data))
+
+        key = (hashlib.sha1(png_data).digest(), self.target_size(width_pt, height_pt),
+               self.target_dpi, self.jpeg_quality)
+        with self._lock:
+            prepared = self._cache.get(key)
+            if prepared is not None:
+                self._cache.move_to_end(key)
+                return prepared
+
+        prepared = self._optimize(png_data, key[1])
+        with self._lock:
+            self._cache[key] = prepared
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return prepared
+
+    def _optimize(self, png_data: bytes, target: Tuple[int, int]) -> PreparedImage:
+        from PIL import Image as PILImage
+
+        with PILImage.open(io.BytesIO(png_data)) as source:
+            image = source.convert("RGBA")
+        width, height = image.size
+
+        # Échelle commune aux deux axes (le PDF étire ensuite à la taille placée)
+        scale = min(1.0, max(target[0] / width, target[1] / height))
+        if scale < 1.0:
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            image = image.resize(size, PILImage.LANCZOS)
+
+        opaque = image.getextrema()[3][0] == 255
+        if opaque:
+            image = image.convert("RGB")
+
+        colors = image.getcolors(SEUIL_COULEURS_PHOTO)
+        if opaque and colors is None:
+            data, format = self._encode_jpeg(image), "jpeg"
+        else:
+            exact = colors is not None and len(colors) <= 256
+            data, format = self._encode_palette_png(image, exact), "png"
+
+        if len(data) >= len(png_data):
+            with PILImage.open(io.BytesIO(png_data)) as source:
+                return PreparedImage(png_data, "png", source.size, len(png_data))
+        return PreparedImage(data, format, image.size, len(png_data))
+
+    def _encode_jpeg(self, image) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=self.jpeg_quality, optimize=True)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _encode_palette_png(image, exact: bool) -> bytes:
+        """PNG 256 couleurs (aplats et anticrénelage des graphiques)"""
+        from PIL import Image as PILImage
+
+        method = PILImage.Quantize.FASTOCTREE if image.mode == "RGBA" else PILImage.Quantize.MEDIANCUT
+        palette = image.quantize(colors=256, method=method,
+                                 dither=PILImage.Dither.NONE if exact else PILImage.Dither.FLOYDSTEINBERG)
+        buffer = io.BytesIO()
+        palette.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+# Pipelines partagés du processus, par configuration
+_shared_pipelines: Dict[tuple, ImagePipeline] = {}
+_shared_lock = threading.Lock()
+
+
+def get_image_pipeline(target_dpi: int = 200, jpeg_quality: int = 85,
+                       enabled: bool = True) -> ImagePipeline:
+    """Retourne le pipeline partagé du processus pour cette configuration"""
+    key = (target_dpi, jpeg_quality, enabled)
+    with _shared_lock:
+        pipeline = _shared_pipelines.get(key)
+        if pipeline is None:
+            pipeline = ImagePipeline(target_dpi, jpeg_quality, enabled)
+            _shared_pipelines[key] = pipeline
+        return pipeline
+
+
+@dataclass
+class ImageReport:
+    """Bilan des images d'une fiche ou d'un document"""
+    images: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+    def add(self, prepared: PreparedImage) -> None:
+        self.images += 1
+        self.bytes_before += prepared.original_bytes
+        self.bytes_after += len(prepared.data)
+
+    def merge(self, other: "ImageReport") -> None:
+        """Ajoute le bilan d'un autre ensemble d'images"""
+        self.images += other.images
+        self.bytes_before += other.bytes_before
+        self.bytes_after += other.bytes_after
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "images": self.images,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -0,0 +1,246 @@
+"""
+Mises en page déclaratives des fiches
+La description (config/layouts.json) est compilée une fois en plan de rendu ;
+par client, seules les sections qui dépendent des données sont construites
+"""
+
+import copy
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from reportlab.platypus import PageBreak, Paragraph, Spacer
+
+from core.image_pipeline import ImageReport
+
+
+# Description des variantes, à côté de settings.json
+LAYOUTS_FILENAME = "layouts.json"
+
+# Données qu'une section peut recevoir (dans cet ordre d'appel si listées ainsi)
+ENTREES = ("client", "results", "params", "conseils")
+
+# Types d'éléments d'une page (une seule clé de type par élément)
+TYPES_ELEMENTS = ("spacer", "title", "text", "separator", "static", "section")
+
+
+def default_layouts_path() -> str:
+    """Description livrée avec l'application (config/layouts.json)"""
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(os.path.dirname(module_dir), "config", LAYOUTS_FILENAME)
+
+
+def layouts_path(config_path: Optional[str]) -> str:
+    """
+    Description à utiliser pour une configuration
+
+    Args:
+        config_path: Chemin de settings.json (None pour le défaut)
+
+    Returns:
+        layouts.json du même dossier s'il existe, sinon celui de l'application
+    """
+    if config_path:
+        candidate = os.path.join(os.path.dirname(os.path.abspath(config_path)), LAYOUTS_FILENAME)
+        if os.path.exists(candidate):
+            return candidate
+    return default_layouts_path()
+
+
+def load_layouts(path: str) -> Dict[str, Any]:
+    """Lit et valide une description de mises en page"""
+    with open(path, "r", encoding="utf-8") as handler:
+        layouts = json.load(handler)
+    validate_layouts(layouts)
+    return layouts
+
+
+def _element_type(element: Mapping[str, Any]) -> str:
+    kinds = [kind for kind in TYPES_ELEMENTS if kind in element]
+    if len(kinds) != 1:
+        raise ValueError(f"Élément de mise en page invalide: {dict(element)}")
+    return kinds[0]
+
+
+def validate_layouts(layouts: Mapping[str, Any]) -> None:
+    """
+    Vérifie la structure d'une description (sans résoudre les constructeurs)
+
+    Raises:
+        ValueError: Variante, page ou élément mal formé
+    """
+    if not isinstance(layouts, Mapping) or not layouts:
+        raise ValueError("La description des mises en page doit définir au moins une variante")
+    for variante, layout in layouts.items():
+        if not isinstance(layout, Mapping) or not layout.get("title"):
+            raise ValueError(f"Variante {variante}: titre du document manquant")
+        pages = layout.get("pages")
+        if not isinstance(pages, Sequence) or not pages:
+            raise ValueError(f"Variante {variante}: aucune page")
+        for page in pages:
+            if not isinstance(page, Sequence):
+                raise ValueError(f"Variante {variante}: une page doit être une liste d'éléments")
+            for element in page:
+                if not isinstance(element, Mapping):
+                    raise ValueError(f"Variante {variante}: élément invalide {element!r}")
+                kind = _element_type(element)
+                if kind == "text" and "style" not in element:
+                    raise ValueError(f"Variante {variante}: style manquant pour {element['text']!r}")
+                if kind == "section":
+                    unknown = set(element.get("inputs", ())) - set(ENTREES)
+                    if unknown:
+                        raise ValueError(
+                            f"Variante {variante}: entrées inconnues {sorted(unknown)} "
+                            f"pour {element['section']}"
+                        )
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    """Étape d'un plan : éléments fixes (copiés à chaque fiche) ou section construite par fiche"""
+    fixed: Tuple[Any, ...] = ()
+    section: Optional[Callable[..., Any]] = None
+    name: str = ""
+    inputs: Tuple[str, ...] = ()
+    dependencies: Optional[Tuple[str, ...]] = None  # Déclarées par depends_on (None : toutes les entrées)
+
+    def call(self, inputs: Mapping[str, Any]) -> Any:
+        """Construit la section avec les données d'une fiche"""
+        return self.section(*(inputs[name] for name in self.inputs))
+
+
+@dataclass(frozen=True)
+class RenderPlan:
+    """
+    Plan de rendu compilé d'une variante
+
+    Les éléments fixes (titres, légendes, espaces, séparateurs, en-tête) sont
+    construits à la compilation ; `build` n'en fait que des copies
+    superficielles, puis appelle les sections dans l'ordre de la description.
+    """
+    variante: str
+    title: str
+    label: str
+    steps: Tuple[PlanStep, ...]
+    # Images des éléments fixes (logo de l'en-tête), à reporter dans le bilan de chaque fiche
+    images: ImageReport = field(default_factory=ImageReport)
+
+    @property
+    def sections(self) -> int:
+        """Nombre de sections construites par fiche"""
+        return sum(1 for step in self.steps if step.section is not None)
+
+    def build(self, inputs: Mapping[str, Any],
+              run_section: Optional[Callable[[PlanStep, Mapping[str, Any]], Any]] = None) -> List[Any]:
+        """
+        Story d'une fiche
+
+        Args:
+            inputs: Données de la fiche (client, results, params, conseils)
+            run_section: Construit une section à la place de `step.call` (cache)
+
+        Returns:
+            Liste de flowables
+        """
+        story: List[Any] = []
+        for step in self.steps:
+            if step.section is None:
+                story.extend(copy.copy(flowable) for flowable in step.fixed)
+                continue
+            produced = run_section(step, inputs) if run_section else step.call(inputs)
+            if isinstance(produced, list):
+                story.extend(produced)
+            else:
+                story.append(produced)
+        return story
+
+
+def compile_layout(variante: str, layout: Mapping[str, Any], generator: Any,
+                   variables: Optional[Mapping[str, Any]] = None) -> RenderPlan:
+    """
+    Compile la description d'une variante pour un générateur
+
+    Les textes sont formatés avec `variables` (ex. {weeks}), les styles et
+    les constructeurs sont résolus sur `generator` ; les éléments fixes sont
+    construits ici, une seule fois.
+
+    Args:
+        variante: Nom de la variante
+        layout: Description de la variante (title, label, pages)
+        generator: PremiumPDFGenerator fournissant styles et constructeurs
+        variables: Valeurs des champs {nom} des textes
+
+    Returns:
+        Plan de rendu réutilisable
+
+    Raises:
+        ValueError: Constructeur ou style inconnu
+    """
+    variables = dict(variables or {})
+    steps: List[PlanStep] = []
+    fixed: List[Any] = []
+    decorative: Optional[Dict[str, Any]] = None
+
+    def resolve(name: str) -> Callable[..., Any]:
+        builder = getattr(generator, name, None)
+        if not callable(builder):
+            raise ValueError(f"Variante {variante}: constructeur inconnu {name}")
+        return builder
+
+    def style(name: str):
+        if name not in generator.styles:
+            raise ValueError(f"Variante {variante}: style inconnu {name}")
+        return generator.styles[name]
+
+    def add_fixed(produced: Any) -> None:
+        if isinstance(produced, list):
+            fixed.extend(produced)
+        else:
+            fixed.append(produced)
+
+    for page_number, page in enumerate(layout["pages"]):
+        if page_number:
+            fixed.append(PageBreak())
+        for element in page:
+            kind = _element_type(element)
+            if kind == "spacer":
+                fixed.append(Spacer(1, element["spacer"]))
+            elif kind == "title":
+                text = element["title"].format(**variables)
+                if "style" in element:
+                    fixed.append(Paragraph(text, style(element["style"])))
+                else:
+                    fixed.append(generator.create_centered_section_title(text))
+            elif kind == "text":
+                fixed.append(Paragraph(element["text"].format(**variables), style(element["style"])))
+            elif kind == "separator":
+                if decorative is None:
+                    decorative = generator.add_decorative_elements()
+                separator = decorative.get(f"{element['separator']}_separator")
+                if separator is None:
+                    raise ValueError(f"Variante {variante}: séparateur inconnu {element['separator']}")
+                fixed.append(separator)
+            elif kind == "static":
+                add_fixed(resolve(element["static"])())
+            else:
+                if fixed:
+                    steps.append(PlanStep(fixed=tuple(fixed)))
+                    fixed = []
+                section = resolve(element["section"])
+                dependencies = getattr(section, "section_inputs", None)
+                steps.append(PlanStep(
+                    section=section,
+                    name=element["section"],
+                    inputs=tuple(element.get("inputs", ())),
+                    dependencies=tuple(dependencies) if dependencies is not None else None,
+                ))
+    if fixed:
+        steps.append(PlanStep(fixed=tuple(fixed)))
+
+    return RenderPlan(
+        variante=variante,
+        title=layout["title"],
+        label=layout.get("label", variante),
+        steps=tuple(steps),
+    )
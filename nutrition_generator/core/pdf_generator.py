@@ -6,11 +6,15 @@ Correction de tous les problèmes d'affichage de code et objets Python.
 from __future__ import annotations
 
 import os
+import copy
 import json
 import math
 import io
+import functools
+import threading
+from dataclasses import replace
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 
 import numpy as np
 
@@ -32,6 +36,7 @@ from reportlab.platypus import (
     TableStyle,
     Image,
     PageBreak,
+    Flowable,
 )
 from reportlab.graphics.shapes import Drawing, Rect, Line, Circle
 from reportlab.lib.utils import ImageReader
@@ -44,18 +49,98 @@ from core.data_models import (
     NIVEAUX_ACTIVITE,
 )
 from core.calculations import NutritionCalculator
+from core.chart_cache import ChartCache, get_chart_cache
+from core.image_pipeline import ImagePipeline, ImageReport, get_image_pipeline
+from core.layouts import PlanStep, RenderPlan, compile_layout, layouts_path, load_layouts
+from core.vector_charts import build_pie_drawing, build_weight_drawing
+from core.pdf_stream import LazyStory, OutlineEntry, SharedImage
+from core.render_context import RenderContext, file_signature, freeze, get_render_context
+from core.section_cache import (
+    SECTIONS_EN_CACHE, SectionCache, SectionReport, dependency_key, depends_on
+)
+from core.tracing import get_tracer, traced
+from core.thumbnails import FirstPageLayout
+from core.weight_simulation import HORIZON_PAR_DEFAUT, WeightSimulator
+
+
+# Style matplotlib des graphiques, appliqué une seule fois par processus
+MATPLOTLIB_STYLE = {
+    "font.family": "sans-serif",
+    "font.sans-serif": ["Helvetica", "Arial", "DejaVu Sans"],
+    "font.size": 10,
+    "axes.titleweight": "bold",
+    "axes.edgecolor": "#D8DDE5",
+    "axes.labelcolor": "#2C3E50",
+    "axes.grid": True,
+    "grid.color": "#E5E8EB",
+    "grid.linestyle": "--",
+    "grid.alpha": 0.45,
+    "axes.spines.top": False,
+    "axes.spines.right": False,
+    "axes.spines.left": False,
+    "axes.spines.bottom": False,
+    "legend.frameon": False,
+    "figure.autolayout": False,
+}
+
+_matplotlib_style_applied = False
+
+
+def _apply_matplotlib_style() -> None:
+    global _matplotlib_style_applied
+    if not _matplotlib_style_applied:
+        plt.rcParams.update(MATPLOTLIB_STYLE)
+        _matplotlib_style_applied = True
+
+
+# Variantes sans description dans layouts.json, rendues comme leur cible
+# (même chaîne que generate_premium_pdf -> professional -> perfect_2page -> sublime)
+ALIAS_VARIANTES = {"premium": "sublime"}
+
+# Entrées de la projection du poids (WeightSimulator.simulate_client)
+ENTREES_PROJECTION = (
+    "client.poids_kg", "client.taille_cm", "client.age", "client.sexe", "client.pourcentage_graisse",
+    "params.deficit_surplus_kcal", "params.facteur_activite", "params.formule_metabolisme",
+)
+
+# pyplot (figure courante) n'est pas utilisable depuis plusieurs threads à la fois
+_PYPLOT_LOCK = threading.RLock()
+
+
+def _pyplot_exclusive(func):
+    """Sérialise les rendus matplotlib entre threads (générations simultanées)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _PYPLOT_LOCK:
+            return func(*args, **kwargs)
+    return wrapper
 
 
 class PremiumPDFGenerator:
     """Générateur PDF SANS BUGS - Version corrigée."""
 
     def __init__(self, config_path: Optional[str] = None) -> None:
-        self.config = self._load_config(config_path)
-        self.colors = self._define_color_palette()
-        self.styles = self._build_style_guide()
-        self._add_clean_styles()  # Ajouter les styles clean
+        # Config, palette, styles et logo partagés entre instances (voir render_context)
+        self.render_context = get_render_context(config_path, self._create_render_context)
+        self.config = self.render_context.config
+        # Copies superficielles : une instance peut redéfinir un style sans toucher aux autres
+        self.colors = dict(self.render_context.colors)
+        self.styles = dict(self.render_context.styles)
         self.calculator = NutritionCalculator()
-        self.logo_path = self._resolve_logo_path()
+        self.chart_cache = self._build_chart_cache()
+        self.image_pipeline = self._build_image_pipeline()
+        self.weight_simulator = self._build_weight_simulator()
+        self.projection_weeks = int(
+            self._weight_projection_config().get("weeks", HORIZON_PAR_DEFAUT)
+        )
+        self.section_cache = self._build_section_cache()
+        # Images de la fiche en cours et de la dernière fiche rendue, par thread
+        self._render_state = threading.local()
+        # 'matplotlib' (PNG rastérisés) ou 'vector' (dessins ReportLab natifs)
+        self.chart_backend = self.config.get("pdf_settings", {}).get("chart_backend", "matplotlib")
+        self.logo_path = self.render_context.logo_path
+        # Variante -> description (title, label, pages), compilée à la demande en RenderPlan
+        self.layouts = self.render_context.layouts
         self.include_logo = True  # ACTIVER le logo
         self.section_spacing = 8  # COMPACTER l'espacement
 
@@ -74,26 +159,7 @@ class PremiumPDFGenerator:
             "weight": "\U0001F4C8",
         }
 
-        plt.rcParams.update(
-            {
-                "font.family": "sans-serif",
-                "font.sans-serif": ["Helvetica", "Arial", "DejaVu Sans"],
-                "font.size": 10,
-                "axes.titleweight": "bold",
-                "axes.edgecolor": "#D8DDE5",
-                "axes.labelcolor": "#2C3E50",
-                "axes.grid": True,
-                "grid.color": "#E5E8EB",
-                "grid.linestyle": "--",
-                "grid.alpha": 0.45,
-                "axes.spines.top": False,
-                "axes.spines.right": False,
-                "axes.spines.left": False,
-                "axes.spines.bottom": False,
-                "legend.frameon": False,
-                "figure.autolayout": False,
-            }
-        )
+        _apply_matplotlib_style()
 
     # ------------------------------------------------------------------
     # Configuration & palette
@@ -103,14 +169,62 @@ class PremiumPDFGenerator:
             os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         )
 
-    def _load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
+    def _create_render_context(self, config_path: Optional[str]) -> RenderContext:
+        """Construit config, palette, styles et logo (une fois par processus et par config)"""
+        source_path = self._resolve_config_path(config_path)
+        self.config = self._load_config(config_path)
+        self.colors = self._define_color_palette()
+        self.styles = self._build_style_guide()
+        self._add_clean_styles()  # Ajouter les styles clean
+
+        logo_path = self._resolve_logo_path()
+        logo_png, logo_size_px = self._encode_logo(logo_path)
+        layouts_file = layouts_path(source_path)
+
+        # Fichiers surveillés : config, mises en page, logo retenu et emplacements prioritaires du logo
+        watched = [source_path, layouts_file, logo_path] + self._logo_candidates()
+        return RenderContext(
+            config=freeze(self.config),
+            colors=freeze(self.colors),
+            styles=freeze(self.styles),
+            logo_path=logo_path,
+            logo_png=logo_png,
+            logo_size_px=logo_size_px,
+            layouts=freeze(load_layouts(layouts_file)),
+            sources=tuple(file_signature(path) for path in dict.fromkeys(watched)),
+        )
+
+    @traced(cat="image")
+    def _encode_logo(self, logo_path: Optional[str]) -> Tuple[Optional[bytes], Optional[Tuple[int, int]]]:
+        """Logo converti en RGBA et encodé en PNG une seule fois"""
+        if not logo_path:
+            return None, None
+        try:
+            from PIL import Image as PILImage
+            with PILImage.open(logo_path) as pil_logo:
+                pil_logo = pil_logo.convert("RGBA")
+                if pil_logo.size[0] == 0 or pil_logo.size[1] == 0:
+                    return None, None
+                buffer = io.BytesIO()
+                pil_logo.save(buffer, format="PNG")
+                return buffer.getvalue(), pil_logo.size
+        except Exception:
+            return None, None
+
+    def _resolve_config_path(self, config_path: Optional[str]) -> Optional[str]:
         if config_path and os.path.exists(config_path):
-            return self._read_config(config_path)
+            return config_path
 
         module_dir = os.path.dirname(os.path.abspath(__file__))
         default_path = os.path.join(os.path.dirname(module_dir), "config", "settings.json")
         if os.path.exists(default_path):
-            return self._read_config(default_path)
+            return default_path
+        return None
+
+    def _load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
+        source_path = self._resolve_config_path(config_path)
+        if source_path:
+            return self._read_config(source_path)
 
         return {
             "coach_info": {
@@ -140,15 +254,106 @@ class PremiumPDFGenerator:
         )
         return config
 
+    def _build_chart_cache(self) -> ChartCache:
+        """Cache des graphiques configuré par pdf_settings.chart_cache"""
+        cache_config = self.config.get("pdf_settings", {}).get("chart_cache", {})
+        disk_dir = cache_config.get("disk_dir")
+        if disk_dir and not os.path.isabs(disk_dir):
+            disk_dir = os.path.join(self._project_root(), disk_dir)
+        return get_chart_cache(
+            disk_dir=disk_dir,
+            memory_budget_bytes=int(cache_config.get("memory_budget_mb", 32) * 1024 * 1024),
+            enabled=cache_config.get("enabled", True),
+            disk_budget_bytes=int(cache_config.get("disk_budget_mb", 64) * 1024 * 1024),
+        )
+
+    def _build_image_pipeline(self) -> ImagePipeline:
+        """Pipeline d'images configuré par pdf_settings.images"""
+        image_config = self.config.get("pdf_settings", {}).get("images", {})
+        return get_image_pipeline(
+            target_dpi=int(image_config.get("target_dpi", 200)),
+            jpeg_quality=int(image_config.get("jpeg_quality", 85)),
+            enabled=image_config.get("enabled", True),
+        )
+
+    def _build_section_cache(self) -> SectionCache:
+        """Cache des sections configuré par pdf_settings.section_cache (propre à l'instance)"""
+        cache_config = self.config.get("pdf_settings", {}).get("section_cache", {})
+        return SectionCache(
+            max_entries=int(cache_config.get("max_entries", SECTIONS_EN_CACHE)),
+            enabled=cache_config.get("enabled", True),
+        )
+
+    def _weight_projection_config(self) -> Dict[str, Any]:
+        return self.config.get("pdf_settings", {}).get("weight_projection", {})
+
+    def _build_weight_simulator(self) -> WeightSimulator:
+        """Simulateur de poids configuré par pdf_settings.weight_projection"""
+        projection_config = self._weight_projection_config()
+        return WeightSimulator(float(projection_config.get("metabolic_adaptation", 0.0)))
+
+    def _weight_projection(self, client: ClientData, params: Dict[str, Any]) -> List[float]:
+        """Poids projeté semaine par semaine (semaine 0 incluse) sur projection_weeks"""
+        projection = self.weight_simulator.simulate_client(client, params, self.projection_weeks)
+        return projection.row(0)
+
+    def _weekly_weight_change(self, client: ClientData, params: Dict[str, Any]) -> float:
+        """Variation moyenne par semaine sur l'horizon de projection (kg)"""
+        weights = self._weight_projection(client, params)
+        return (weights[-1] - weights[0]) / (len(weights) - 1)
+
+    @property
+    def _image_report(self) -> ImageReport:
+        """Bilan des images de la fiche en cours de rendu dans ce thread"""
+        state = self._render_state
+        if not hasattr(state, "image_report"):
+            state.image_report = ImageReport()
+        return state.image_report
+
+    @_image_report.setter
+    def _image_report(self, report: ImageReport) -> None:
+        self._render_state.image_report = report
+
+    @property
+    def last_image_report(self) -> ImageReport:
+        """Bilan des images de la dernière fiche rendue dans ce thread (octets avant / après)"""
+        return getattr(self._render_state, "last_image_report", ImageReport())
+
+    @last_image_report.setter
+    def last_image_report(self, report: ImageReport) -> None:
+        self._render_state.last_image_report = report
+
+    @property
+    def last_section_report(self) -> SectionReport:
+        """Sections recalculées ou reprises du cache pour la dernière fiche rendue dans ce thread"""
+        return getattr(self._render_state, "last_section_report", SectionReport())
+
+    def _begin_sections(self) -> None:
+        self._render_state.section_report = SectionReport()
+        self._render_state.borrowed_sections = []
+
+    def _end_sections(self) -> None:
+        """Rend au cache les sections empruntées par le rendu terminé"""
+        state = self._render_state
+        self.section_cache.release(getattr(state, "borrowed_sections", []))
+        state.borrowed_sections = []
+        state.last_section_report = getattr(state, "section_report", None) or SectionReport()
+        state.section_report = None
+
+    def _logo_candidates(self) -> List[str]:
+        """Emplacements prioritaires du logo (racine du projet)"""
+        project_root = self._project_root()
+        return [
+            os.path.join(project_root, "Logo.png"),
+            os.path.join(project_root, "logo.png"),
+        ]
+
     def _resolve_logo_path(self) -> Optional[str]:
         """Résoudre le chemin du logo - PRIORITÉ à Logo.png racine"""
         project_root = self._project_root()
 
         # PRIORITÉ ABSOLUE au Logo.png de la racine
-        priority_paths = [
-            os.path.join(project_root, "Logo.png"),
-            os.path.join(project_root, "logo.png"),
-        ]
+        priority_paths = self._logo_candidates()
 
         for path_candidate in priority_paths:
             if os.path.exists(path_candidate):
@@ -156,7 +361,7 @@ class PremiumPDFGenerator:
 
         # Fallback sur config si Logo.png introuvable
         branding = self.config.get("branding")
-        if isinstance(branding, dict):
+        if isinstance(branding, Mapping):
             candidate = branding.get("logo_path")
             if candidate:
                 if not os.path.isabs(candidate):
@@ -429,64 +634,30 @@ class PremiumPDFGenerator:
         )
         return Paragraph(text, self.styles["body"])
 
-    def _build_logo_compact(self) -> Optional[Image]:
-        """Logo compact pour header optimisé"""
-        if not self.logo_path:
+    def _logo_image(self, max_side: float, h_align: str) -> Optional[Image]:
+        """Logo à partir des octets PNG du contexte (pas de relecture du fichier)"""
+        context = self.render_context
+        if not self.logo_path or not context.logo_png:
             return None
-        try:
-            from PIL import Image as PILImage
-            with PILImage.open(self.logo_path) as pil_logo:
-                pil_logo = pil_logo.convert("RGBA")
-                width_px, height_px = pil_logo.size
-                if width_px == 0 or height_px == 0:
-                    return None
-
-                # TAILLE COMPACTE pour header
-                target_size = 2.2 * cm  # Plus petit
-                aspect = width_px / height_px
-                if aspect >= 1.0:
-                    target_width = target_size
-                    target_height = target_size / aspect
-                else:
-                    target_height = target_size
-                    target_width = target_size * aspect
 
-                buffer = io.BytesIO()
-                pil_logo.save(buffer, format="PNG")
-                buffer.seek(0)
+        width_px, height_px = context.logo_size_px
+        aspect = width_px / height_px
+        if aspect >= 1.0:
+            target_width = max_side
+            target_height = max_side / aspect
+        else:
+            target_height = max_side
+            target_width = max_side * aspect
 
-            logo = Image(buffer, width=target_width, height=target_height)
-            logo.hAlign = "CENTER"
-            return logo
-        except Exception:
-            return None
+        return self._image_from_png(context.logo_png, target_width, target_height, h_align)
+
+    def _build_logo_compact(self) -> Optional[Image]:
+        """Logo compact pour header optimisé"""
+        # TAILLE COMPACTE pour header
+        return self._logo_image(2.2 * cm, "CENTER")
 
     def _build_logo(self) -> Optional[Image]:
-        if not self.logo_path:
-            return None
-        try:
-            from PIL import Image as PILImage
-            with PILImage.open(self.logo_path) as pil_logo:
-                pil_logo = pil_logo.convert("RGBA")
-                width_px, height_px = pil_logo.size
-                if width_px == 0 or height_px == 0:
-                    return None
-                max_side = 2.8 * cm
-                aspect = width_px / height_px
-                if aspect >= 1.0:
-                    target_width = max_side
-                    target_height = max_side / aspect
-                else:
-                    target_height = max_side
-                    target_width = max_side * aspect
-                buffer = BytesIO()
-                pil_logo.save(buffer, format="PNG")
-                buffer.seek(0)
-            logo = Image(buffer, width=target_width, height=target_height)
-            logo.hAlign = "LEFT"
-            return logo
-        except Exception:
-            return None
+        return self._logo_image(2.8 * cm, "LEFT")
 
     def _decorative_separator(self, width: float, primary: Color, accent: Color) -> Drawing:
         drawing = Drawing(width, 0.45 * cm)
@@ -496,9 +667,19 @@ class PremiumPDFGenerator:
         drawing.add(Circle(width - 0.25 * cm, 0.22 * cm, 0.12 * cm, fillColor=accent, strokeColor=None))
         drawing.add(Line(0.55 * cm, 0.35 * cm, width - 0.55 * cm, 0.35 * cm, strokeColor=self._tint_color(accent, 0.35), strokeWidth=1))
         return drawing
+
+    @traced(cat="image")
+    def _image_from_png(self, png_data: bytes, width: float, height: float, h_align: str = "CENTER") -> Image:
+        """Image ReportLab à partir d'octets PNG, réduite à sa taille de placement"""
+        prepared = self.image_pipeline.prepare(png_data, width, height)
+        self._image_report.add(prepared)
+        img = SharedImage(prepared.data, width, height)
+        img.hAlign = h_align
+        return img
     # ------------------------------------------------------------------
     # Header
     # ------------------------------------------------------------------
+    @traced()
     def create_perfect_header(self) -> Table:
         """Header avec contact compact pour éviter le débordement selon le prompt d'enrichissement"""
         coach_info = self.config.get("coach_info", {})
@@ -583,6 +764,7 @@ class PremiumPDFGenerator:
         )
 
     # Alias pour compatibilité
+    @traced()
     def create_clean_header(self) -> Table:
         return self.create_perfect_header()
 
@@ -678,6 +860,9 @@ class PremiumPDFGenerator:
     # ------------------------------------------------------------------
     # Besoins caloriques
     # ------------------------------------------------------------------
+    @traced()
+    @depends_on("results.bmr", "results.calories_maintenance", "results.calories_objectif",
+                "params.deficit_surplus_kcal", "params.facteur_activite", "params.formule_metabolisme")
     def create_cards_with_colored_borders(self, results: NutritionResults, params: Dict[str, Any]) -> Table:
         """Cards énergétiques avec bordures colorées distinctives selon le prompt sublime"""
         formula_key = params.get("formule_metabolisme", "mifflin_st_jeor")
@@ -794,9 +979,15 @@ class PremiumPDFGenerator:
         )
 
     # Alias pour compatibilité
+    @traced()
+    @depends_on("results.bmr", "results.calories_maintenance", "results.calories_objectif",
+                "params.deficit_surplus_kcal", "params.facteur_activite", "params.formule_metabolisme")
     def create_energy_cards_no_collision(self, results: NutritionResults, params: Dict[str, Any]) -> Table:
         return self.create_cards_with_colored_borders(results, params)
 
+    @traced()
+    @depends_on("client.nom", "client.prenom", "client.age", "client.sexe", "client.taille_cm", "client.poids_kg",
+                "params.deficit_surplus_kcal", "params.facteur_activite")
     def create_clean_profile_table(self, client: ClientData, results: NutritionResults, params: Dict[str, Any]) -> Table:
         """Table profil propre selon le prompt"""
         deficit = params.get("deficit_surplus_kcal", 0)
@@ -860,6 +1051,9 @@ class PremiumPDFGenerator:
 
         return profile_table
 
+    @traced()
+    @depends_on("client.nom", "client.prenom", "client.age", "client.sexe", "client.taille_cm", "client.poids_kg",
+                "params.deficit_surplus_kcal", "params.facteur_activite")
     def create_enriched_profile(self, client: ClientData, results: NutritionResults, params: Dict[str, Any]) -> Table:
         """Profil enrichi avec informations supplémentaires selon le prompt d'enrichissement"""
         deficit = params.get("deficit_surplus_kcal", 0)
@@ -892,7 +1086,7 @@ class PremiumPDFGenerator:
             ['NOM', client.nom.upper(), 'PRÉNOM', client.prenom.title(), 'ÂGE', f'{client.age} ans'],
             ['TAILLE', f'{client.taille_cm} cm', 'POIDS', f'{self._format_decimal(client.poids_kg, 1)} kg', 'SEXE', 'Homme' if client.sexe == 'male' else 'Femme'],
             ['ACTIVITÉ', activity_text, '', '', 'IMC', f'{imc:.1f} ({imc_category})'],
-            ['OBJECTIF', f'{objectif_text} ({self._format_signed(deficit)} kcal/j)', '', '', 'DURÉE', '12 semaines']
+            ['OBJECTIF', f'{objectif_text} ({self._format_signed(deficit)} kcal/j)', '', '', 'DURÉE', f'{self.projection_weeks} semaines']
         ]
 
         profile_table = Table(profile_data, colWidths=[80, 80, 80, 80, 80, 80])
@@ -915,6 +1109,8 @@ class PremiumPDFGenerator:
 
         return profile_table
 
+    @traced()
+    @depends_on("client.poids_kg", "results.calories_objectif")
     def add_nutritional_targets(self, client: ClientData, results: NutritionResults, params: Dict[str, Any]) -> Table:
         """Objectifs nutritionnels ajustés automatiquement selon le profil"""
 
@@ -948,6 +1144,8 @@ class PremiumPDFGenerator:
 
         return targets_table
 
+    @traced()
+    @depends_on("results.proteines_g", "results.lipides_g", "results.glucides_g", "results.calories_objectif")
     def add_macro_breakdown(self, results: NutritionResults, meal_distribution_data: Dict = None) -> Table:
         """Répartition par repas configurable depuis le formulaire"""
 
@@ -1003,6 +1201,8 @@ class PremiumPDFGenerator:
 
         return meal_table
 
+    @traced()
+    @depends_on("client.poids_kg")
     def add_hydration_guide(self, client: ClientData, results: NutritionResults) -> Table:
         """Ajouter guide d'hydratation détaillé"""
 
@@ -1037,6 +1237,7 @@ class PremiumPDFGenerator:
 
         return hydration_table
 
+    @traced()
     def create_compact_meal_preview(self) -> Table:
         """Aperçu compact de la répartition des repas pour page 1"""
 
@@ -1065,6 +1266,8 @@ class PremiumPDFGenerator:
 
         return preview_table
 
+    @traced()
+    @depends_on("client.poids_kg")
     def add_compact_hydration_summary(self, client: ClientData) -> Table:
         """Résumé compact hydratation pour page 1"""
 
@@ -1093,6 +1296,7 @@ class PremiumPDFGenerator:
 
         return hydration_table
 
+    @traced()
     def add_meal_timing(self) -> Table:
         """Ajouter guide de timing des repas"""
 
@@ -1152,13 +1356,30 @@ class PremiumPDFGenerator:
     # ------------------------------------------------------------------
     # Macros
     # ------------------------------------------------------------------
-    def _create_flat_pie_chart(self, results: NutritionResults) -> Image:
+    @traced(cat="chart")
+    def _create_flat_pie_chart(self, results: NutritionResults) -> Flowable:
         """Pie chart moderne et plat, sans effet 3D selon le prompt"""
         values = [
             results.proteines_kcal,
             results.lipides_kcal,
             results.glucides_kcal,
         ]
+        if self.chart_backend == "vector":
+            drawing = build_pie_drawing(values, 6.0 * cm, label_font_size=9, title_font_size=11)
+            drawing.hAlign = "CENTER"
+            return drawing
+
+        png_data = self.chart_cache.get_or_render(
+            "pie_flat", values, lambda: self._render_flat_pie_png(values)
+        )
+
+        # Créer l'image ReportLab COMPACTE
+        return self._image_from_png(png_data, 6.0 * cm, 6.0 * cm)
+
+    @_pyplot_exclusive
+    @traced(cat="raster")
+    def _render_flat_pie_png(self, values: List[float]) -> bytes:
+        """Rendu matplotlib du pie chart plat"""
         labels = ['Protéines', 'Lipides', 'Glucides']
 
         # Couleurs modernes et contrastées selon le prompt
@@ -1204,18 +1425,14 @@ class PremiumPDFGenerator:
 
         # Sauvegarder en HAUTE RÉSOLUTION
         img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight',
-                   facecolor='white', edgecolor='none')
-        img_buffer.seek(0)
+        with get_tracer().span("savefig_png", "image"):
+            plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight',
+                        facecolor='white', edgecolor='none')
         plt.close(fig)
 
-        # Créer l'image ReportLab COMPACTE
-        img = Image(img_buffer, width=6.0 * cm, height=6.0 * cm)
-        img.hAlign = "CENTER"
-
-        return img
+        return img_buffer.getvalue()
 
-    def _create_premium_pie_chart(self, results: NutritionResults) -> Image:
+    def _create_premium_pie_chart(self, results: NutritionResults) -> Flowable:
         """Wrapper pour compatibilité - utilise la nouvelle version plate"""
         return self._create_flat_pie_chart(results)
 
@@ -1276,6 +1493,9 @@ class PremiumPDFGenerator:
 
         return macro_table
 
+    @traced()
+    @depends_on("results.proteines_g", "results.lipides_g", "results.glucides_g",
+                "results.proteines_kcal", "results.lipides_kcal", "results.glucides_kcal")
     def create_macro_section_side_by_side(self, results: NutritionResults) -> Table:
         """Section macros avec tableau et graphique côte à côte sans collision selon le prompt"""
 
@@ -1353,13 +1573,30 @@ class PremiumPDFGenerator:
 
         return table
 
-    def create_controlled_pie_chart(self, results: NutritionResults) -> Image:
+    @traced(cat="chart")
+    def create_controlled_pie_chart(self, results: NutritionResults) -> Flowable:
         """Pie chart avec taille contrôlée pour éviter collision selon le prompt"""
         values = [
             results.proteines_kcal,
             results.lipides_kcal,
             results.glucides_kcal,
         ]
+        if self.chart_backend == "vector":
+            drawing = build_pie_drawing(values, 5.0 * cm)
+            drawing.hAlign = "CENTER"
+            return drawing
+
+        png_data = self.chart_cache.get_or_render(
+            "pie_controlled", values, lambda: self._render_controlled_pie_png(values)
+        )
+
+        # Image ReportLab CONTRÔLÉE
+        return self._image_from_png(png_data, 5.0 * cm, 5.0 * cm)  # Taille réduite
+
+    @_pyplot_exclusive
+    @traced(cat="raster")
+    def _render_controlled_pie_png(self, values: List[float]) -> bytes:
+        """Rendu matplotlib du pie chart compact"""
         labels = ['Protéines', 'Lipides', 'Glucides']
         colors_flat = ['#2E86AB', '#E74C3C', '#27AE60']
 
@@ -1396,28 +1633,27 @@ class PremiumPDFGenerator:
         plt.tight_layout()
 
         img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=200, bbox_inches='tight',
-                   facecolor='white', edgecolor='none')
-        img_buffer.seek(0)
+        with get_tracer().span("savefig_png", "image"):
+            plt.savefig(img_buffer, format='png', dpi=200, bbox_inches='tight',
+                        facecolor='white', edgecolor='none')
         plt.close(fig)
 
-        # Image ReportLab CONTRÔLÉE
-        img = Image(img_buffer, width=5.0 * cm, height=5.0 * cm)  # Taille réduite
-        img.hAlign = "CENTER"
-
-        return img
+        return img_buffer.getvalue()
 
-    def create_weight_chart_clean(self, client: ClientData, params: Dict[str, Any]) -> Image:
+    @depends_on(*ENTREES_PROJECTION)
+    def create_weight_chart_clean(self, client: ClientData, params: Dict[str, Any]) -> Flowable:
         """Courbe de poids propre selon le prompt"""
         return self._create_weight_chart_with_grid(client, params)
 
+    @traced()
+    @depends_on(*ENTREES_PROJECTION, "results.proteines_g", "results.hydratation_ml")
     def create_conseils_with_colored_borders(self, client: ClientData, results: NutritionResults, params: Dict[str, Any]) -> List[Any]:
         """Conseils avec bordures colorées comme dans l'ancienne version selon le prompt sublime"""
 
         deficit = params.get("deficit_surplus_kcal", 0)
         hydration_l = results.hydratation_ml / 1000.0
         protein_per_kg = results.proteines_g / client.poids_kg if client.poids_kg else 0
-        weekly_delta = (deficit * 7) / 7700.0
+        weekly_delta = self._weekly_weight_change(client, params)
 
         # Déterminer le type d'objectif et ajuster le contenu
         if deficit < -100:
@@ -1504,6 +1740,7 @@ class PremiumPDFGenerator:
         return conseils_story
 
     # Alias pour compatibilité
+    @depends_on(*ENTREES_PROJECTION, "results.proteines_g", "results.hydratation_ml")
     def create_conseils_with_colored_boxes(self, client: ClientData, results: NutritionResults, params: Dict[str, Any]) -> List[Any]:
         return self.create_conseils_with_colored_borders(client, results, params)
 
@@ -1541,6 +1778,8 @@ class PremiumPDFGenerator:
 
         return Paragraph(footer_text, footer_style)
 
+    @traced()
+    @depends_on("date")
     def create_premium_footer(self) -> List[Any]:
         """Footer avec séparateur décoratif selon le prompt sublime"""
         coach_info = self.config.get("coach_info", {})
@@ -1592,9 +1831,12 @@ class PremiumPDFGenerator:
         return footer_elements
 
     # Alias pour compatibilité
+    @traced()
+    @depends_on("date")
     def create_footer_clean(self) -> List[Any]:
         return self.create_premium_footer()
 
+    @traced()
     def add_decorative_elements(self) -> Dict[str, Any]:
         """Ajouter des éléments graphiques comme dans l'ancienne version selon le prompt"""
 
@@ -1798,7 +2040,7 @@ class PremiumPDFGenerator:
     ) -> List[Any]:
         elements: List[Any] = []
         title = Paragraph(
-            f"{self.icons['weight']} EVOLUTION DU POIDS (12 SEMAINES)",
+            f"{self.icons['weight']} EVOLUTION DU POIDS ({self.projection_weeks} SEMAINES)",
             self.styles["section_title"],
         )
         elements.append(title)
@@ -1811,9 +2053,7 @@ class PremiumPDFGenerator:
         elements.append(Spacer(1, 10))
 
         # Texte informatif
-        deficit = params.get("deficit_surplus_kcal", 0)
-        weekly_delta = (deficit * 7) / 7700.0
-        target_weight = client.poids_kg + weekly_delta * 12
+        target_weight = self._weight_projection(client, params)[-1]
         delta_text = target_weight - client.poids_kg
         info_text = (
             f"Poids actuel : {self._format_decimal(client.poids_kg, 1)} kg  "
@@ -1823,15 +2063,39 @@ class PremiumPDFGenerator:
         elements.append(Paragraph(info_text, self.styles["body"]))
         return elements
 
-    def _create_weight_chart_with_grid(self, client: ClientData, params: Dict[str, Any]) -> Image:
+    @traced()
+    @depends_on(*ENTREES_PROJECTION)
+    def _create_weight_chart_with_grid(self, client: ClientData, params: Dict[str, Any]) -> Flowable:
         """Courbe de poids avec grille professionnelle selon le prompt"""
         deficit = params.get("deficit_surplus_kcal", 0)
-        weekly_delta = (deficit * 7) / 7700.0
-        weeks = np.arange(0, 13)
-        current_weight = client.poids_kg
+        weights = self._weight_projection(client, params)
+        if self.chart_backend == "vector":
+            if deficit < -100:
+                color = '#E74C3C'
+            elif deficit > 100:
+                color = '#27AE60'
+            else:
+                color = '#F39C12'
+            drawing = build_weight_drawing(weights, color, 14.0 * cm, 8.0 * cm)
+            drawing.hAlign = "CENTER"
+            return drawing
+
+        png_data = self.chart_cache.get_or_render(
+            "weight_grid",
+            (deficit, *weights),
+            lambda: self._render_weight_chart_png(weights, deficit),
+            persist=False,  # Trajectoire propre au client : rarement relue d'un lancement à l'autre
+        )
 
-        # Évolution principale
-        weights = [current_weight + (i * weekly_delta) for i in weeks]
+        # Créer l'image ReportLab COMPACTE
+        return self._image_from_png(png_data, 14.0 * cm, 8.0 * cm)
+
+    @_pyplot_exclusive
+    @traced(cat="raster")
+    def _render_weight_chart_png(self, weights: List[float], deficit: float) -> bytes:
+        """Rendu matplotlib de la projection de poids (semaine 0 incluse)"""
+        last_week = len(weights) - 1
+        weeks = np.arange(0, last_week + 1)
 
         # ZONE DE TOLÉRANCE ±0.5kg
         poids_min = [poids - 0.5 for poids in weights]
@@ -1875,24 +2139,24 @@ class PremiumPDFGenerator:
         # Points remarquables
         ax.scatter([0], [weights[0]], s=120, color='#2E86AB',
                   zorder=5, label='Poids actuel', edgecolor='white', linewidth=2)
-        ax.scatter([12], [weights[12]], s=120, color='#27AE60',
-                  zorder=5, label='Objectif 12 semaines', edgecolor='white', linewidth=2)
+        ax.scatter([last_week], [weights[-1]], s=120, color='#27AE60',
+                  zorder=5, label=f'Objectif {last_week} semaines', edgecolor='white', linewidth=2)
 
         # Annotations avec style
         ax.annotate(f'{weights[0]:.1f} kg',
-                   xy=(0, weights[0]), xytext=(1, weights[0]+0.4),
+                   xy=(0, weights[0]), xytext=(last_week / 12, weights[0]+0.4),
                    arrowprops=dict(arrowstyle='->', color='#2E86AB', lw=1.5),
                    fontsize=10, fontweight='bold', color='#2E86AB')
 
-        ax.annotate(f'Objectif {weights[12]:.1f} kg',
-                   xy=(12, weights[12]), xytext=(10, weights[12]-0.4),
+        ax.annotate(f'Objectif {weights[-1]:.1f} kg',
+                   xy=(last_week, weights[-1]), xytext=(last_week * 10 / 12, weights[-1]-0.4),
                    arrowprops=dict(arrowstyle='->', color='#27AE60', lw=1.5),
                    fontsize=10, fontweight='bold', color='#27AE60')
 
         # Styling des axes
         ax.set_xlabel('Semaines', fontsize=11, fontweight='bold')
         ax.set_ylabel('Poids (kg)', fontsize=11, fontweight='bold')
-        ax.set_title('Évolution projetée du poids sur 12 semaines',
+        ax.set_title(f'Évolution projetée du poids sur {last_week} semaines',
                     fontsize=12, fontweight='bold', pad=15)
 
         # Légende moderne
@@ -1900,25 +2164,21 @@ class PremiumPDFGenerator:
                  fancybox=True, framealpha=0.9)
 
         # Limites des axes ajustées
-        ax.set_xlim(-0.5, 12.5)
+        ax.set_xlim(-0.5, last_week + 0.5)
         ax.set_ylim(min(poids_min) - 0.5, max(poids_max) + 0.5)
 
         plt.tight_layout()
 
         # Sauvegarder en HAUTE RÉSOLUTION
         img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight',
-                   facecolor='white', edgecolor='none')
-        img_buffer.seek(0)
+        with get_tracer().span("savefig_png", "image"):
+            plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight',
+                        facecolor='white', edgecolor='none')
         plt.close(fig)
 
-        # Créer l'image ReportLab COMPACTE
-        img = Image(img_buffer, width=14.0 * cm, height=8.0 * cm)
-        img.hAlign = "CENTER"
-
-        return img
+        return img_buffer.getvalue()
 
-    def _create_premium_weight_chart(self, client: ClientData, params: Dict[str, Any]) -> Image:
+    def _create_premium_weight_chart(self, client: ClientData, params: Dict[str, Any]) -> Flowable:
         """Wrapper pour compatibilité - utilise la nouvelle version avec grille"""
         return self._create_weight_chart_with_grid(client, params)
 
@@ -1941,7 +2201,7 @@ class PremiumPDFGenerator:
 
         deficit = params.get("deficit_surplus_kcal", 0)
         objectif_type = self.calculator.get_objectif_description(deficit)
-        weekly_delta = (deficit * 7) / 7700.0
+        weekly_delta = self._weekly_weight_change(client, params)
         hydration_l = results.hydratation_ml / 1000.0
         protein_per_kg = results.proteines_g / client.poids_kg if client.poids_kg else 0
 
@@ -2141,80 +2401,302 @@ class PremiumPDFGenerator:
         return self._create_premium_footer()
 
     # ------------------------------------------------------------------
-    # Generation
+    # Stories (contenu des fiches, indépendant de la destination)
     # ------------------------------------------------------------------
-    def generate_clean_layout_pdf(
+    def _render_plan(self, variante: str) -> RenderPlan:
+        """
+        Plan compilé d'une variante (une compilation par thread et par horizon)
+
+        Les éléments fixes d'un plan sont copiés à chaque fiche mais leur
+        contenu (cellules, images) reste partagé : chaque thread a ses plans.
+        """
+        variante = ALIAS_VARIANTES.get(variante, variante)
+        if variante not in self.layouts:
+            raise ValueError(f"Variante inconnue: {variante}")
+        plans = getattr(self._render_state, "plans", None)
+        if plans is None:
+            plans = self._render_state.plans = {}
+        key = (variante, self.projection_weeks)
+        plan = plans.get(key)
+        if plan is None:
+            # Les images des éléments fixes sont relevées à part, puis reportées à chaque fiche
+            report = self._image_report
+            self._image_report = ImageReport()
+            try:
+                with get_tracer().span("compile_layout", "story", variante=variante):
+                    plan = compile_layout(variante, self.layouts[variante], self,
+                                          {"weeks": self.projection_weeks})
+                plan = replace(plan, images=self._image_report)
+            finally:
+                self._image_report = report
+            plans[key] = plan
+        return plan
+
+    @traced(cat="story")
+    def _build_story(
         self,
+        plan: RenderPlan,
         client: ClientData,
         results: NutritionResults,
         params_dict: Dict[str, Any],
-        output_path: str,
         conseils: Optional[List[str]] = None,
-    ) -> str:
-        """Structure PDF sans superposition d'éléments selon le prompt"""
-        try:
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=A4,
-                topMargin=25,
-                bottomMargin=25,
-                leftMargin=25,
-                rightMargin=25,
-                title="Fiche Nutritionnelle Clean Layout - 3 Pages",
-            )
-
-            story: List[Any] = []
-
-            # === PAGE 1 ===
-            # Header propre
-            story.append(self.create_clean_header())
-            story.append(Spacer(1, 20))
-
-            # Profil personnel (section complète)
-            story.append(Paragraph("■ PROFIL PERSONNEL", self.styles["section_title"]))
-            story.append(self.create_clean_profile_table(client, results, params_dict))
-            story.append(Spacer(1, 20))
+    ) -> List[Any]:
+        """Story d'une fiche : éléments fixes du plan et sections construites pour ce client"""
+        self._image_report.merge(plan.images)
+        inputs = {"client": client, "results": results, "params": params_dict, "conseils": conseils}
+        # Cache des sections pendant un rendu seulement (emprunts rendus à la fin de doc.build)
+        in_render = getattr(self._render_state, "section_report", None) is not None
+        return plan.build(inputs, self._run_section if in_render else None)
+
+    def _section_settings(self) -> Tuple[Any, ...]:
+        """Réglages de l'instance qui changent le rendu des sections (partie de leur clé)"""
+        return (self.chart_backend, self.projection_weeks, self.weight_simulator.adaptation)
+
+    def _run_section(self, step: PlanStep, inputs: Mapping[str, Any]) -> List[Any]:
+        """
+        Section reprise du cache si ses dépendances n'ont pas changé, sinon reconstruite
 
-            # Cards énergétiques (SANS collision)
-            story.append(Paragraph("■ BESOINS ÉNERGÉTIQUES", self.styles["section_title"]))
-            story.append(Paragraph("Vue rapide sur vos calories clefs.", self.styles["section_caption"]))
-            story.append(Spacer(1, 10))
-            story.append(self.create_energy_cards_no_collision(results, params_dict))
-            story.append(Spacer(1, 25))
+        La section reste empruntée jusqu'à la fin du rendu (_end_sections) ;
+        la story reçoit des copies superficielles de ses flowables.
+        """
+        state = self._render_state
+        try:
+            key = (step.name, self._section_settings(),
+                   dependency_key(step.dependencies, step.inputs, inputs))
+            hash(key)
+        except TypeError:
+            key = None  # Entrée non hachable : section toujours reconstruite
+
+        entry = self.section_cache.acquire(key) if key is not None else None
+        if entry is not None:
+            state.section_report.reused.append(step.name)
+        else:
+            state.section_report.recomputed.append(step.name)
+            # Images de la section relevées à part : reportées à chaque reprise
+            report = self._image_report
+            self._image_report = ImageReport()
+            try:
+                produced = step.call(inputs)
+            finally:
+                images, self._image_report = self._image_report, report
+            flowables = produced if isinstance(produced, list) else [produced]
+            entry = self.section_cache.store(key, flowables, images) if key is not None else None
+            if entry is None:
+                self._image_report.merge(images)
+                return flowables
+
+        state.borrowed_sections.append(entry)
+        self._image_report.merge(entry.images)
+        return [copy.copy(flowable) for flowable in entry.flowables]
 
-            # === PAGE 2 ===
-            story.append(PageBreak())
+    # ------------------------------------------------------------------
+    # Rendu vers un fichier, un flux ou des octets
+    # ------------------------------------------------------------------
+    def _build_document(self, target: Union[str, BinaryIO], title: str) -> SimpleDocTemplate:
+        """Document A4 aux marges de la charte, vers un chemin ou un flux binaire"""
+        return SimpleDocTemplate(
+            target,
+            pagesize=A4,
+            topMargin=25,
+            bottomMargin=25,
+            leftMargin=25,
+            rightMargin=25,
+            title=title,
+        )
 
-            # Macronutriments (section dédiée)
-            story.append(Paragraph("■ MACRONUTRIMENTS", self.styles["section_title"]))
-            story.append(Paragraph("Voici vos besoins quotidiens optimaux selon votre profil et objectif.", self.styles["section_caption"]))
-            story.append(Spacer(1, 15))
+    def _traced_document(self, target: Union[str, BinaryIO], title: str) -> SimpleDocTemplate:
+        """Document dont chaque mise en page de flowable (wrap, split, dessin) est tracée si actif"""
+        doc = self._build_document(target, title)
+        tracer = get_tracer()
+        if not tracer.enabled:
+            return doc
 
-            # Tableau + Pie chart CÔTE À CÔTE (pas de collision)
-            macro_section = self.create_macro_section_side_by_side(results)
-            story.append(macro_section)
-            story.append(Spacer(1, 25))
+        handle_flowable = doc.handle_flowable
 
-            # Courbe de poids
-            story.append(Paragraph("■ ÉVOLUTION DU POIDS (12 SEMAINES)", self.styles["section_title"]))
-            story.append(self.create_weight_chart_clean(client, params_dict))
-            story.append(Spacer(1, 20))
+        def traced_handle_flowable(flowables):
+            with tracer.span(f"layout_{type(flowables[0]).__name__}", "layout"):
+                handle_flowable(flowables)
 
-            # === PAGE 3 ===
-            story.append(PageBreak())
+        doc.handle_flowable = traced_handle_flowable
+        return doc
 
-            # Conseils avec encadrés colorés
-            story.append(Paragraph("■ CONSEILS PERSONNALISÉS", self.styles["section_title"]))
-            story.extend(self.create_conseils_with_colored_boxes(client, results, params_dict))
-            story.append(Spacer(1, 15))
+    def _render_variant(
+        self,
+        variante: str,
+        client: ClientData,
+        results: NutritionResults,
+        params_dict: Dict[str, Any],
+        target: Union[str, BinaryIO],
+        conseils: Optional[List[str]] = None,
+        progress: Optional[Callable[[str, float], None]] = None,
+        first_page: Optional[FirstPageLayout] = None,
+    ) -> None:
+        """
+        Construit la story d'une variante et l'écrit dans `target`
 
-            story.append(self.create_footer_clean())
+        `progress(stage, fraction)` est appelé pour 'sections' puis pour
+        'mise_en_page' (une fois par élément placé) ; une exception levée par
+        ce rappel interrompt le rendu. `first_page` relève la mise en page de
+        la première page (vignette).
+        """
+        plan = self._render_plan(variante)
+        tracer = get_tracer()
+        self._image_report = ImageReport()
+        self._begin_sections()
+        try:
+            with tracer.span("render", "pdf", variante=variante):
+                if progress:
+                    progress("sections", 0.0)
+                story = self._build_story(plan, client, results, params_dict, conseils)
+                doc = self._traced_document(target, plan.title)
+                if progress:
+                    doc.setProgressCallBack(self._layout_progress(progress))
+                if first_page is not None:
+                    first_page.attach(doc)
+                with tracer.span("doc_build", "build", flowables=len(story)):
+                    doc.build(story)
+        except Exception as exc:
+            raise RuntimeError(f"Erreur lors de la génération du PDF {plan.label}: {exc}") from exc
+        finally:
+            self._end_sections()
+            self.last_image_report = self._image_report
+
+    @staticmethod
+    def _layout_progress(progress: Callable[[str, float], None]) -> Callable[[str, int], None]:
+        """Adapte le rappel de progression de ReportLab (éléments placés / total estimé)"""
+        total = [0]
+
+        def on_progress(kind: str, value: int) -> None:
+            if kind == "SIZE_EST":
+                total[0] = max(value, 1)
+            elif kind == "PROGRESS" and total[0]:
+                progress("mise_en_page", min(value / total[0], 1.0))
+        return on_progress
+
+    def render_to_stream(
+        self,
+        client: ClientData,
+        results: NutritionResults,
+        params_dict: Dict[str, Any],
+        stream: BinaryIO,
+        conseils: Optional[List[str]] = None,
+        variante: str = "sublime",
+        progress: Optional[Callable[[str, float], None]] = None,
+        first_page: Optional[FirstPageLayout] = None,
+    ) -> BinaryIO:
+        """
+        Rend une fiche dans un flux binaire fourni par l'appelant
+
+        Args:
+            client: Données du client
+            results: Résultats des calculs
+            params_dict: Paramètres nutritionnels
+            stream: Flux binaire ouvert en écriture (BytesIO, socket, fichier...)
+            conseils: Conseils personnalisés
+            variante: 'sublime', 'enriched' ou 'clean'
+            progress: Rappel (étape, fraction) ; une exception interrompt le rendu
+            first_page: Relevé de la première page, pour render_thumbnail
+
+        Returns:
+            Le flux, positionné après le PDF
+        """
+        self._render_variant(variante, client, results, params_dict, stream, conseils, progress, first_page)
+        return stream
 
-            doc.build(story)
-            return output_path
+    def render_to_bytes(
+        self,
+        client: ClientData,
+        results: NutritionResults,
+        params_dict: Dict[str, Any],
+        conseils: Optional[List[str]] = None,
+        variante: str = "sublime",
+    ) -> bytes:
+        """Rend une fiche en mémoire et retourne les octets du PDF"""
+        buffer = io.BytesIO()
+        self.render_to_stream(client, results, params_dict, buffer, conseils, variante)
+        return buffer.getvalue()
+
+    def render_to_buffer(
+        self,
+        client: ClientData,
+        results: NutritionResults,
+        params_dict: Dict[str, Any],
+        conseils: Optional[List[str]] = None,
+        variante: str = "sublime",
+    ) -> memoryview:
+        """Comme render_to_bytes, sans copie : vue sur le tampon interne"""
+        buffer = io.BytesIO()
+        self.render_to_stream(client, results, params_dict, buffer, conseils, variante)
+        return buffer.getbuffer()
+
+    def render_clients_to_stream(
+        self,
+        items: Iterable[Tuple[ClientData, NutritionResults, Dict[str, Any], Optional[List[str]]]],
+        stream: BinaryIO,
+        variante: str = "sublime",
+        title: str = "Fiches Nutritionnelles",
+        bookmarks: bool = True,
+    ) -> int:
+        """
+        Rend plusieurs clients dans un seul document, client par client
+
+        Les éléments (tableaux, graphiques) d'un client ne sont construits
+        qu'au moment où ReportLab les met en page puis sont libérés : la
+        mémoire ne dépend pas du nombre de clients pour la partie story.
+        Le logo et les images identiques (SharedImage) ne sont intégrés
+        qu'une fois. ReportLab écrit le fichier (pages compressées et table
+        xref) à la fin de doc.build, directement dans `stream`. Le cache des
+        sections n'est pas utilisé : ses entrées resteraient empruntées
+        jusqu'à la fin du document.
+
+        Args:
+            items: Itérable de (client, results, params_dict, conseils)
+            stream: Flux binaire ouvert en écriture
+            variante: 'sublime', 'enriched' ou 'clean'
+            title: Titre du document
+            bookmarks: Ajoute un signet par client dans le sommaire du PDF
+
+        Returns:
+            Nombre de clients rendus
+        """
+        plan = self._render_plan(variante)
+        count = 0
+        self._image_report = ImageReport()
+
+        def flowables():
+            nonlocal count
+            for client, results, params_dict, conseils in items:
+                if count:
+                    yield PageBreak()
+                count += 1
+                if bookmarks:
+                    yield OutlineEntry(f"{client.prenom} {client.nom}", f"client_{count}")
+                yield from self._build_story(plan, client, results, params_dict, conseils)
 
+        try:
+            # Les sections des clients sont imbriquées dans doc_build (construction paresseuse)
+            with get_tracer().span("doc_build", "build", variante=variante):
+                self._traced_document(stream, title).build(LazyStory(flowables()))
         except Exception as exc:
-            raise RuntimeError(f"Erreur lors de la génération du PDF clean layout: {exc}") from exc
+            raise RuntimeError(f"Erreur lors de la génération du document multi-clients: {exc}") from exc
+        finally:
+            self.last_image_report = self._image_report
+        return count
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+    def generate_clean_layout_pdf(
+        self,
+        client: ClientData,
+        results: NutritionResults,
+        params_dict: Dict[str, Any],
+        output_path: str,
+        conseils: Optional[List[str]] = None,
+    ) -> str:
+        """Structure PDF sans superposition d'éléments selon le prompt"""
+        self._render_variant("clean", client, results, params_dict, output_path, conseils)
+        return output_path
 
     # Alias pour compatibilité
     def generate_perfect_2page_pdf(self, *args, **kwargs) -> str:
@@ -2229,74 +2711,8 @@ class PremiumPDFGenerator:
         conseils: Optional[List[str]] = None,
     ) -> str:
         """Générer le PDF sublime avec tous les éléments graphiques selon le prompt"""
-        try:
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=A4,
-                topMargin=25,
-                bottomMargin=25,
-                leftMargin=25,
-                rightMargin=25,
-                title="Fiche Nutritionnelle Sublime - Premium",
-            )
-
-            story: List[Any] = []
-            decorative = self.add_decorative_elements()
-
-            # === PAGE 1 ===
-            # Header avec séparateur décoratif
-            story.append(self.create_perfect_header())
-            story.append(decorative['header_separator'])
-            story.append(Spacer(1, 15))
-
-            # Profil personnel
-            story.append(self.create_centered_section_title("■ PROFIL PERSONNEL"))
-            story.append(self.create_clean_profile_table(client, results, params_dict))
-            story.append(Spacer(1, 20))
-
-            # Besoins énergétiques avec cards colorées
-            story.append(self.create_centered_section_title("■ BESOINS ÉNERGÉTIQUES"))
-            story.append(Paragraph("Vue rapide sur vos calories clefs.", self.styles["description_style"]))
-            story.append(Spacer(1, 12))
-            story.append(self.create_cards_with_colored_borders(results, params_dict))
-            story.append(Spacer(1, 25))
-
-            # === PAGE 2 ===
-            story.append(PageBreak())
-
-            # Macronutriments
-            story.append(self.create_centered_section_title("■ MACRONUTRIMENTS"))
-            story.append(decorative['section_separator'])
-            story.append(self.create_macro_section_side_by_side(results))
-            story.append(Spacer(1, 20))
-
-            # Courbe de poids
-            story.append(self.create_centered_section_title("■ ÉVOLUTION DU POIDS (12 SEMAINES)"))
-            story.append(decorative['section_separator'])
-            story.append(self._create_weight_chart_with_grid(client, params_dict))
-            story.append(Spacer(1, 20))
-
-            # === PAGE 3 ===
-            story.append(PageBreak())
-
-            # Conseils avec bordures colorées
-            story.append(self.create_centered_section_title("■ CONSEILS PERSONNALISÉS"))
-            story.append(decorative['section_separator'])
-            story.append(Spacer(1, 10))
-
-            # Ajouter les conseils colorés
-            conseils_elements = self.create_conseils_with_colored_borders(client, results, params_dict)
-            for conseil in conseils_elements:
-                story.append(conseil)
-
-            story.append(Spacer(1, 15))
-            story.extend(self.create_premium_footer())
-
-            doc.build(story)
-            return output_path
-
-        except Exception as exc:
-            raise RuntimeError(f"Erreur lors de la génération du PDF sublime: {exc}") from exc
+        self._render_variant("sublime", client, results, params_dict, output_path, conseils)
+        return output_path
 
     def generate_enriched_pdf(
         self,
@@ -2307,98 +2723,8 @@ class PremiumPDFGenerator:
         conseils: Optional[List[str]] = None,
     ) -> str:
         """PDF complet avec tous les enrichissements selon le prompt d'enrichissement"""
-        try:
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=A4,
-                topMargin=25,
-                bottomMargin=25,
-                leftMargin=25,
-                rightMargin=25,
-                title="Fiche Nutritionnelle Enrichie - Premium",
-            )
-
-            story: List[Any] = []
-            decorative = self.add_decorative_elements()
-
-            # === PAGE 1 ENRICHIE ===
-            # Header compact pour éviter débordement
-            story.append(self.create_perfect_header())
-            story.append(decorative['header_separator'])
-            story.append(Spacer(1, 12))
-
-            # Profil enrichi avec IMC, durée, objectifs
-            story.append(self.create_centered_section_title("■ PROFIL PERSONNEL"))
-            story.append(self.create_enriched_profile(client, results, params_dict))
-            story.append(Spacer(1, 15))
-
-            # Cards énergétiques
-            story.append(self.create_centered_section_title("■ BESOINS ÉNERGÉTIQUES"))
-            story.append(Paragraph("Vue rapide sur vos calories clefs.", self.styles["description_style"]))
-            story.append(Spacer(1, 12))
-            story.append(self.create_cards_with_colored_borders(results, params_dict))
-            story.append(Spacer(1, 15))
-
-            # Objectifs nutritionnels personnalisés
-            story.append(self.add_nutritional_targets(client, results, params_dict))
-            story.append(Spacer(1, 15))
-
-            # Aperçu des macros par repas (compact pour page 1)
-            story.append(self.create_compact_meal_preview())
-            story.append(Spacer(1, 15))
-
-            # Guide d'hydratation compact
-            story.append(self.add_compact_hydration_summary(client))
-
-            # === PAGE 2 ENRICHIE ===
-            story.append(PageBreak())
-
-            # Macronutriments avec répartition par repas
-            story.append(self.create_centered_section_title("■ MACRONUTRIMENTS"))
-            story.append(decorative['section_separator'])
-            story.append(self.create_macro_section_side_by_side(results))
-            story.append(Spacer(1, 15))
-
-            # Répartition par repas
-            story.append(self.add_macro_breakdown(results))
-            story.append(Spacer(1, 15))
-
-            # Courbe de poids
-            story.append(self.create_centered_section_title("■ ÉVOLUTION DU POIDS (12 SEMAINES)"))
-            story.append(decorative['section_separator'])
-            story.append(self._create_weight_chart_with_grid(client, params_dict))
-            story.append(Spacer(1, 20))
-
-            # === PAGE 3 ENRICHIE ===
-            story.append(PageBreak())
-
-            # Conseils enrichis
-            story.append(self.create_centered_section_title("■ CONSEILS PERSONNALISÉS"))
-            story.append(decorative['section_separator'])
-            story.append(Spacer(1, 10))
-
-            # Ajouter les conseils colorés
-            conseils_elements = self.create_conseils_with_colored_borders(client, results, params_dict)
-            for conseil in conseils_elements:
-                story.append(conseil)
-
-            story.append(Spacer(1, 15))
-
-            # Hydratation détaillée
-            story.append(self.add_hydration_guide(client, results))
-            story.append(Spacer(1, 10))
-
-            # Timing des repas
-            story.append(self.add_meal_timing())
-            story.append(Spacer(1, 15))
-
-            story.extend(self.create_premium_footer())
-
-            doc.build(story)
-            return output_path
-
-        except Exception as exc:
-            raise RuntimeError(f"Erreur lors de la génération du PDF enrichi: {exc}") from exc
+        self._render_variant("enriched", client, results, params_dict, output_path, conseils)
+        return output_path
 
     def _create_profile_energy_combined(self, client: ClientData, results: NutritionResults, params_dict: Dict[str, Any]) -> Table:
         """Combiner profil et besoins sur une ligne pour économiser l'espace"""
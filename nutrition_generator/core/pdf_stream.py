@@ -0,0 +1,103 @@
+"""
+Story ReportLab paresseuse pour les documents multi-clients
+Les éléments d'un client ne sont construits qu'au moment de leur mise en page
+"""
+
+import hashlib
+import io
+from typing import Any, Iterable, Iterator
+
+from reportlab.platypus import Flowable, Image
+
+
+class LazyStory(list):
+    """
+    Liste de flowables alimentée à la demande par un itérateur
+
+    doc.build() consomme la story par l'avant (len, [0], del [0], insert) ;
+    la liste est complétée au fil de l'eau pour garder `lookahead` éléments
+    disponibles (suffisant pour keepWithNext), le reste n'est pas encore créé.
+    """
+
+    def __init__(self, flowables: Iterable[Any], lookahead: int = 16):
+        super().__init__()
+        self._source: Iterator[Any] = iter(flowables)
+        self._exhausted = False
+        self.lookahead = lookahead
+        self.pulled = 0  # Nombre d'éléments produits par l'itérateur
+
+    def _fill(self, size: int) -> None:
+        while not self._exhausted and list.__len__(self) < size:
+            try:
+                self.append(next(self._source))
+                self.pulled += 1
+            except StopIteration:
+                self._exhausted = True
+
+    def __len__(self) -> int:
+        self._fill(self.lookahead)
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.stop is None or index.stop < 0:
+                self._fill(float("inf"))
+            else:
+                self._fill(index.stop)
+        elif index >= 0:
+            self._fill(index + 1)
+        else:
+            self._fill(float("inf"))
+        return list.__getitem__(self, index)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self):
+        self._fill(float("inf"))
+        return list.__iter__(self)
+
+
+class SharedImage(Image):
+    """
+    Image PNG intégrée une seule fois par document
+
+    Le premier dessin enregistre l'image dans un XObject de formulaire
+    nommé d'après l'empreinte des octets PNG ; les dessins suivants
+    (logo de chaque page, graphiques identiques d'un client à l'autre)
+    y font référence sans décoder l'image à nouveau.
+    """
+
+    def __init__(self, png_data: bytes, width: float, height: float):
+        super().__init__(io.BytesIO(png_data), width=width, height=height)
+        self.form_name = "png_" + hashlib.sha1(png_data).hexdigest()[:20]
+
+    def draw(self):
+        canv = self.canv
+        if not canv.hasForm(self.form_name):
+            canv.beginForm(self.form_name, 0, 0, 1, 1)
+            canv.drawImage(self._img or self.filename, 0, 0, 1, 1, mask=self._mask)
+            canv.endForm()
+        canv.saveState()
+        canv.translate(getattr(self, "_offs_x", 0), getattr(self, "_offs_y", 0))
+        canv.scale(self.drawWidth, self.drawHeight)
+        canv.doForm(self.form_name)
+        canv.restoreState()
+
+
+class OutlineEntry(Flowable):
+    """Signet de la page courante et entrée du sommaire PDF (élément sans taille)"""
+
+    def __init__(self, title: str, key: str, level: int = 0):
+        super().__init__()
+        self.title = title
+        self.key = key
+        self.level = level
+
+    def wrap(self, available_width, available_height):
+        return 0, 0
+
+    def draw(self):
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.title, self.key, self.level)
+        self.canv.showOutline()
@@ -0,0 +1,86 @@
+"""
+Contexte de rendu partagé par tous les générateurs PDF d'un processus
+Configuration, palette, styles et logo préparés une seule fois
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+
+# (chemin, mtime_ns, taille) ; mtime_ns et taille à None si le fichier est absent
+FileSignature = Tuple[str, Optional[int], Optional[int]]
+
+
+def file_signature(path: Optional[str]) -> Optional[FileSignature]:
+    """Empreinte d'un fichier sur disque (détecte modification et apparition)"""
+    if not path:
+        return None
+    try:
+        stats = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, stats.st_mtime_ns, stats.st_size)
+
+
+def freeze(value: Any) -> Any:
+    """Copie en lecture seule d'une configuration JSON (dict -> mapping, list -> tuple)"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class RenderContext:
+    """Ressources de rendu immuables, valables tant que leurs fichiers sources n'ont pas changé"""
+    config: Mapping[str, Any]
+    colors: Mapping[str, Any]
+    styles: Mapping[str, Any]
+    logo_path: Optional[str]
+    logo_png: Optional[bytes]  # Logo converti en RGBA et encodé une fois
+    logo_size_px: Optional[Tuple[int, int]]
+    layouts: Mapping[str, Any]  # Description des variantes (layouts.json)
+    sources: Tuple[Optional[FileSignature], ...]  # Fichiers dont dépend le contexte
+
+    def is_current(self) -> bool:
+        """True si aucun fichier source n'a changé depuis la construction"""
+        return all(
+            source is None or file_signature(source[0]) == source
+            for source in self.sources
+        )
+
+
+# Un contexte par configuration demandée
+_contexts: Dict[Optional[str], RenderContext] = {}
+_lock = threading.Lock()
+
+
+def get_render_context(config_path: Optional[str],
+                       build: Callable[[Optional[str]], RenderContext]) -> RenderContext:
+    """
+    Retourne le contexte partagé, reconstruit si la config ou le logo a changé
+
+    Args:
+        config_path: Chemin de configuration demandé (None pour le défaut)
+        build: Fonction de construction appelée en cas d'absence ou de changement
+
+    Returns:
+        Contexte de rendu
+    """
+    key = os.path.abspath(config_path) if config_path else None
+    with _lock:
+        context = _contexts.get(key)
+        if context is None or not context.is_current():
+            context = build(config_path)
+            _contexts[key] = context
+        return context
+
+
+def clear_render_contexts() -> None:
+    """Oublie tous les contextes (le prochain générateur les reconstruira)"""
+    with _lock:
+        _contexts.clear()
@@ -0,0 +1,301 @@
+"""
+Lecture en flux des listes de clients (CSV ou JSON lignes)
+Chaque ligne fournit un ClientData et ses NutritionParams
+"""
+
+import csv
+import itertools
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.data_models import ClientData, NutritionParams
+from core.validation import CLIENT_RULES, PARAMS_RULES, RangeRule, validate_columns
+
+
+# Valeurs utilisées quand une colonne de paramètres est absente ou vide
+PARAMS_PAR_DEFAUT = {
+    "formule_metabolisme": "mifflin_st_jeor",
+    "facteur_activite": 1.55,
+    "deficit_surplus_kcal": 0,
+    "proteines_g_par_kg": 1.8,
+    "lipides_g_par_kg": 1.0,
+}
+
+COLONNES_OBLIGATOIRES = ("nom", "prenom", "age", "taille_cm", "poids_kg")
+
+# Lignes validées ensemble par validate_columns
+ROSTER_CHUNK_SIZE = 5000
+
+
+@dataclass
+class RosterRow:
+    """Ligne de la liste, validée ou en erreur"""
+    line: int  # Numéro de ligne dans le fichier (en-tête CSV = 1)
+    row_id: str
+    client: Optional[ClientData] = None
+    params: Optional[NutritionParams] = None
+    error: Optional[str] = None
+    error_fields: Tuple[str, ...] = ()  # Champs en erreur ('ligne' si illisible)
+    identifiant: Optional[str] = None  # Colonne id de la liste (None si absente)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _empty(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and value.strip() == "")
+
+
+def parse_row(raw: Dict[str, Any],
+              defaults: Optional[Dict[str, Any]] = None
+              ) -> Tuple[ClientData, NutritionParams]:
+    """
+    Convertit une ligne brute en ClientData et NutritionParams
+
+    Args:
+        raw: Valeurs de la ligne (chaînes pour le CSV)
+        defaults: Paramètres nutritionnels par défaut
+
+    Returns:
+        Tuple (ClientData, NutritionParams)
+
+    Raises:
+        ValueError: Colonne manquante, valeur illisible ou hors limites
+    """
+    defaults = {**PARAMS_PAR_DEFAUT, **(defaults or {})}
+
+    for column in COLONNES_OBLIGATOIRES:
+        if _empty(raw.get(column)):
+            raise ValueError(f"Colonne obligatoire manquante: {column}")
+
+    def value(column, convert):
+        data = raw.get(column)
+        if _empty(data):
+            data = defaults.get(column)
+        if data is None:
+            return None
+        try:
+            return convert(data)
+        except (TypeError, ValueError):
+            raise ValueError(f"Valeur invalide pour {column}: {data!r}")
+
+    def integer(data):
+        return int(float(data))
+
+    client = ClientData(
+        nom=str(raw["nom"]).strip(),
+        prenom=str(raw["prenom"]).strip(),
+        age=value("age", integer),
+        taille_cm=value("taille_cm", integer),
+        poids_kg=value("poids_kg", float),
+        sexe=str(value("sexe", str) or "male").strip().lower(),
+        pourcentage_graisse=value("pourcentage_graisse", float)
+    )
+    params = NutritionParams(
+        formule_metabolisme=str(value("formule_metabolisme", str)).strip(),
+        facteur_activite=value("facteur_activite", float),
+        deficit_surplus_kcal=value("deficit_surplus_kcal", integer),
+        proteines_g_par_kg=value("proteines_g_par_kg", float),
+        lipides_g_par_kg=value("lipides_g_par_kg", float)
+    )
+    return client, params
+
+
+def _iter_raw(path: str, format: Optional[str] = None) -> Iterator[tuple]:
+    """Produit les couples (numéro de ligne, ligne brute ou erreur)"""
+    if format is None:
+        format = "csv" if path.lower().endswith(".csv") else "jsonl"
+
+    with open(path, "r", encoding="utf-8", newline="") as handler:
+        if format == "csv":
+            reader = csv.DictReader(handler)
+            for raw in reader:
+                yield reader.line_num, raw
+        elif format == "jsonl":
+            for line_num, line in enumerate(handler, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    raw = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield line_num, ValueError(f"JSON invalide: {exc.msg}")
+                    continue
+                if not isinstance(raw, dict):
+                    yield line_num, ValueError("Chaque ligne doit être un objet JSON")
+                    continue
+                yield line_num, raw
+        else:
+            raise ValueError(f"Format de liste inconnu: {format}")
+
+
+# Champs numériques, dans l'ordre de la table de règles
+_NUMERIC_FIELDS = tuple(rule.field for rule in CLIENT_RULES + PARAMS_RULES if isinstance(rule, RangeRule))
+
+
+def _validated(cls, **values):
+    """Instance construite sans repasser par __post_init__ (lignes déjà validées)"""
+    instance = object.__new__(cls)
+    instance.__dict__.update(values)
+    return instance
+
+
+def _float_column(column: str, raws: List[Any], defaults: Dict[str, Any],
+                  errors: List[Dict[str, str]]) -> np.ndarray:
+    """Colonne numérique d'un bloc (NaN si absente ou illisible, erreur notée)"""
+    values = [raw.get(column) for raw in raws]
+    default = defaults.get(column)
+    values = [
+        default if data is None or (data.__class__ is str and not data.strip()) else data
+        for data in values
+    ]
+    values = [np.nan if data is None else data for data in values]
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    # Au moins une valeur illisible : conversion case par case
+    result = np.full(len(values), np.nan)
+    for position, data in enumerate(values):
+        try:
+            result[position] = float(data)
+        except (TypeError, ValueError):
+            errors[position].setdefault(column, f"Valeur invalide pour {column}: {data!r}")
+    return result
+
+
+def _convert_chunk(chunk: List[tuple], defaults: Dict[str, Any]) -> List[RosterRow]:
+    """
+    Valide un bloc de lignes brutes en une passe vectorisée
+
+    Les valeurs sont converties colonne par colonne (NaN si absentes ou
+    illisibles) puis validées par validate_columns ; ClientData et
+    NutritionParams ne sont construits que pour les lignes valides.
+    """
+    raws = [{} if isinstance(raw, Exception) else raw for _, _, raw in chunk]
+    # Erreurs de lecture, prioritaires sur les règles : un dict {champ: message} par ligne
+    errors: List[Dict[str, str]] = [
+        {"ligne": str(raw)} if isinstance(raw, Exception) else {} for _, _, raw in chunk
+    ]
+    for column in COLONNES_OBLIGATOIRES:
+        missing = [_empty(raw.get(column)) for raw in raws]
+        if any(missing):
+            for position in itertools.compress(range(len(raws)), missing):
+                errors[position].setdefault(column, f"Colonne obligatoire manquante: {column}")
+
+    numeric = {column: _float_column(column, raws, defaults, errors) for column in _NUMERIC_FIELDS}
+    sexes = [
+        "male" if _empty(raw.get("sexe")) else str(raw["sexe"]).strip().lower() for raw in raws
+    ]
+    formules = [
+        str(defaults["formule_metabolisme"] if _empty(raw.get("formule_metabolisme"))
+            else raw["formule_metabolisme"]).strip()
+        for raw in raws
+    ]
+    validation = validate_columns({**numeric, "sexe": sexes, "formule_metabolisme": formules})
+    invalid = validation.invalid.tolist()
+    # Conversion en scalaires Python une fois par colonne
+    values = {column: array.tolist() for column, array in numeric.items()}
+
+    rows = []
+    for position, (index, line, raw) in enumerate(chunk):
+        row_errors = errors[position]
+        if "ligne" in row_errors:
+            rows.append(RosterRow(line, f"{index + 1:06d}", error=row_errors["ligne"],
+                                  error_fields=("ligne",)))
+            continue
+
+        row_id = str(raw.get("id") or f"{index + 1:06d}").strip()
+        if invalid[position] or row_errors:
+            for field in validation.masks:
+                if field not in row_errors:
+                    error = validation.field_error(field, position)
+                    if error:
+                        row_errors[field] = error
+            rows.append(RosterRow(line, row_id, error="; ".join(row_errors.values()),
+                                  error_fields=tuple(row_errors)))
+            continue
+
+        graisse = values["pourcentage_graisse"][position]
+        client = _validated(
+            ClientData,
+            nom=str(raw["nom"]).strip(),
+            prenom=str(raw["prenom"]).strip(),
+            age=int(values["age"][position]),
+            taille_cm=int(values["taille_cm"][position]),
+            poids_kg=values["poids_kg"][position],
+            sexe=sexes[position],
+            pourcentage_graisse=None if graisse != graisse else graisse  # NaN
+        )
+        params = _validated(
+            NutritionParams,
+            formule_metabolisme=formules[position],
+            facteur_activite=values["facteur_activite"][position],
+            deficit_surplus_kcal=int(values["deficit_surplus_kcal"][position]),
+            proteines_g_par_kg=values["proteines_g_par_kg"][position],
+            lipides_g_par_kg=values["lipides_g_par_kg"][position]
+        )
+        identifiant = None if _empty(raw.get("id")) else row_id
+        rows.append(RosterRow(line, row_id, client, params, identifiant=identifiant))
+    return rows
+
+
+def _reject_duplicate_ids(rows: List[RosterRow], seen: Dict[str, int]) -> Iterator[RosterRow]:
+    """
+    Met en erreur les lignes valides dont l'id a déjà servi
+
+    L'id nomme la fiche produite et la tâche de rendu : deux lignes de même
+    id écriraient le même fichier et seraient confondues dans l'index.
+
+    Args:
+        rows: Lignes d'un bloc
+        seen: id -> ligne de sa première occurrence (mis à jour)
+    """
+    for row in rows:
+        if row.ok:
+            first = seen.setdefault(row.row_id, row.line)
+            if first != row.line:
+                row = RosterRow(row.line, row.row_id,
+                                error=f"id {row.row_id} déjà utilisé ligne {first}",
+                                error_fields=("id",))
+        yield row
+
+
+def iter_roster(path: str, format: Optional[str] = None,
+                defaults: Optional[Dict[str, Any]] = None,
+                chunk_size: int = ROSTER_CHUNK_SIZE) -> Iterator[RosterRow]:
+    """
+    Lit et valide une liste de clients par blocs
+
+    Le fichier n'est jamais chargé en entier : les lignes sont validées par
+    blocs de `chunk_size` en une passe vectorisée, et les lignes invalides
+    sont produites avec toutes leurs erreurs au lieu d'interrompre la lecture.
+    Une ligne dont l'id (fourni ou numéro de ligne) a déjà servi est invalide.
+
+    Args:
+        path: Fichier .csv ou .jsonl
+        format: 'csv' ou 'jsonl' (déduit de l'extension si None)
+        defaults: Paramètres nutritionnels par défaut
+        chunk_size: Nombre de lignes validées ensemble
+
+    Yields:
+        Lignes validées ou en erreur, dans l'ordre du fichier
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Liste de clients introuvable: {path}")
+
+    defaults = {**PARAMS_PAR_DEFAUT, **(defaults or {})}
+    seen: Dict[str, int] = {}
+    chunk = []
+    for index, (line, raw) in enumerate(_iter_raw(path, format)):
+        chunk.append((index, line, raw))
+        if len(chunk) >= chunk_size:
+            yield from _reject_duplicate_ids(_convert_chunk(chunk, defaults), seen)
+            chunk = []
+    if chunk:
+        yield from _reject_duplicate_ids(_convert_chunk(chunk, defaults), seen)
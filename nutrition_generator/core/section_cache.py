@@ -0,0 +1,202 @@
+"""
+Cache des sections de fiche par dépendances déclarées
+Une section dont les entrées n'ont pas changé depuis le dernier rendu est
+reprise telle quelle (copies des mêmes flowables) au lieu d'être reconstruite
+"""
+
+import dataclasses
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+from core.image_pipeline import ImageReport
+
+
+# Sections gardées en mémoire (toutes variantes et tous clients confondus)
+SECTIONS_EN_CACHE = 64
+
+# Racines possibles d'une dépendance ("client.poids_kg", "params.deficit_surplus_kcal", "date"...)
+RACINES_DEPENDANCES = ("client", "results", "params", "conseils", "date")
+
+
+def depends_on(*paths: str) -> Callable:
+    """
+    Déclare les entrées dont dépend un constructeur de section
+
+    Chaque chemin est une racine de RACINES_DEPENDANCES suivie au besoin d'un
+    champ (`client.poids_kg`, `params.deficit_surplus_kcal`) ; `date` est la
+    date du jour (pied de page daté). Une section sans déclaration dépend de
+    toutes ses entrées.
+    """
+    for path in paths:
+        if path.partition(".")[0] not in RACINES_DEPENDANCES:
+            raise ValueError(f"Dépendance inconnue: {path}")
+
+    def decorator(func: Callable) -> Callable:
+        func.section_inputs = tuple(paths)
+        return func
+    return decorator
+
+
+def freeze_key(value: Any) -> Hashable:
+    """Valeur hachable équivalente (dataclasses, mappings et listes figés récursivement)"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return (type(value).__name__,) + tuple(
+            freeze_key(getattr(value, field.name)) for field in dataclasses.fields(value)
+        )
+    if isinstance(value, Mapping):
+        return tuple(sorted((key, freeze_key(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_key(item) for item in value)
+    return value
+
+
+def dependency_key(dependencies: Optional[Sequence[str]], names: Sequence[str],
+                   inputs: Mapping[str, Any]) -> Hashable:
+    """
+    Valeurs des dépendances d'une section pour une fiche
+
+    Args:
+        dependencies: Chemins déclarés (None : toutes les entrées `names`)
+        names: Entrées passées à la section
+        inputs: Données de la fiche
+
+    Returns:
+        Clé hachable
+    """
+    if dependencies is None:
+        return tuple(freeze_key(inputs[name]) for name in names)
+
+    values: List[Hashable] = []
+    for path in dependencies:
+        root, _, attribute = path.partition(".")
+        if root == "date":
+            values.append(date.today().toordinal())
+            continue
+        value = inputs[root]
+        if attribute:
+            value = value.get(attribute) if isinstance(value, Mapping) else getattr(value, attribute)
+        values.append(freeze_key(value))
+    return tuple(values)
+
+
+@dataclasses.dataclass
+class CachedSection:
+    """Flowables d'une section et images qu'elle a placées"""
+    flowables: Tuple[Any, ...]
+    images: ImageReport
+    owner: Optional[int] = None  # Thread dont le rendu en cours utilise la section
+    uses: int = 0
+
+
+@dataclasses.dataclass
+class SectionReport:
+    """Sections reconstruites ou reprises du cache pour un rendu"""
+    recomputed: List[str] = dataclasses.field(default_factory=list)
+    reused: List[str] = dataclasses.field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"recomputed": list(self.recomputed), "reused": list(self.reused)}
+
+
+class SectionCache:
+    """
+    Sections déjà construites, par constructeur et valeurs de ses dépendances
+
+    Les flowables d'une section ne sont pas recopiés en profondeur : un rendu
+    en cours « emprunte » l'entrée (`acquire`) jusqu'à `release`, et un autre
+    thread qui demande la même entrée pendant ce temps reconstruit la section
+    au lieu de la partager. Les entrées empruntées ne sont jamais évincées.
+    """
+
+    def __init__(self, max_entries: int = SECTIONS_EN_CACHE, enabled: bool = True):
+        """
+        Initialise le cache
+
+        Args:
+            max_entries: Sections gardées (les moins récemment utilisées sont évincées)
+            enabled: False pour toujours reconstruire
+        """
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, CachedSection]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.busy = 0  # Entrées présentes mais empruntées par un autre thread
+        self.evictions = 0
+
+    def acquire(self, key: Hashable) -> Optional[CachedSection]:
+        """Emprunte une section pour le rendu du thread courant (None si absente ou occupée)"""
+        if not self.enabled:
+            return None
+        me = threading.get_ident()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.owner not in (None, me):
+                self.busy += 1
+                return None
+            entry.owner = me
+            entry.uses += 1
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def store(self, key: Hashable, flowables: Sequence[Any], images: ImageReport) -> Optional[CachedSection]:
+        """
+        Range une section construite par le thread courant, empruntée par lui
+
+        Returns:
+            L'entrée rangée (à rendre par release), None si le cache est
+            désactivé ou si l'entrée est empruntée par un autre thread
+        """
+        if not self.enabled:
+            return None
+        me = threading.get_ident()
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current.owner not in (None, me):
+                return None
+            entry = CachedSection(tuple(flowables), images, owner=me, uses=1)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            return entry
+
+    def release(self, entries: Sequence[CachedSection]) -> None:
+        """Rend les sections empruntées par un rendu terminé"""
+        with self._lock:
+            for entry in entries:
+                entry.uses -= 1
+                if entry.uses <= 0:
+                    entry.uses = 0
+                    entry.owner = None
+            self._evict()
+
+    def _evict(self) -> None:
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        for key in [key for key, entry in self._entries.items() if entry.owner is None][:excess]:
+            del self._entries[key]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Oublie les sections qui ne sont pas en cours d'utilisation"""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.owner is None]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "busy": self.busy,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,149 @@
+"""
+Cache disque des vignettes de fiches
+Une vignette PNG par contenu de PDF (empreinte SHA-1), taille totale bornée
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_THUMBNAIL_DIR = os.path.join("output", "vignettes")
+
+# Taille totale maximale par défaut (octets)
+TAILLE_MAX_VIGNETTES = 20 * 1024 * 1024
+
+
+def pdf_digest(pdf_data: bytes) -> str:
+    """Clé de cache : empreinte du contenu du PDF"""
+    return hashlib.sha1(pdf_data).hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Empreinte d'un PDF sur disque (même clé que pdf_digest)"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as handler:
+        for chunk in iter(lambda: handler.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ThumbnailCache:
+    """
+    Vignettes PNG sur disque, une par contenu de PDF
+
+    La taille totale est bornée par `max_bytes` : au-delà, les vignettes les
+    moins récemment lues (date de modification, mise à jour à chaque lecture)
+    sont supprimées.
+    """
+
+    def __init__(self, directory: str = DEFAULT_THUMBNAIL_DIR, max_bytes: int = TAILLE_MAX_VIGNETTES):
+        """
+        Initialise le cache
+
+        Args:
+            directory: Dossier des vignettes
+            max_bytes: Taille totale maximale
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None  # Taille totale connue (calculée au premier ajout)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Vignette d'un PDF (None si absente)"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handler:
+                data = handler.read()
+            os.utime(path)  # Récemment utilisée
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key: str, png_data: bytes) -> None:
+        """Enregistre une vignette puis applique la limite de taille"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as handler:
+            handler.write(png_data)
+        with self._lock:
+            try:
+                previous = os.path.getsize(path)
+            except OSError:
+                previous = 0
+            os.replace(temp_path, path)
+            if self._total is None:
+                self._total = self._disk_usage()
+            else:
+                self._total += len(png_data) - previous
+            if self._total > self.max_bytes:
+                self._evict(keep=path)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(".png"):
+                        stats = entry.stat()
+                        entries.append((stats.st_mtime, stats.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _disk_usage(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self, keep: str) -> None:
+        """
+        Supprime les plus anciennes jusqu'à 90 % de la limite (évite d'évincer à chaque ajout)
+
+        Args:
+            keep: Vignette qui vient d'être enregistrée (jamais supprimée)
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._total = total
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+# Caches partagés du processus, par dossier
+_shared_caches: Dict[str, ThumbnailCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_thumbnail_cache(directory: str = DEFAULT_THUMBNAIL_DIR,
+                        max_bytes: int = TAILLE_MAX_VIGNETTES) -> ThumbnailCache:
+    """Retourne le cache partagé du processus pour ce dossier"""
+    key = os.path.abspath(directory)
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = ThumbnailCache(directory, max_bytes)
+            _shared_caches[key] = cache
+        return cache
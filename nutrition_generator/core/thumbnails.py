@@ -0,0 +1,313 @@
+"""
+Vignettes de la première page des fiches
+Dessinées pendant la génération à partir de la mise en page ReportLab
+(position des éléments, couleurs des tableaux, images des graphiques),
+sans relire ni rastériser le PDF (cache disque : core.thumbnail_cache)
+"""
+
+import io
+from typing import Any, List, Optional, Tuple
+
+from reportlab.graphics.shapes import Circle, Drawing, Group, Line, Polygon, Rect, Wedge
+from reportlab.platypus import Flowable, HRFlowable, Image, Paragraph, Table
+
+
+# Largeur des vignettes (px) ; la hauteur suit le format de la page
+LARGEUR_VIGNETTE = 180
+
+# Sur-échantillonnage du dessin avant réduction (anticrénelage)
+_SURECHANTILLONNAGE = 2
+
+
+# ----------------------------------------------------------------------
+# Relevé de la mise en page
+# ----------------------------------------------------------------------
+class FirstPageLayout:
+    """
+    Relève la position des éléments placés sur la première page
+
+    `attach(doc)` s'insère dans la mise en page du document (avant build) ;
+    chaque élément placé en page 1 est conservé avec son rectangle en points
+    (origine en bas à gauche), dans l'ordre de dessin.
+    """
+
+    def __init__(self):
+        self.page_size: Tuple[float, float] = (0.0, 0.0)
+        self.placements: List[Tuple[Flowable, float, float, float, float]] = []
+
+    def attach(self, doc) -> None:
+        self.page_size = tuple(doc.pagesize)
+        handle_flowable = doc.handle_flowable
+
+        def recording_handle_flowable(flowables):
+            flowable = flowables[0]
+            frame = getattr(doc, "frame", None)
+            page = doc.page
+            y_before = frame._y if frame is not None else None
+            handle_flowable(flowables)
+
+            if page != 1 or frame is None or doc.page != 1 or getattr(doc, "frame", None) is not frame:
+                return
+            if frame._y >= y_before:
+                return  # Élément reporté ou découpé : ses morceaux sont relevés ensuite
+            width, height = _flowable_size(flowable)
+            if width <= 0 or height <= 0:
+                return
+            available = frame._getAvailableWidth()
+            x = flowable._hAlignAdjust(frame._x + frame._leftExtraIndent, available - width)
+            y = frame._y + flowable.getSpaceAfter()
+            self.placements.append((flowable, x, y, width, height))
+
+        doc.handle_flowable = recording_handle_flowable
+
+
+def _flowable_size(flowable: Any) -> Tuple[float, float]:
+    """Taille calculée lors de la mise en page (attributs propres à chaque type)"""
+    width = getattr(flowable, "_width", None)
+    if not isinstance(width, (int, float)):
+        width = getattr(flowable, "drawWidth", None) or getattr(flowable, "width", 0)
+    height = getattr(flowable, "_height", None)
+    if not isinstance(height, (int, float)):
+        height = getattr(flowable, "drawHeight", None) or getattr(flowable, "height", 0)
+    if not isinstance(width, (int, float)) or not isinstance(height, (int, float)):
+        return 0.0, 0.0
+    return float(width), float(height)
+
+
+# ----------------------------------------------------------------------
+# Dessin de la vignette
+# ----------------------------------------------------------------------
+def _rgb(color: Any) -> Optional[Tuple[int, int, int]]:
+    if color is None:
+        return None
+    try:
+        red, green, blue = color.red, color.green, color.blue
+    except AttributeError:
+        return None
+    alpha = getattr(color, "alpha", 1.0)
+    if alpha is not None and alpha < 1:  # Mélange avec le blanc du papier
+        red, green, blue = (1 - alpha + alpha * c for c in (red, green, blue))
+    return int(red * 255), int(green * 255), int(blue * 255)
+
+
+class _ThumbnailPainter:
+    """Redessine les éléments relevés dans une image PIL"""
+
+    def __init__(self, page_size: Tuple[float, float], width_px: int):
+        from PIL import Image as PILImage, ImageDraw
+
+        self.page_width, self.page_height = page_size
+        self.final_size = (width_px, round(self.page_height * width_px / self.page_width))
+        self.scale = width_px * _SURECHANTILLONNAGE / self.page_width
+        self.image = PILImage.new("RGB", (self.final_size[0] * _SURECHANTILLONNAGE,
+                                         self.final_size[1] * _SURECHANTILLONNAGE), "white")
+        self.draw = ImageDraw.Draw(self.image)
+
+    def box(self, x: float, y: float, width: float, height: float) -> List[float]:
+        """Rectangle PDF (points, origine en bas) -> boîte PIL (pixels, origine en haut)"""
+        scale = self.scale
+        return [x * scale, (self.page_height - y - height) * scale,
+                (x + width) * scale, (self.page_height - y) * scale]
+
+    def point(self, x: float, y: float) -> Tuple[float, float]:
+        return x * self.scale, (self.page_height - y) * self.scale
+
+    def paint(self, flowable: Any, x: float, y: float, width: float, height: float) -> None:
+        if isinstance(flowable, Table):
+            self._table(flowable, x, y)
+        elif isinstance(flowable, Paragraph):
+            self._paragraph(flowable, x, y, width, height)
+        elif isinstance(flowable, Image):
+            self._image(flowable, x, y, width, height)
+        elif isinstance(flowable, Drawing):
+            self._shapes(flowable.contents, x, y)
+        elif isinstance(flowable, HRFlowable):
+            color = _rgb(flowable.color) or (189, 195, 199)
+            self.draw.rectangle(self.box(x, y + height / 2, width, max(flowable.lineWidth, 0.5)), fill=color)
+
+    # Tableaux : fonds, bordures colorées, puis contenu des cellules
+    def _table(self, table: Table, x: float, y: float) -> None:
+        cols = table._colpositions
+        rows = table._rowpositions
+        n_cols, n_rows = len(cols) - 1, len(rows) - 1
+        spans = getattr(table, "_spanRanges", None) or {}
+
+        def cell_range(start, stop):
+            (sc, sr), (ec, er) = start, stop
+            sc, ec = sc % n_cols if sc < 0 else sc, ec % n_cols if ec < 0 else ec
+            sr, er = sr % n_rows if sr < 0 else sr, er % n_rows if er < 0 else er
+            return sc, sr, min(ec, n_cols - 1), min(er, n_rows - 1)
+
+        def cell_box(sc, sr, ec, er):
+            return self.box(x + cols[sc], y + rows[er + 1], cols[ec + 1] - cols[sc], rows[sr] - rows[er + 1])
+
+        for command in table._bkgrndcmds:
+            if command[0] != "BACKGROUND":
+                continue
+            color = _rgb(command[3]) if len(command) > 3 else None
+            if color:
+                self.draw.rectangle(cell_box(*cell_range(command[1], command[2])), fill=color)
+
+        for command in table._linecmds:
+            op, start, stop, weight, color = command[:5]
+            color = _rgb(color)
+            if not color or not weight:
+                continue
+            sc, sr, ec, er = cell_range(start, stop)
+            left, top, right, bottom = cell_box(sc, sr, ec, er)
+            thickness = max(weight * self.scale, 1)
+            if op in ("LINEABOVE", "BOX", "OUTLINE", "GRID"):
+                self.draw.rectangle([left, top, right, top + thickness], fill=color)
+            if op in ("LINEBELOW", "BOX", "OUTLINE", "GRID"):
+                self.draw.rectangle([left, bottom - thickness, right, bottom], fill=color)
+            if op in ("LINEBEFORE", "BOX", "OUTLINE", "GRID"):
+                self.draw.rectangle([left, top, left + thickness, bottom], fill=color)
+            if op in ("LINEAFTER", "BOX", "OUTLINE", "GRID"):
+                self.draw.rectangle([right - thickness, top, right, bottom], fill=color)
+
+        for row_index, row in enumerate(table._cellvalues):
+            for col_index, value in enumerate(row):
+                span = spans.get((col_index, row_index), (col_index, row_index, col_index, row_index))
+                if span is None:
+                    continue  # Cellule masquée par une fusion
+                sc, sr, ec, er = span
+                style = table._cellStyles[row_index][col_index]
+                self._cell(value, style, x + cols[sc], y + rows[er + 1],
+                           cols[ec + 1] - cols[sc], rows[sr] - rows[er + 1])
+
+    def _cell(self, value: Any, style: Any, x: float, y: float, width: float, height: float) -> None:
+        items = list(value) if isinstance(value, (list, tuple)) else [value]
+        sized = []
+        for item in items:
+            if isinstance(item, Flowable):
+                item_width, item_height = _flowable_size(item)
+                sized.append((item, item_width, item_height))
+            elif isinstance(item, str) and item.strip():
+                font_size = getattr(style, "fontsize", 10)
+                sized.append((item, min(len(item) * font_size * 0.5, width), getattr(style, "leading", font_size * 1.2)))
+
+        inner_width = width - style.leftPadding - style.rightPadding
+        inner_height = height - style.topPadding - style.bottomPadding
+        content_height = sum(item_height for _, _, item_height in sized)
+        valign = getattr(style, "valign", "BOTTOM")
+        top = y + height - style.topPadding
+        if valign == "MIDDLE":
+            top -= (inner_height - content_height) / 2
+        elif valign == "BOTTOM":
+            top -= inner_height - content_height
+
+        alignment = getattr(style, "alignment", "LEFT")
+        for item, item_width, item_height in sized:
+            left = x + style.leftPadding
+            if alignment in ("CENTER", "CENTRE"):
+                left += (inner_width - item_width) / 2
+            elif alignment == "RIGHT":
+                left += inner_width - item_width
+            top -= item_height
+            if isinstance(item, str):
+                color = _rgb(getattr(style, "textColor", None)) or (0, 0, 0)
+                self._text_bar(left, top, item_width, item_height, getattr(style, "fontsize", 10), color)
+            else:
+                self.paint(item, left, top, item_width, item_height)
+
+    # Texte : une barre par ligne, à la couleur et à la taille de la police
+    def _paragraph(self, paragraph: Paragraph, x: float, y: float, width: float, height: float) -> None:
+        para = getattr(paragraph, "blPara", None)
+        if para is None:
+            return
+        style = paragraph.style
+        color = _rgb(style.textColor) or (0, 0, 0)
+        leading = style.leading
+        top = y + height
+        for line in para.lines:
+            extra = line[0] if isinstance(line, tuple) else getattr(line, "extraSpace", 0)
+            line_width = max(width - style.leftIndent - style.rightIndent - extra, 0)
+            font_size = getattr(line, "fontSize", style.fontSize)
+            if not isinstance(line, tuple) and getattr(line, "words", None):
+                color = _rgb(getattr(line.words[0], "textColor", None)) or color
+            left = x + style.leftIndent
+            if style.alignment == 1:
+                left += extra / 2
+            elif style.alignment == 2:
+                left += extra
+            top -= leading
+            self._text_bar(left, top, line_width, leading, font_size, color)
+
+    def _text_bar(self, x: float, y: float, width: float, leading: float,
+                  font_size: float, color: Tuple[int, int, int]) -> None:
+        """Ligne de texte figurée (hauteur des minuscules, couleur éclaircie pour le petit texte)"""
+        if font_size < 12:
+            color = tuple(int(c + (255 - c) * 0.35) for c in color)
+        bar_height = font_size * 0.55
+        baseline = y + (leading - font_size) / 2 + font_size * 0.15
+        self.draw.rectangle(self.box(x, baseline, width, bar_height), fill=color)
+
+    def _image(self, image: Image, x: float, y: float, width: float, height: float) -> None:
+        from PIL import Image as PILImage
+
+        # Image déjà décodée par ReportLab (ImageReader), sinon relue depuis sa source
+        picture = getattr(image._img, "_image", None)
+        try:
+            if picture is None:
+                source = image.filename
+                picture = PILImage.open(io.BytesIO(source.getvalue()) if isinstance(source, io.BytesIO) else source)
+            picture = picture.convert("RGBA")
+        except Exception:
+            return
+        left, top, right, bottom = (round(v) for v in self.box(x, y, width, height))
+        if right <= left or bottom <= top:
+            return
+        picture = picture.resize((right - left, bottom - top), PILImage.LANCZOS)
+        self.image.paste(picture, (left, top), picture)
+
+    # Dessins vectoriels (séparateurs, graphiques) : formes simples
+    def _shapes(self, shapes: List[Any], x: float, y: float) -> None:
+        for shape in shapes:
+            if isinstance(shape, Group):
+                self._shapes(shape.contents, x, y)
+            elif isinstance(shape, Rect):
+                color = _rgb(shape.fillColor)
+                if color:
+                    self.draw.rectangle(self.box(x + shape.x, y + shape.y, shape.width, shape.height), fill=color)
+            elif isinstance(shape, Circle):
+                color = _rgb(shape.fillColor)
+                if color:
+                    self.draw.ellipse(self.box(x + shape.cx - shape.r, y + shape.cy - shape.r,
+                                               2 * shape.r, 2 * shape.r), fill=color)
+            elif isinstance(shape, Line):
+                color = _rgb(shape.strokeColor)
+                if color:
+                    self.draw.line([self.point(x + shape.x1, y + shape.y1), self.point(x + shape.x2, y + shape.y2)],
+                                   fill=color, width=max(1, round(shape.strokeWidth * self.scale)))
+            elif isinstance(shape, (Polygon, Wedge)):
+                polygon = shape.asPolygon() if isinstance(shape, Wedge) else shape
+                color = _rgb(polygon.fillColor)
+                points = polygon.points
+                if color and len(points) >= 6:
+                    self.draw.polygon([self.point(x + points[i], y + points[i + 1])
+                                       for i in range(0, len(points) - 1, 2)], fill=color)
+
+    def png(self) -> bytes:
+        from PIL import Image as PILImage
+
+        final = self.image.resize(self.final_size, PILImage.LANCZOS)
+        buffer = io.BytesIO()
+        final.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+
+
+def render_thumbnail(layout: FirstPageLayout, width_px: int = LARGEUR_VIGNETTE) -> bytes:
+    """
+    Vignette PNG de la première page à partir de sa mise en page relevée
+
+    Args:
+        layout: Relevé rempli pendant doc.build
+        width_px: Largeur de la vignette
+
+    Returns:
+        Octets PNG
+    """
+    painter = _ThumbnailPainter(layout.page_size, width_px)
+    for flowable, x, y, width, height in layout.placements:
+        painter.paint(flowable, x, y, width, height)
+    return painter.png()
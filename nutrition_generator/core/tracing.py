@@ -0,0 +1,195 @@
+"""
+Instrumentation par étapes (spans) de la génération PDF
+Désactivée par défaut : un span coûte alors un test d'attribut
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class _NoopSpan:
+    """Span inactif partagé (aucune allocation quand le traçage est désactivé)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start_ns", "depth")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        local = self.tracer._local
+        self.depth = getattr(local, "depth", 0)
+        local.depth = self.depth + 1
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        end_ns = time.perf_counter_ns()
+        self.tracer._local.depth = self.depth
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self, end_ns)
+        return False
+
+
+class Tracer:
+    """
+    Collecteur de spans
+
+    Chaque span enregistre nom, catégorie, début et durée (µs), processus,
+    thread et profondeur d'imbrication. Export en JSON lines ou au format
+    Chrome trace (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records = []
+        self._origin_ns = time.perf_counter_ns()
+
+    def span(self, name: str, cat: str = "pdf", **args: Any):
+        """
+        Contexte mesurant un bloc
+
+        Args:
+            name: Nom de l'étape
+            cat: Catégorie (section, chart, raster, image, build...)
+            **args: Attributs libres enregistrés avec le span
+
+        Returns:
+            Gestionnaire de contexte
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, cat, args)
+
+    def _record(self, span: _Span, end_ns: int) -> None:
+        record = {
+            "name": span.name,
+            "cat": span.cat,
+            "start_us": (span.start_ns - self._origin_ns) / 1000,
+            "dur_us": (end_ns - span.start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "depth": span.depth,
+            "args": span.args,
+        }
+        with self._lock:
+            self.records.append(record)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Durée cumulée, nombre d'appels et moyenne (ms) par étape, triés par durée"""
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            for record in self.records:
+                entry = totals.setdefault(record["name"], [0, 0.0])
+                entry[0] += 1
+                entry[1] += record["dur_us"]
+        ordered = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            name: {
+                "count": count,
+                "total_ms": round(total_us / 1000, 3),
+                "mean_ms": round(total_us / count / 1000, 3),
+            }
+            for name, (count, total_us) in ordered
+        }
+
+    def export_jsonl(self, path: str) -> int:
+        """
+        Écrit un span par ligne (JSON)
+
+        Returns:
+            Nombre de spans écrits
+        """
+        with self._lock:
+            records = list(self.records)
+        with open(path, "w", encoding="utf-8") as handler:
+            for record in records:
+                handler.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return len(records)
+
+    def export_chrome_trace(self, path: str) -> int:
+        """
+        Écrit les spans au format Chrome trace (événements complets 'X')
+
+        Returns:
+            Nombre de spans écrits
+        """
+        with self._lock:
+            records = list(self.records)
+        events = [
+            {
+                "name": record["name"],
+                "cat": record["cat"],
+                "ph": "X",
+                "ts": record["start_us"],
+                "dur": record["dur_us"],
+                "pid": record["pid"],
+                "tid": record["tid"],
+                "args": record["args"],
+            }
+            for record in records
+        ]
+        with open(path, "w", encoding="utf-8") as handler:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, handler, ensure_ascii=False)
+        return len(events)
+
+
+# Traceur du processus (désactivé par défaut)
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Traceur partagé par les générateurs du processus"""
+    return _tracer
+
+
+def traced(name: Optional[str] = None, cat: str = "section") -> Callable:
+    """
+    Décorateur de méthode : un span par appel quand le traçage est actif
+
+    Args:
+        name: Nom du span (défaut: nom de la fonction)
+        cat: Catégorie du span
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(_tracer, span_name, cat, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
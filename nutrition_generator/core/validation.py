@@ -0,0 +1,202 @@
+"""
+Règles de validation des données client et des paramètres nutritionnels
+Table unique utilisée par les modèles, le formulaire, le panneau de calculs
+et la validation en masse des listes de clients
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+
+@dataclass(frozen=True)
+class RangeRule:
+    """Champ numérique borné"""
+    field: str
+    minimum: float
+    maximum: float
+    message: str  # Valeur hors limites
+    type_message: str  # Valeur illisible
+    integer: bool = False
+    optional: bool = False  # None / vide autorisé
+
+    def check(self, value: Any) -> Optional[str]:
+        """Message d'erreur pour une valeur déjà convertie (None si valide)"""
+        if value is None:
+            return None if self.optional else self.type_message
+        if value < self.minimum or value > self.maximum:
+            return self.message
+        return None
+
+    def parse(self, text: str) -> Tuple[Optional[Union[int, float]], Optional[str]]:
+        """
+        Convertit et vérifie une saisie texte
+
+        Args:
+            text: Saisie de l'utilisateur
+
+        Returns:
+            Tuple (valeur ou None, erreur ou None) ; une saisie vide n'est pas une erreur
+        """
+        text = text.strip()
+        if not text:
+            return None, None
+        try:
+            value = int(text) if self.integer else float(text)
+        except ValueError:
+            return None, self.type_message
+        return value, self.check(value)
+
+
+@dataclass(frozen=True)
+class ChoiceRule:
+    """Champ à valeurs énumérées"""
+    field: str
+    choices: Tuple[str, ...]
+    message: str
+
+    def check(self, value: Any) -> Optional[str]:
+        return None if value in self.choices else self.message
+
+
+Rule = Union[RangeRule, ChoiceRule]
+
+CLIENT_RULES: Tuple[Rule, ...] = (
+    RangeRule("age", 10, 100, "L'âge doit être entre 10 et 100 ans",
+              "L'âge doit être un nombre entier", integer=True),
+    RangeRule("taille_cm", 100, 250, "La taille doit être entre 100 et 250 cm",
+              "La taille doit être un nombre entier", integer=True),
+    RangeRule("poids_kg", 30, 300, "Le poids doit être entre 30 et 300 kg",
+              "Le poids doit être un nombre"),
+    ChoiceRule("sexe", ("male", "female"), "Le sexe doit être 'male' ou 'female'"),
+    RangeRule("pourcentage_graisse", 3, 50, "Le % de graisse doit être entre 3 et 50%",
+              "Le % de graisse doit être un nombre", optional=True),
+)
+
+PARAMS_RULES: Tuple[Rule, ...] = (
+    ChoiceRule("formule_metabolisme", ("harris_benedict", "mifflin_st_jeor", "katch_mcardle"),
+               "Formule de métabolisme inconnue"),
+    RangeRule("facteur_activite", 1.0, 2.5, "Le facteur d'activité doit être entre 1.0 et 2.5",
+              "Le facteur d'activité doit être un nombre"),
+    RangeRule("deficit_surplus_kcal", -1000, 1000, "Le déficit/surplus doit être entre -1000 et +1000 kcal",
+              "Le déficit/surplus doit être un nombre entier", integer=True),
+    RangeRule("proteines_g_par_kg", 0.5, 4.0, "Les protéines doivent être entre 0.5 et 4.0 g/kg",
+              "Les protéines doivent être un nombre"),
+    RangeRule("lipides_g_par_kg", 0.3, 2.0, "Les lipides doivent être entre 0.3 et 2.0 g/kg",
+              "Les lipides doivent être un nombre"),
+)
+
+RULES_BY_FIELD: Dict[str, Rule] = {rule.field: rule for rule in CLIENT_RULES + PARAMS_RULES}
+
+
+def validate_record(rules: Sequence[Rule], record: Any) -> List[str]:
+    """
+    Toutes les erreurs d'un objet (ClientData, NutritionParams ou équivalent)
+
+    Args:
+        rules: Table de règles
+        record: Objet portant les champs en attributs
+
+    Returns:
+        Messages d'erreur, dans l'ordre de la table
+    """
+    errors = []
+    for rule in rules:
+        error = rule.check(getattr(record, rule.field))
+        if error:
+            errors.append(error)
+    return errors
+
+
+def ensure_valid(rules: Sequence[Rule], record: Any) -> None:
+    """Lève ValueError avec la première erreur (validation des dataclasses)"""
+    for rule in rules:
+        error = rule.check(getattr(record, rule.field))
+        if error:
+            raise ValueError(error)
+
+
+# ----------------------------------------------------------------------
+# Validation en masse (vectorisée)
+# ----------------------------------------------------------------------
+class BulkValidation:
+    """
+    Résultat de la validation d'un effectif en colonnes
+
+    `masks[field]` vaut True pour chaque ligne en erreur sur ce champ ;
+    `missing[field]` distingue les valeurs absentes ou illisibles.
+    """
+
+    def __init__(self, masks: Dict[str, Any], missing: Dict[str, Any], size: int):
+        import numpy as np
+
+        self.masks = masks
+        self.missing = missing
+        self.size = size
+        self.invalid = np.zeros(size, dtype=bool)
+        for mask in masks.values():
+            self.invalid |= mask
+
+    def invalid_rows(self):
+        """Indices des lignes en erreur"""
+        import numpy as np
+        return np.flatnonzero(self.invalid)
+
+    def field_error(self, field: str, index: int) -> Optional[str]:
+        """Message d'erreur d'un champ pour une ligne (None si valide)"""
+        if not self.masks[field][index]:
+            return None
+        rule = RULES_BY_FIELD[field]
+        missing = self.missing.get(field)
+        if missing is not None and missing[index]:
+            return rule.type_message
+        return rule.message
+
+    def row_errors(self, index: int) -> List[str]:
+        """Messages d'erreur d'une ligne, dans l'ordre de la table de règles"""
+        errors = []
+        for field in self.masks:
+            error = self.field_error(field, index)
+            if error:
+                errors.append(error)
+        return errors
+
+    def counts(self) -> Dict[str, int]:
+        """Nombre de lignes en erreur par champ"""
+        return {field: int(mask.sum()) for field, mask in self.masks.items() if mask.any()}
+
+
+def validate_columns(columns: Mapping[str, Any],
+                     rules: Sequence[Rule] = CLIENT_RULES + PARAMS_RULES) -> BulkValidation:
+    """
+    Valide toutes les lignes en une passe, sans exception
+
+    Args:
+        columns: Colonnes par champ ; numériques en flottants (NaN = absent ou
+            illisible), énumérées en chaînes. Les champs absents sont ignorés.
+        rules: Table de règles
+
+    Returns:
+        Masques d'erreur par ligne et par champ
+    """
+    import numpy as np
+
+    size = len(next(iter(columns.values()))) if columns else 0
+    masks: Dict[str, Any] = {}
+    missing_masks: Dict[str, Any] = {}
+    for rule in rules:
+        if rule.field not in columns:
+            continue
+        if isinstance(rule, ChoiceRule):
+            masks[rule.field] = ~np.isin(np.asarray(columns[rule.field]), rule.choices)
+            continue
+
+        values = np.asarray(columns[rule.field], dtype=np.float64)
+        missing = np.isnan(values)
+        if rule.integer:
+            values = np.trunc(values)
+        with np.errstate(invalid="ignore"):
+            out_of_range = (values < rule.minimum) | (values > rule.maximum)
+        masks[rule.field] = out_of_range if rule.optional else out_of_range | missing
+        missing_masks[rule.field] = missing
+
+    return BulkValidation(masks, missing_masks, size)
@@ -0,0 +1,209 @@
+"""
+Graphiques vectoriels natifs ReportLab (alternative aux rasters matplotlib)
+Mêmes visuels que les graphiques matplotlib, sans rastérisation ni PNG
+"""
+
+import math
+from typing import List, Sequence
+
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Circle, Drawing, Group, Line, Polygon, String
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib.colors import Color, HexColor, white
+
+
+MACRO_LABELS = ['Protéines', 'Lipides', 'Glucides']
+MACRO_COLORS = ['#2E86AB', '#E74C3C', '#27AE60']  # Bleu, Rouge, Vert
+TEXT_COLOR = HexColor('#2C3E50')
+
+
+def _alpha(hex_color: str, alpha: float) -> Color:
+    """Couleur hexadécimale avec transparence"""
+    base = HexColor(hex_color)
+    return Color(base.red, base.green, base.blue, alpha=alpha)
+
+
+def build_pie_drawing(values: Sequence[float], size: float,
+                      label_font_size: float = 8, title_font_size: float = 10) -> Drawing:
+    """
+    Camembert de répartition calorique en vectoriel
+
+    Args:
+        values: kcal des protéines, lipides et glucides
+        size: Côté du dessin en points
+        label_font_size: Taille des libellés
+        title_font_size: Taille du titre
+
+    Returns:
+        Drawing ReportLab
+    """
+    drawing = Drawing(size, size)
+    total = float(sum(values))
+
+    title_height = title_font_size * 2.2
+    radius = (size - title_height) * 0.34
+    cx = size / 2
+    cy = (size - title_height) / 2
+
+    pie = Pie()
+    pie.x = cx - radius
+    pie.y = cy - radius
+    pie.width = pie.height = radius * 2
+    pie.data = [max(float(v), 0.0) for v in values] if total > 0 else [1, 1, 1]
+    pie.labels = None
+    pie.startAngle = 90
+    pie.direction = 'anticlockwise'
+    pie.strokeWidth = 0
+    for index, color in enumerate(MACRO_COLORS):
+        pie.slices[index].fillColor = HexColor(color)
+        pie.slices[index].strokeColor = white
+        pie.slices[index].strokeWidth = 1
+        pie.slices[index].popout = radius * 0.02
+    drawing.add(pie)
+
+    # Pourcentages dans les parts, libellés à l'extérieur
+    angle = 90.0
+    for value, label in zip(values, MACRO_LABELS):
+        share = (float(value) / total) if total > 0 else 1 / 3
+        middle = math.radians(angle + share * 180.0)
+        angle += share * 360.0
+
+        inner_x = cx + math.cos(middle) * radius * 0.6
+        inner_y = cy + math.sin(middle) * radius * 0.6
+        drawing.add(String(
+            inner_x, inner_y - label_font_size / 3, f"{share * 100:.1f}%",
+            fontName='Helvetica-Bold', fontSize=label_font_size,
+            fillColor=white, textAnchor='middle'
+        ))
+
+        outer_x = cx + math.cos(middle) * radius * 1.15
+        outer_y = cy + math.sin(middle) * radius * 1.15
+        anchor = 'start' if math.cos(middle) > 0.1 else ('end' if math.cos(middle) < -0.1 else 'middle')
+        drawing.add(String(
+            outer_x, outer_y - label_font_size / 3, label,
+            fontName='Helvetica-Bold', fontSize=label_font_size,
+            fillColor=TEXT_COLOR, textAnchor=anchor
+        ))
+
+    drawing.add(String(
+        size / 2, size - title_font_size * 1.4, 'Répartition calorique',
+        fontName='Helvetica-Bold', fontSize=title_font_size,
+        fillColor=TEXT_COLOR, textAnchor='middle'
+    ))
+    return drawing
+
+
+def build_weight_drawing(weights: List[float], color: str,
+                         width: float, height: float) -> Drawing:
+    """
+    Projection de poids en vectoriel (zone de tolérance, grille, légende)
+
+    Args:
+        weights: Poids projeté par semaine (semaine 0 incluse)
+        color: Couleur de la courbe selon l'objectif
+        width: Largeur du dessin en points
+        height: Hauteur du dessin en points
+
+    Returns:
+        Drawing ReportLab
+    """
+    drawing = Drawing(width, height)
+    last_week = len(weights) - 1
+
+    plot = LinePlot()
+    plot.x = 42
+    plot.y = 34
+    plot.width = width - plot.x - 12
+    plot.height = height - plot.y - 28
+
+    x_min, x_max = -0.5, last_week + 0.5
+    y_min = min(weights) - 1.0
+    y_max = max(weights) + 1.0
+
+    def to_x(week: float) -> float:
+        return plot.x + (week - x_min) / (x_max - x_min) * plot.width
+
+    def to_y(weight: float) -> float:
+        return plot.y + (weight - y_min) / (y_max - y_min) * plot.height
+
+    # Zone de tolérance ±0.5 kg (dessinée sous la courbe)
+    band_points: List[float] = []
+    for week, weight in enumerate(weights):
+        band_points.extend([to_x(week), to_y(weight + 0.5)])
+    for week in range(last_week, -1, -1):
+        band_points.extend([to_x(week), to_y(weights[week] - 0.5)])
+    drawing.add(Polygon(band_points, fillColor=_alpha(color, 0.15), strokeColor=None))
+
+    # Courbe principale et grille
+    plot.data = [[(week, weight) for week, weight in enumerate(weights)]]
+    plot.lines[0].strokeColor = HexColor(color)
+    plot.lines[0].strokeWidth = 2.2
+    plot.lines[0].symbol = makeMarker('Circle', size=4.5, fillColor=white,
+                                      strokeColor=HexColor(color), strokeWidth=1.4)
+    plot.xValueAxis.valueMin = x_min
+    plot.xValueAxis.valueMax = x_max
+    plot.xValueAxis.valueSteps = list(range(0, last_week + 1, max(1, last_week // 6)))
+    plot.yValueAxis.valueMin = y_min
+    plot.yValueAxis.valueMax = y_max
+    for axis in (plot.xValueAxis, plot.yValueAxis):
+        axis.visibleGrid = True
+        axis.gridStrokeColor = HexColor('#E0E0E0')
+        axis.gridStrokeWidth = 0.6
+        axis.strokeColor = HexColor('#D8DDE5')
+        axis.labels.fontName = 'Helvetica'
+        axis.labels.fontSize = 7
+        axis.labels.fillColor = TEXT_COLOR
+    plot.xValueAxis.labelTextFormat = '%d'
+    plot.yValueAxis.labelTextFormat = '%.1f'
+    drawing.add(plot)
+
+    # Points remarquables et annotations
+    start_x, start_y = to_x(0), to_y(weights[0])
+    end_x, end_y = to_x(last_week), to_y(weights[-1])
+    drawing.add(Circle(start_x, start_y, 4.5, fillColor=HexColor('#2E86AB'),
+                       strokeColor=white, strokeWidth=1.2))
+    drawing.add(Circle(end_x, end_y, 4.5, fillColor=HexColor('#27AE60'),
+                       strokeColor=white, strokeWidth=1.2))
+    drawing.add(Line(start_x + 5, start_y + 5, start_x + 16, start_y + 12,
+                     strokeColor=HexColor('#2E86AB'), strokeWidth=1))
+    drawing.add(String(start_x + 18, start_y + 13, f'{weights[0]:.1f} kg',
+                       fontName='Helvetica-Bold', fontSize=8,
+                       fillColor=HexColor('#2E86AB')))
+    drawing.add(Line(end_x - 5, end_y - 5, end_x - 16, end_y - 12,
+                     strokeColor=HexColor('#27AE60'), strokeWidth=1))
+    drawing.add(String(end_x - 18, end_y - 20, f'Objectif {weights[-1]:.1f} kg',
+                       fontName='Helvetica-Bold', fontSize=8,
+                       fillColor=HexColor('#27AE60'), textAnchor='end'))
+
+    # Titres et axes
+    drawing.add(String(width / 2, height - 14,
+                       f'Évolution projetée du poids sur {last_week} semaines',
+                       fontName='Helvetica-Bold', fontSize=10,
+                       fillColor=TEXT_COLOR, textAnchor='middle'))
+    drawing.add(String(plot.x + plot.width / 2, 6, 'Semaines',
+                       fontName='Helvetica-Bold', fontSize=8,
+                       fillColor=TEXT_COLOR, textAnchor='middle'))
+    axis_title = Group(String(0, 0, 'Poids (kg)', fontName='Helvetica-Bold',
+                              fontSize=8, fillColor=TEXT_COLOR, textAnchor='middle'))
+    axis_title.transform = (0, 1, -1, 0, 10, plot.y + plot.height / 2)  # Rotation 90°
+    drawing.add(axis_title)
+
+    legend = Legend()
+    legend.x = plot.x + plot.width - 118
+    legend.y = plot.y + plot.height - 4
+    legend.fontName = 'Helvetica'
+    legend.fontSize = 7
+    legend.dx = legend.dy = 6
+    legend.deltay = 9
+    legend.columnMaximum = 4
+    legend.alignment = 'right'
+    legend.colorNamePairs = [
+        (_alpha(color, 0.3), 'Zone de tolérance (±0.5kg)'),
+        (HexColor(color), 'Évolution cible'),
+        (HexColor('#2E86AB'), 'Poids actuel'),
+        (HexColor('#27AE60'), f'Objectif {last_week} semaines'),
+    ]
+    drawing.add(legend)
+    return drawing
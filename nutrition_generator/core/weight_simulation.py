@@ -0,0 +1,202 @@
+"""
+Simulation de l'évolution du poids, semaine par semaine
+Le métabolisme de base est recalculé avec le poids à chaque pas, pour tout un
+effectif à la fois (matrice clients x semaines)
+"""
+
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from core.batch_calculations import ArrayLike, BatchNutritionCalculator
+from core.data_models import ClientData, NutritionParams
+
+
+# Énergie stockée ou libérée par kg de masse corporelle (kcal)
+ENERGIE_PAR_KG = 7700.0
+
+# Horizon de projection par défaut (semaines)
+HORIZON_PAR_DEFAUT = 12
+
+
+@dataclass
+class WeightProjection:
+    """Trajectoires simulées (une ligne par client, semaine 0 incluse)"""
+    poids: np.ndarray  # (clients, semaines + 1) en kg
+    valide: np.ndarray  # False si la formule demandée n'est pas calculable
+
+    @property
+    def semaines(self) -> int:
+        return self.poids.shape[1] - 1
+
+    @property
+    def bilan_kcal(self) -> np.ndarray:
+        """Bilan énergétique quotidien de chaque semaine (clients, semaines)"""
+        return np.diff(self.poids, axis=1) * ENERGIE_PAR_KG / 7
+
+    @property
+    def variation_kg(self) -> np.ndarray:
+        """Variation totale sur l'horizon, par client"""
+        return self.poids[:, -1] - self.poids[:, 0]
+
+    @property
+    def kg_par_semaine(self) -> np.ndarray:
+        """Variation moyenne par semaine sur l'horizon, par client"""
+        return self.variation_kg / max(self.semaines, 1)
+
+    def row(self, index: int) -> List[float]:
+        """Poids projeté d'un client, semaine par semaine"""
+        if not self.valide[index]:
+            raise ValueError(
+                "Le pourcentage de graisse corporelle est requis pour Katch-McArdle"
+            )
+        return self.poids[index].tolist()
+
+
+class WeightSimulator:
+    """
+    Projection du poids avec métabolisme recalculé
+
+    Les apports restent ceux de l'objectif de départ (TDEE initial + déficit
+    ou surplus) ; à chaque semaine, la dépense est recalculée avec le poids
+    atteint (même formule de BMR, même facteur d'activité, % de graisse
+    constant pour Katch-McArdle). Le bilan se réduit donc à mesure que le
+    poids change, au lieu d'une droite `déficit x 7 / 7700`.
+
+    `adaptation` ajoute une adaptation métabolique : la baisse (ou la hausse)
+    de dépense prédite par la formule est amplifiée de cette fraction
+    (0.1 = 10 % de plus que prévu, 0 = pas d'adaptation).
+
+    Les trois formules de BMR sont affines en poids : leur pente (kcal/j par
+    kg) est évaluée une fois par client, et chaque semaine ne coûte ensuite
+    que quelques opérations sur des tableaux.
+    """
+
+    def __init__(self, adaptation: float = 0.0):
+        """
+        Initialise le simulateur
+
+        Args:
+            adaptation: Fraction d'adaptation métabolique (0 à 1)
+        """
+        if not 0.0 <= adaptation <= 1.0:
+            raise ValueError("L'adaptation métabolique doit être entre 0 et 1")
+        self.adaptation = adaptation
+        self.calculator = BatchNutritionCalculator()
+
+    def _bmr(self, codes: np.ndarray, weight: np.ndarray, height: np.ndarray,
+             ages: np.ndarray, is_male: np.ndarray, body_fat: np.ndarray) -> np.ndarray:
+        """BMR de chaque client avec sa formule (mêmes formules que calculate_batch)"""
+        return np.choose(codes, (
+            self.calculator.harris_benedict(weight, height, ages, is_male),
+            self.calculator.mifflin_st_jeor(weight, height, ages, is_male),
+            self.calculator.katch_mcardle(weight, body_fat),
+        ))
+
+    def simulate(self,
+                 poids_kg: ArrayLike,
+                 taille_cm: ArrayLike,
+                 age: ArrayLike,
+                 sexe: Union[Sequence[str], np.ndarray],
+                 facteur_activite: ArrayLike,
+                 deficit_surplus_kcal: ArrayLike,
+                 pourcentage_graisse: Optional[ArrayLike] = None,
+                 formule: Union[str, Iterable[str]] = "mifflin_st_jeor",
+                 semaines: int = HORIZON_PAR_DEFAUT) -> WeightProjection:
+        """
+        Simule tout un effectif sur `semaines` semaines
+
+        Chaque pas avance tous les clients d'une semaine en une opération
+        par tableau ; le coût ne dépend que de clients x semaines.
+
+        Args:
+            poids_kg: Poids de départ en kg
+            taille_cm: Taille en cm
+            age: Âge en années
+            sexe: 'male' ou 'female' par client
+            facteur_activite: Facteur d'activité
+            deficit_surplus_kcal: Déficit (-) ou surplus (+) en kcal/jour
+            pourcentage_graisse: % de graisse (NaN ou None si inconnu)
+            formule: Formule unique ou une formule par client
+            semaines: Horizon de la projection
+
+        Returns:
+            Trajectoires simulées
+        """
+        if semaines < 1:
+            raise ValueError("L'horizon doit être d'au moins une semaine")
+        weight = np.asarray(poids_kg, dtype=np.float64)
+        size = weight.shape[0]
+        height = np.asarray(taille_cm, dtype=np.float64)
+        ages = np.asarray(age, dtype=np.float64)
+        is_male = np.asarray(sexe) == 'male'
+        activity = np.asarray(facteur_activite, dtype=np.float64)
+        deficit = np.asarray(deficit_surplus_kcal, dtype=np.float64)
+        if pourcentage_graisse is None:
+            body_fat = np.full(size, np.nan)
+        else:
+            body_fat = np.array(
+                [np.nan if value is None else value for value in pourcentage_graisse],
+                dtype=np.float64
+            )
+        codes = self.calculator.formule_codes(formule, size)
+
+        bmr_initial = self._bmr(codes, weight, height, ages, is_male, body_fat)
+        # Variation de dépense par kg de poids, adaptation comprise :
+        # dépense(P) = TDEE initial + pente x (P - poids initial)
+        pente = (self._bmr(codes, weight + 1.0, height, ages, is_male, body_fat) - bmr_initial)
+        pente *= activity * (1.0 + self.adaptation)
+
+        # Apports fixes (TDEE initial + déficit) : bilan = déficit - pente x écart
+        poids = np.empty((size, semaines + 1))
+        poids[:, 0] = weight
+        ecart = np.zeros(size)
+        for week in range(1, semaines + 1):
+            ecart += (deficit - pente * ecart) * (7 / ENERGIE_PAR_KG)
+            np.add(weight, ecart, out=poids[:, week])
+
+        return WeightProjection(poids=poids, valide=np.isfinite(bmr_initial))
+
+    def simulate_roster(self, clients: Sequence[ClientData], params: Sequence[NutritionParams],
+                        semaines: int = HORIZON_PAR_DEFAUT) -> WeightProjection:
+        """Variante prenant des listes de ClientData / NutritionParams"""
+        if len(clients) != len(params):
+            raise ValueError("Il faut autant de paramètres que de clients")
+
+        return self.simulate(
+            poids_kg=[c.poids_kg for c in clients],
+            taille_cm=[c.taille_cm for c in clients],
+            age=[c.age for c in clients],
+            sexe=[c.sexe for c in clients],
+            pourcentage_graisse=[c.pourcentage_graisse for c in clients],
+            facteur_activite=[p.facteur_activite for p in params],
+            deficit_surplus_kcal=[p.deficit_surplus_kcal for p in params],
+            formule=[p.formule_metabolisme for p in params],
+            semaines=semaines
+        )
+
+    def simulate_client(self, client: ClientData, params_dict: Mapping[str, Any],
+                        semaines: int = HORIZON_PAR_DEFAUT) -> WeightProjection:
+        """
+        Projection d'un seul client (format des paramètres du générateur PDF)
+
+        Args:
+            client: Données du client
+            params_dict: Paramètres nutritionnels (NutritionParams.to_dict())
+            semaines: Horizon de la projection
+
+        Returns:
+            Trajectoire simulée (une ligne)
+        """
+        return self.simulate(
+            poids_kg=[client.poids_kg],
+            taille_cm=[client.taille_cm],
+            age=[client.age],
+            sexe=[client.sexe],
+            pourcentage_graisse=[client.pourcentage_graisse],
+            facteur_activite=[params_dict.get("facteur_activite", 1.55)],
+            deficit_surplus_kcal=[params_dict.get("deficit_surplus_kcal", 0)],
+            formule=params_dict.get("formule_metabolisme", "mifflin_st_jeor"),
+            semaines=semaines
+        )
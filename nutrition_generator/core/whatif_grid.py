@@ -0,0 +1,176 @@
+"""
+Grille « et si » : résultats précalculés d'un client sur tout le domaine
+des curseurs activité / objectif calorique
+"""
+
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.batch_calculations import BatchNutritionCalculator
+from core.data_models import ClientData, NutritionParams, NutritionResults
+
+
+# Domaine des curseurs (bornes de validation de NutritionParams)
+ACTIVITE_MIN, ACTIVITE_MAX, ACTIVITE_PAS = 1.0, 2.5, 0.025
+DEFICIT_MIN, DEFICIT_MAX, DEFICIT_PAS = -1000, 1000, 25
+
+# Décimales des champs de NutritionResults (identiques à NutritionCalculator)
+_DECIMALES = {
+    "proteines_g": 1,
+    "lipides_g": 1,
+    "glucides_g": 1,
+}
+
+# Champs proposés dans le tableau de sensibilité
+CHAMPS_SENSIBILITE = {
+    "calories_objectif": "Calories objectif (kcal)",
+    "tdee": "Dépense totale TDEE (kcal)",
+    "glucides_g": "Glucides (g)",
+    "glucides_kcal": "Glucides (kcal)",
+    "hydratation_ml": "Hydratation (ml)",
+}
+
+
+@dataclass(frozen=True)
+class GridKey:
+    """Entrées fixes de la grille : tout ce qui ne dépend pas des deux curseurs"""
+    poids_kg: float
+    taille_cm: int
+    age: int
+    sexe: str
+    pourcentage_graisse: Optional[float]
+    formule_metabolisme: str
+    proteines_g_par_kg: float
+    lipides_g_par_kg: float
+
+    @classmethod
+    def of(cls, client: ClientData, params: NutritionParams) -> "GridKey":
+        return cls(
+            client.poids_kg, client.taille_cm, client.age, client.sexe,
+            client.pourcentage_graisse, params.formule_metabolisme,
+            params.proteines_g_par_kg, params.lipides_g_par_kg
+        )
+
+
+class WhatIfGrid:
+    """
+    Résultats d'un client pour chaque couple (activité, déficit) de la grille
+
+    La grille est remplie en une passe par le calculateur vectorisé. Sur un
+    nœud de la grille (cas des crans des curseurs), le résultat est identique
+    au calcul scalaire ; entre deux nœuds, il est interpolé linéairement.
+    """
+
+    def __init__(self, client: ClientData, params: NutritionParams,
+                 calculator: Optional[BatchNutritionCalculator] = None):
+        """
+        Calcule la grille
+
+        Args:
+            client: Données du client
+            params: Paramètres (formule et macros ; activité et déficit ignorés)
+            calculator: Calculateur vectorisé (un nouveau par défaut)
+        """
+        self.key = GridKey.of(client, params)
+        self.activites = np.round(np.arange(ACTIVITE_MIN, ACTIVITE_MAX + ACTIVITE_PAS / 2, ACTIVITE_PAS), 3)
+        self.deficits = np.arange(DEFICIT_MIN, DEFICIT_MAX + 1, DEFICIT_PAS)
+
+        activite, deficit = np.meshgrid(self.activites, self.deficits, indexing="ij")
+        size = activite.size
+        results = (calculator or BatchNutritionCalculator()).calculate_batch(
+            poids_kg=np.full(size, client.poids_kg),
+            taille_cm=np.full(size, client.taille_cm),
+            age=np.full(size, client.age),
+            sexe=np.full(size, client.sexe),
+            pourcentage_graisse=[client.pourcentage_graisse] * size,
+            facteur_activite=activite.ravel(),
+            deficit_surplus_kcal=deficit.ravel(),
+            proteines_g_par_kg=np.full(size, params.proteines_g_par_kg),
+            lipides_g_par_kg=np.full(size, params.lipides_g_par_kg),
+            formule=params.formule_metabolisme
+        )
+        self.valide = bool(results.valide.all())
+        shape = activite.shape
+        # Un tableau (activités x déficits) par champ de NutritionResults
+        self.values: Dict[str, np.ndarray] = {
+            field.name: getattr(results, field.name).reshape(shape)
+            for field in fields(NutritionResults)
+        }
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.activites), len(self.deficits)
+
+    def matches(self, client: ClientData, params: NutritionParams) -> bool:
+        """True si la grille correspond à ce client et à ces paramètres fixes"""
+        return self.key == GridKey.of(client, params)
+
+    @staticmethod
+    def _position(value: float, start: float, step: float, count: int) -> Tuple[int, float]:
+        """Indice du nœud inférieur et fraction vers le suivant (0 sur un nœud)"""
+        position = (value - start) / step
+        nearest = round(position)
+        if abs(position - nearest) < 1e-6:
+            position = nearest
+        if position < 0 or position > count - 1:
+            raise ValueError(f"Valeur hors de la grille: {value}")
+        lower = min(int(position), count - 2)
+        return lower, position - lower
+
+    def lookup(self, facteur_activite: float, deficit_surplus_kcal: float) -> NutritionResults:
+        """
+        Résultats pour un couple de valeurs des curseurs
+
+        Args:
+            facteur_activite: Facteur d'activité (1.0 - 2.5)
+            deficit_surplus_kcal: Déficit (-) ou surplus (+) en kcal
+
+        Returns:
+            Résultats exacts sur un nœud, interpolés entre deux nœuds
+        """
+        if not self.valide:
+            raise ValueError(
+                "Le pourcentage de graisse corporelle est requis pour Katch-McArdle"
+            )
+        i, fa = self._position(facteur_activite, ACTIVITE_MIN, ACTIVITE_PAS, len(self.activites))
+        j, fd = self._position(deficit_surplus_kcal, DEFICIT_MIN, DEFICIT_PAS, len(self.deficits))
+
+        values = {}
+        for name, table in self.values.items():
+            if fa == 0 and fd == 0:
+                values[name] = float(table[i, j])
+                continue
+            if name == "hydratation_ml":
+                # Paliers d'activité alignés sur les nœuds : valeur du nœud inférieur
+                values[name] = float(table[i, j])
+                continue
+            corners = table[i:i + 2, j:j + 2]
+            interpolated = (
+                corners[0, 0] * (1 - fa) * (1 - fd) + corners[1, 0] * fa * (1 - fd)
+                + corners[0, 1] * (1 - fa) * fd + corners[1, 1] * fa * fd
+            )
+            values[name] = float(round(float(interpolated), _DECIMALES.get(name, 0)))
+        return NutritionResults(**values)
+
+    def sensitivity_table(self, field: str = "calories_objectif",
+                          activites: Optional[Sequence[float]] = None,
+                          deficits: Optional[Sequence[float]] = None) -> List[List[float]]:
+        """
+        Extrait un tableau de sensibilité (une ligne par activité, une colonne par déficit)
+
+        Args:
+            field: Champ de NutritionResults
+            activites: Activités des lignes (défaut: toute la grille)
+            deficits: Déficits des colonnes (défaut: toute la grille)
+
+        Returns:
+            Valeurs du champ
+        """
+        activites = self.activites if activites is None else activites
+        deficits = self.deficits if deficits is None else deficits
+        return [
+            [getattr(self.lookup(activite, deficit), field) for deficit in deficits]
+            for activite in activites
+        ]
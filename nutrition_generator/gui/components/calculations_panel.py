@@ -9,6 +9,7 @@ from core.data_models import (
     FORMULES_METABOLISME, NIVEAUX_ACTIVITE
 )
 from core.calculations import NutritionCalculator
+from core.validation import RULES_BY_FIELD
 
 
 class CalculationsPanel(ctk.CTkFrame):
@@ -27,6 +28,9 @@ class CalculationsPanel(ctk.CTkFrame):
         self.on_calculation_update = on_calculation_update
         self.calculator = NutritionCalculator()
         self.current_results: Optional[NutritionResults] = None
+        # Grille « et si » du client courant (activité x objectif), construite au premier glissement
+        self.whatif_grid = None
+        self._current_client: Optional[ClientData] = None
 
         self._setup_ui()
         self._setup_defaults()
@@ -213,6 +217,21 @@ class CalculationsPanel(ctk.CTkFrame):
         )
         self.reset_button.grid(row=0, column=1, padx=(8, 0), pady=8, sticky="ew")
 
+        self.sensitivity_button = ctk.CTkButton(
+            self.buttons_frame,
+            text="Tableau de sensibilité",
+            command=self._open_sensitivity_table,
+            font=ctk.CTkFont(size=12),
+            height=30,
+            fg_color="transparent",
+            border_width=1,
+            border_color="#3498db",
+            text_color="#2980b9",
+            hover_color="#eaf2f8",
+            corner_radius=6
+        )
+        self.sensitivity_button.grid(row=1, column=0, columnspan=2, pady=(0, 8), sticky="ew")
+
         # Configuration des colonnes du scroll frame
         self.main_scroll.grid_columnconfigure(0, weight=1)
         self.main_scroll.grid_columnconfigure(1, weight=1)
@@ -248,10 +267,66 @@ class CalculationsPanel(ctk.CTkFrame):
     def _on_activite_change(self, value):
         """Gestionnaire de changement du niveau d'activité"""
         self._update_activite_description()
+        self._preview_from_grid()
 
     def _on_objectif_change(self, value):
         """Gestionnaire de changement de l'objectif"""
         self._update_objectif_description()
+        self._preview_from_grid()
+
+    def _get_whatif_grid(self, params: NutritionParams):
+        """
+        Grille du client courant, recalculée si le client, la formule ou les macros ont changé
+
+        Args:
+            params: Paramètres courants
+
+        Returns:
+            WhatIfGrid
+        """
+        from core.whatif_grid import WhatIfGrid
+
+        if self.whatif_grid is None or not self.whatif_grid.matches(self._current_client, params):
+            self.whatif_grid = WhatIfGrid(self._current_client, params)
+        return self.whatif_grid
+
+    def _preview_from_grid(self):
+        """Affiche instantanément les résultats lus dans la grille pendant le glissement"""
+        if self._current_client is None:
+            return
+        params = self.get_current_params()
+        if params is None:
+            return
+
+        try:
+            grid = self._get_whatif_grid(params)
+            self.current_results = grid.lookup(params.facteur_activite, params.deficit_surplus_kcal)
+        except ValueError as e:
+            print(f"Erreur de calcul: {e}")
+            return
+
+        self._update_macro_suggestions()
+        if self.on_calculation_update:
+            self.on_calculation_update(self.current_results, params)
+
+    def _open_sensitivity_table(self):
+        """Ouvre le tableau activité x objectif du client courant"""
+        params = self.get_current_params()
+        if self._current_client is None or params is None:
+            return
+
+        from gui.components.sensitivity_table import SensitivityTable
+
+        grid = self._get_whatif_grid(params)
+        if not grid.valide:
+            return
+        client = self._current_client
+        SensitivityTable(
+            self.winfo_toplevel(), grid,
+            client_label=f"- {client.prenom} {client.nom}",
+            activite=params.facteur_activite,
+            deficit=params.deficit_surplus_kcal
+        )
 
     def _on_entry_change(self, event=None):
         """Gestionnaire de changement dans les entries"""
@@ -309,28 +384,25 @@ class CalculationsPanel(ctk.CTkFrame):
             Tuple (proteines, lipides, errors)
         """
         errors = []
-
-        try:
-            proteines = float(self.proteines_entry.get())
-            if proteines < 0.5 or proteines > 4.0:
-                errors.append("Protéines: 0.5-4.0 g/kg")
-        except ValueError:
-            errors.append("Protéines: valeur invalide")
-            proteines = 1.8
-
-        try:
-            lipides = float(self.lipides_entry.get())
-            if lipides < 0.3 or lipides > 2.0:
-                errors.append("Lipides: 0.3-2.0 g/kg")
-        except ValueError:
-            errors.append("Lipides: valeur invalide")
-            lipides = 1.0
-
+        values = {}
+        defaults = {"proteines_g_par_kg": 1.8, "lipides_g_par_kg": 1.0}
+        entries = {"proteines_g_par_kg": self.proteines_entry, "lipides_g_par_kg": self.lipides_entry}
+
+        for field, entry in entries.items():
+            rule = RULES_BY_FIELD[field]
+            value, error = rule.parse(entry.get())
+            if value is None:
+                error = error or rule.type_message  # Champ obligatoire
+            if error:
+                errors.append(error)
+            values[field] = defaults[field] if value is None else value
+
+        proteines, lipides = values["proteines_g_par_kg"], values["lipides_g_par_kg"]
         return proteines, lipides, errors
 
     def _calculate_nutrition(self, client_data: ClientData = None):
         """Calcule les besoins nutritionnels"""
-        if not hasattr(self, '_current_client') or self._current_client is None:
+        if self._current_client is None:
             return
 
         # Validation des macros
@@ -376,6 +448,9 @@ class CalculationsPanel(ctk.CTkFrame):
         Args:
             client_data: Données du client
         """
+        if client_data != self._current_client:
+            # Champs client modifiés : la grille « et si » n'est plus valable
+            self.whatif_grid = None
         self._current_client = client_data
 
         # Suggestions automatiques basées sur l'objectif
@@ -383,7 +458,7 @@ class CalculationsPanel(ctk.CTkFrame):
 
     def _update_macro_suggestions(self):
         """Met à jour les suggestions de macronutriments"""
-        if not hasattr(self, '_current_client') or self._current_client is None:
+        if self._current_client is None:
             return
 
         objectif_value = int(self.objectif_slider.get())
@@ -427,5 +502,5 @@ class CalculationsPanel(ctk.CTkFrame):
 
     def auto_calculate_if_ready(self):
         """Calcule automatiquement si les données sont prêtes"""
-        if hasattr(self, '_current_client') and self._current_client is not None:
+        if self._current_client is not None:
             self._calculate_nutrition()
\ No newline at end of file
@@ -3,8 +3,9 @@ Composant de formulaire client pour la saisie des données personnelles
 """
 
 import customtkinter as ctk
-from typing import Dict, Callable, Optional
+from typing import Dict, Callable, Optional, List, Tuple
 from core.data_models import ClientData
+from core.validation import RULES_BY_FIELD
 
 
 class ClientForm(ctk.CTkFrame):
@@ -199,7 +200,19 @@ class ClientForm(ctk.CTkFrame):
         self._validate_and_notify()
 
     def _validate_and_notify(self):
-        """Valide les données et notifie les changements"""
+        """Notifie les changements (le parent valide via validate(), une seule fois)"""
+        if self.on_data_change:
+            self.on_data_change()
+        else:
+            self.validate()
+
+    def validate(self) -> Tuple[List[str], Optional[ClientData]]:
+        """
+        Valide le formulaire une seule fois et met à jour le message d'erreur
+
+        Returns:
+            Tuple (erreurs, ClientData ou None)
+        """
         validation_errors = self._validate_data()
 
         if validation_errors:
@@ -207,9 +220,7 @@ class ClientForm(ctk.CTkFrame):
         else:
             self.validation_label.configure(text="")
 
-        # Notifier le parent du changement
-        if self.on_data_change:
-            self.on_data_change()
+        return validation_errors, self._build_client_data(validation_errors)
 
     def _validate_data(self) -> list:
         """
@@ -229,41 +240,17 @@ class ClientForm(ctk.CTkFrame):
             errors.append("Le prénom est obligatoire")
             return errors
 
-        # Validation de l'âge
-        try:
-            age = int(self.age_entry.get())
-            if age < 10 or age > 100:
-                errors.append("L'âge doit être entre 10 et 100 ans")
-        except ValueError:
-            if self.age_entry.get().strip():
-                errors.append("L'âge doit être un nombre entier")
-
-        # Validation de la taille
-        try:
-            taille = int(self.taille_entry.get())
-            if taille < 100 or taille > 250:
-                errors.append("La taille doit être entre 100 et 250 cm")
-        except ValueError:
-            if self.taille_entry.get().strip():
-                errors.append("La taille doit être un nombre entier")
-
-        # Validation du poids
-        try:
-            poids = float(self.poids_entry.get())
-            if poids < 30 or poids > 300:
-                errors.append("Le poids doit être entre 30 et 300 kg")
-        except ValueError:
-            if self.poids_entry.get().strip():
-                errors.append("Le poids doit être un nombre")
-
-        # Validation du pourcentage de graisse (optionnel)
-        if self.graisse_entry.get().strip():
-            try:
-                graisse = float(self.graisse_entry.get())
-                if graisse < 3 or graisse > 50:
-                    errors.append("Le % de graisse doit être entre 3 et 50%")
-            except ValueError:
-                errors.append("Le % de graisse doit être un nombre")
+        # Champs numériques : même table de règles que ClientData
+        entries = {
+            "age": self.age_entry,
+            "taille_cm": self.taille_entry,
+            "poids_kg": self.poids_entry,
+            "pourcentage_graisse": self.graisse_entry,
+        }
+        for field, entry in entries.items():
+            _, error = RULES_BY_FIELD[field].parse(entry.get())
+            if error:
+                errors.append(error)
 
         return errors
 
@@ -274,7 +261,10 @@ class ClientForm(ctk.CTkFrame):
         Returns:
             ClientData si valide, None sinon
         """
-        validation_errors = self._validate_data()
+        return self._build_client_data(self._validate_data())
+
+    def _build_client_data(self, validation_errors: List[str]) -> Optional[ClientData]:
+        """Construit ClientData à partir d'une validation déjà effectuée"""
         if validation_errors:
             return None
 
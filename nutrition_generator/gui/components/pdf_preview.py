@@ -5,29 +5,69 @@ Composant de prévisualisation et gestion des fichiers PDF générés
 import os
 import subprocess
 import platform
-from datetime import datetime
-from typing import List, Dict, Any, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Tuple
 import customtkinter as ctk
+from PIL import Image
 from core.data_models import FicheMetadata
+from core.fiche_index import FicheIndex, get_fiche_index
+from core.thumbnail_cache import ThumbnailCache, get_thumbnail_cache
+from gui.fiche_list import PERIODES, FicheListModel, period_start
+from gui.thumbnail_loader import ThumbnailLoader
+
+
+# Lignes de la liste (widgets créés une fois, réutilisés au défilement)
+FICHES_VISIBLES = 5
+
+# Intervalle de surveillance du dossier et de l'index (ms)
+SURVEILLANCE_MS = 2000
+
+# Délai après la dernière frappe avant d'appliquer la recherche (ms)
+RECHERCHE_DELAI_MS = 200
+
+# Taille des miniatures dans la liste et de l'aperçu (px, format A4)
+TAILLE_MINIATURE = (30, 42)
+TAILLE_APERCU = (180, 255)
 
 
 class PDFPreview(ctk.CTkFrame):
     """Composant pour afficher les résultats et gérer les PDFs générés"""
 
-    def __init__(self, parent, on_generate_pdf: Optional[Callable] = None, **kwargs):
+    def __init__(self, parent, on_generate_pdf: Optional[Callable] = None,
+                 fiche_index: Optional[FicheIndex] = None,
+                 thumbnail_cache: Optional[ThumbnailCache] = None, **kwargs):
         """
         Initialise le composant de prévisualisation
 
         Args:
             parent: Widget parent
             on_generate_pdf: Callback pour générer un PDF
+            fiche_index: Index des fiches (défaut: index partagé)
+            thumbnail_cache: Cache des vignettes (défaut: cache partagé)
         """
         super().__init__(parent, **kwargs)
 
         self.on_generate_pdf = on_generate_pdf
         self.output_directory = "output/fiches"
+        self.fiche_index = fiche_index or get_fiche_index()
         self.current_results = None
         self.current_params = None
+        self.fiche_list = FicheListModel(self.fiche_index, self.output_directory)
+        self.first_visible = 0  # Position de la première ligne affichée
+        self.visible_fiches: List[FicheMetadata] = []
+        self.fiche_rows: List[Tuple[Any, Any, Any]] = []  # Lignes réutilisées (cadre, libellé, miniature)
+        self.thumbnail_loader = ThumbnailLoader(self, thumbnail_cache or get_thumbnail_cache())
+        self.placeholder_image = ctk.CTkImage(Image.new("RGB", TAILLE_MINIATURE, "#ecf0f1"),
+                                              size=TAILLE_MINIATURE)
+        self.preview_window = None
+        self._search_job = None
+        self._watch_job = None
+        # Synchronisation du dossier avec l'index hors du thread Tk, une à la fois
+        self._sync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="synchro-fiches")
+        self._sync_running = False
+        self._sync_again = False
+        self.generation_jobs: Dict[int, Any] = {}  # Générations affichées, par identifiant
+        self._cancel_generation: Optional[Callable[[Any], None]] = None
 
         self._setup_ui()
         self._load_existing_pdfs()
@@ -68,6 +108,28 @@ class PDFPreview(ctk.CTkFrame):
         )
         self.generate_button.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(0, 15))
 
+        # Progression des générations (affichée pendant le rendu)
+        self.generation_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.generation_frame.grid_columnconfigure(0, weight=1)
+        self.generation_label = ctk.CTkLabel(
+            self.generation_frame, text="", font=ctk.CTkFont(size=11), text_color="#2c3e50"
+        )
+        self.generation_label.grid(row=0, column=0, columnspan=2, sticky="w")
+        self.generation_progress = ctk.CTkProgressBar(self.generation_frame)
+        self.generation_progress.set(0)
+        self.generation_progress.grid(row=1, column=0, sticky="ew", padx=(0, 8))
+        self.cancel_button = ctk.CTkButton(
+            self.generation_frame,
+            text="Annuler",
+            command=self._on_cancel_generation,
+            fg_color="#95a5a6",
+            hover_color="#7f8c8d",
+            width=80,
+            height=26,
+            corner_radius=4
+        )
+        self.cancel_button.grid(row=1, column=1)
+
         # Section fiches créées
         self.fiches_label = ctk.CTkLabel(
             self,
@@ -75,23 +137,54 @@ class PDFPreview(ctk.CTkFrame):
             font=ctk.CTkFont(size=13, weight="bold"),
             text_color="#2c3e50"
         )
-        self.fiches_label.grid(row=3, column=0, columnspan=2, pady=(0, 8), sticky="w")
+        self.fiches_label.grid(row=4, column=0, columnspan=2, pady=(0, 8), sticky="w")
+
+        # Recherche par client et filtre de date
+        self.search_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.search_frame.grid(row=5, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        self.search_frame.grid_columnconfigure(0, weight=1)
+
+        self.search_entry = ctk.CTkEntry(
+            self.search_frame,
+            placeholder_text="Rechercher un client...",
+            height=28
+        )
+        self.search_entry.grid(row=0, column=0, sticky="ew", padx=(0, 5))
+        self.search_entry.bind("<KeyRelease>", self._on_search_changed)
+
+        self.period_combo = ctk.CTkComboBox(
+            self.search_frame,
+            values=list(PERIODES),
+            state="readonly",
+            command=lambda _: self._apply_filters(),
+            width=150,
+            height=28
+        )
+        self.period_combo.set(next(iter(PERIODES)))
+        self.period_combo.grid(row=0, column=1)
 
-        # Zone scrollable pour les fiches
-        self.fiches_frame = ctk.CTkScrollableFrame(
+        # Liste virtualisée : seules les lignes visibles existent, remplies depuis l'index
+        self.fiches_frame = ctk.CTkFrame(
             self,
-            height=180,
-            label_text="Historique des fiches générées",
             fg_color="white",
             border_color="#bdc3c7",
             border_width=1
         )
-        self.fiches_frame.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(0, 10))
+        self.fiches_frame.grid(row=6, column=0, columnspan=2, sticky="ew", pady=(0, 10))
         self.fiches_frame.grid_columnconfigure(0, weight=1)
 
+        self.fiches_scrollbar = ctk.CTkScrollbar(self.fiches_frame, command=self._on_list_scroll)
+        self.fiches_scrollbar.grid(row=0, column=1, rowspan=FICHES_VISIBLES, sticky="ns", padx=(0, 2), pady=2)
+
+        self.empty_label = ctk.CTkLabel(self.fiches_frame, text="", text_color="gray")
+
+        for slot in range(FICHES_VISIBLES):
+            self.fiche_rows.append(self._create_pdf_row(slot))
+        self._bind_mouse_wheel(self.fiches_frame)
+
         # Boutons de gestion
         self.management_frame = ctk.CTkFrame(self)
-        self.management_frame.grid(row=5, column=0, columnspan=2, sticky="ew")
+        self.management_frame.grid(row=7, column=0, columnspan=2, sticky="ew")
         self.management_frame.grid_columnconfigure((0, 1), weight=1)
 
         self.open_folder_button = ctk.CTkButton(
@@ -108,7 +201,7 @@ class PDFPreview(ctk.CTkFrame):
         self.refresh_button = ctk.CTkButton(
             self.management_frame,
             text="Actualiser",
-            command=self._refresh_pdf_list,
+            command=self._on_refresh,
             fg_color="#95a5a6",
             hover_color="#7f8c8d",
             corner_radius=4,
@@ -184,90 +277,265 @@ class PDFPreview(ctk.CTkFrame):
         return text
 
     def _on_generate_pdf(self):
-        """Gestionnaire de génération PDF"""
+        """Gestionnaire de génération PDF (la liste est actualisée à la fin du rendu)"""
         if self.on_generate_pdf and self.current_results:
-            success = self.on_generate_pdf()
-            if success:
-                self._refresh_pdf_list()
+            self.on_generate_pdf()
+
+    def show_generation(self, job: Any, cancel: Callable[[Any], None]):
+        """
+        Affiche la progression d'une génération planifiée
+
+        Args:
+            job: Tâche de la file de génération
+            cancel: Annulation d'une tâche
+        """
+        self.generation_jobs[job.job_id] = job
+        self._cancel_generation = cancel
+        self.generation_frame.grid(row=3, column=0, columnspan=2, sticky="ew", pady=(0, 12))
+        self.update_generation(job)
+
+    def update_generation(self, job: Any):
+        """Met à jour la barre avec la génération la plus récente"""
+        if not self.generation_jobs:
+            return
+        latest = self.generation_jobs[max(self.generation_jobs)]
+        self.generation_progress.set(latest.progress if latest.stage == "mise_en_page" else 0)
+        others = len(self.generation_jobs) - 1
+        suffix = f" (+{others} en attente)" if others else ""
+        self.generation_label.configure(
+            text=f"Génération de {latest.request.client.prenom} {latest.request.client.nom}{suffix}"
+        )
+
+    def finish_generation(self, job: Any = None):
+        """Retire les générations terminées ; masque la barre s'il n'en reste aucune"""
+        self.generation_jobs = {
+            job_id: tracked for job_id, tracked in self.generation_jobs.items()
+            if not tracked.done and tracked is not job
+        }
+        if self.generation_jobs:
+            self.update_generation(None)
+        else:
+            self.generation_frame.grid_remove()
+
+    def _on_cancel_generation(self):
+        """Annule toutes les générations affichées"""
+        if self._cancel_generation:
+            for job in list(self.generation_jobs.values()):
+                self._cancel_generation(job)
 
     def _load_existing_pdfs(self):
         """Charge la liste des PDFs existants"""
         # Créer le dossier de sortie s'il n'existe pas
         os.makedirs(self.output_directory, exist_ok=True)
-        self._refresh_pdf_list()
-
-    def _refresh_pdf_list(self):
-        """Actualise la liste des PDFs"""
-        # Effacer les anciens widgets
-        for widget in self.fiches_frame.winfo_children():
-            widget.destroy()
+        self._on_refresh()
+        self._watch_job = self.after(SURVEILLANCE_MS, self._watch_changes)
+
+    def _on_refresh(self):
+        """Affiche l'index tel quel et le réaligne sur le dossier de sortie en arrière-plan"""
+        self.fiche_list.invalidate()
+        self._show_fiches()
+        self.fiche_list.directory_changed()  # Date relevée : la surveillance ne relance pas la même synchronisation
+        self._sync_in_background()
+
+    def _sync_in_background(self):
+        """Lance sync_directory sur le thread de synchronisation (relancée si déjà en cours)"""
+        if self._sync_running:
+            self._sync_again = True
+            return
+        self._sync_running = True
+        self._sync_executor.submit(self._sync_directory)
 
-        # Lister les fichiers PDF
+    def _sync_directory(self):
+        """Thread de synchronisation : listdir et écritures dans l'index"""
+        try:
+            self.fiche_index.sync_directory(self.output_directory)
+        except Exception as e:
+            print(f"Erreur lors de la synchronisation de l'index: {e}")
+        self.after(0, self._on_sync_done)
+
+    def _on_sync_done(self):
+        """Fin d'une synchronisation (thread Tk) : liste relue si l'index a changé"""
+        self._sync_running = False
+        if self._sync_again:
+            self._sync_again = False
+            self._sync_in_background()
+        self.refresh_fiches()
+
+    def refresh_fiches(self):
+        """Prend en compte les fiches ajoutées ou supprimées (après une génération)"""
+        if self.fiche_list.poll(sync=False):
+            self.thumbnail_loader.forget()  # Un PDF régénéré au même chemin change de vignette
+            self._show_fiches()
+
+    def _watch_changes(self):
+        """Surveillance périodique du dossier et de l'index, liste mise à jour sur place"""
         try:
-            pdf_files = [f for f in os.listdir(self.output_directory) if f.endswith('.pdf')]
-            pdf_files.sort(key=lambda x: os.path.getmtime(os.path.join(self.output_directory, x)), reverse=True)
-
-            if not pdf_files:
-                no_files_label = ctk.CTkLabel(
-                    self.fiches_frame,
-                    text="Aucune fiche générée",
-                    text_color="gray"
+            if self.fiche_list.directory_changed():
+                self._sync_in_background()
+            self.refresh_fiches()
+        except Exception as e:
+            print(f"Erreur lors de la surveillance des fiches: {e}")
+        self._watch_job = self.after(SURVEILLANCE_MS, self._watch_changes)
+
+    def destroy(self):
+        for job in (self._watch_job, self._search_job):
+            if job is not None:
+                self.after_cancel(job)
+        self.thumbnail_loader.shutdown()
+        self._sync_executor.shutdown(wait=False)
+        super().destroy()
+
+    def _on_search_changed(self, _event=None):
+        """Relance le délai de recherche à chaque frappe"""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(RECHERCHE_DELAI_MS, self._apply_filters)
+
+    def _apply_filters(self):
+        """Applique la recherche client et la période sélectionnée"""
+        self._search_job = None
+        self.fiche_list.set_filters(
+            client=self.search_entry.get(),
+            date_from=period_start(PERIODES.get(self.period_combo.get()))
+        )
+        self.first_visible = 0
+        self._show_fiches()
+
+    def _on_list_scroll(self, *args):
+        """Commande de la barre de défilement ('moveto' fraction ou 'scroll' n unités/pages)"""
+        if args[0] == "moveto":
+            first = round(float(args[1]) * self.fiche_list.total)
+        elif args[0] == "scroll":
+            step = FICHES_VISIBLES if args[2] == "pages" else 1
+            first = self.first_visible + int(args[1]) * step
+        else:
+            return
+        self._scroll_to(first)
+
+    def _on_mouse_wheel(self, event):
+        """Molette : une ligne par cran (Button-4/5 sous Linux)"""
+        step = -1 if event.num == 4 or event.delta > 0 else 1
+        self._scroll_to(self.first_visible + step)
+
+    def _bind_mouse_wheel(self, widget):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self._on_mouse_wheel)
+
+    def _scroll_to(self, first: int):
+        if first != self.first_visible:
+            self.first_visible = first
+            self._show_fiches()
+
+    def _show_fiches(self):
+        """Remplit les lignes visibles depuis le modèle (aucun widget créé ni détruit)"""
+        total = self.fiche_list.total
+        self.first_visible = max(0, min(self.first_visible, total - FICHES_VISIBLES))
+        self.visible_fiches = self.fiche_list.rows(self.first_visible, FICHES_VISIBLES)
+        # Les vignettes des lignes qui ne sont plus visibles ne sont pas lues
+        self.thumbnail_loader.forget_pending()
+
+        for slot, (item_frame, info_label, thumb_label) in enumerate(self.fiche_rows):
+            if slot < len(self.visible_fiches):
+                fiche = self.visible_fiches[slot]
+                client_name = f"{fiche.client_prenom} {fiche.client_nom}".strip()
+                info_label.configure(
+                    text=f"📄 {client_name}\n📅 {fiche.date_creation.strftime('%d/%m/%Y %H:%M')}"
                 )
-                no_files_label.grid(row=0, column=0, pady=20)
+                thumb_label.configure(image=self.placeholder_image)
+                self.thumbnail_loader.request(self._fiche_path(fiche), self._on_thumbnail_loaded)
+                item_frame.grid(row=slot, column=0, sticky="ew", pady=2, padx=5)
+            else:
+                item_frame.grid_remove()
+
+        self.fiches_label.configure(text=f"FICHES CRÉÉES ({total})")
+        if total:
+            self.empty_label.grid_remove()
+            self.fiches_scrollbar.set(self.first_visible / total,
+                                      (self.first_visible + len(self.visible_fiches)) / total)
+        else:
+            filtered = self.fiche_list.filters.get("client") or self.fiche_list.filters.get("date_from")
+            self.empty_label.configure(
+                text="Aucune fiche ne correspond à la recherche" if filtered else "Aucune fiche générée"
+            )
+            self.empty_label.grid(row=0, column=0, pady=20)
+            self.fiches_scrollbar.set(0, 1)
+
+    def _set_thumbnail(self, label, image: Optional[Any], size: Tuple[int, int]):
+        """Affiche une vignette (image PIL) ou l'emplacement vide"""
+        if image is None:
+            label.configure(image=self.placeholder_image)
+        else:
+            label.configure(image=ctk.CTkImage(image, size=size))
+
+    def _on_thumbnail_loaded(self, path: str, image: Optional[Any]):
+        """Vignette lue en arrière-plan (thread Tk) : mise à jour des lignes qui l'affichent encore"""
+        for fiche, (_, _, thumb_label) in zip(self.visible_fiches, self.fiche_rows):
+            if self._fiche_path(fiche) == path:
+                self._set_thumbnail(thumb_label, image, TAILLE_MINIATURE)
+
+    def _show_preview(self, fiche: FicheMetadata):
+        """Aperçu de la première page dans une petite fenêtre"""
+        if self.preview_window is None or not self.preview_window.winfo_exists():
+            self.preview_window = ctk.CTkToplevel(self)
+            self.preview_window.resizable(False, False)
+            self.preview_window.transient(self.winfo_toplevel())
+            self.preview_label = ctk.CTkLabel(self.preview_window, text="", compound="top")
+            self.preview_label.pack(padx=15, pady=15)
+
+        client_name = f"{fiche.client_prenom} {fiche.client_nom}".strip()
+        self.preview_window.title(f"Aperçu {client_name}".strip())
+        path = self._fiche_path(fiche)
+
+        def show(loaded_path: str, image: Optional[Any]):
+            if loaded_path != path or not self.preview_window.winfo_exists():
                 return
+            if image is None:
+                self.preview_label.configure(
+                    image=None, text="Pas d'aperçu pour cette fiche\n(générée en lot ou avant les vignettes)"
+                )
+            else:
+                self.preview_label.configure(image=ctk.CTkImage(image, size=TAILLE_APERCU), text="")
 
-            # Afficher chaque fichier
-            for i, filename in enumerate(pdf_files):
-                self._create_pdf_item(filename, i)
+        self.preview_label.configure(image=None, text="Chargement de l'aperçu...")
+        self.thumbnail_loader.request(path, show)
+        self.preview_window.lift()
 
-        except FileNotFoundError:
-            os.makedirs(self.output_directory, exist_ok=True)
+    def _on_row_action(self, slot: int, action: Callable[[FicheMetadata], None]):
+        """Applique une action à la fiche actuellement affichée sur la ligne"""
+        if slot < len(self.visible_fiches):
+            action(self.visible_fiches[slot])
 
-    def _create_pdf_item(self, filename: str, row: int):
+    def _create_pdf_row(self, slot: int) -> Tuple[Any, Any]:
         """
-        Crée un élément d'affichage pour un fichier PDF
+        Crée une ligne réutilisable de la liste
 
         Args:
-            filename: Nom du fichier
-            row: Ligne dans la grille
+            slot: Position de la ligne dans la zone visible
+
+        Returns:
+            Tuple (cadre, libellé d'information, miniature)
         """
         # Frame pour l'élément
         item_frame = ctk.CTkFrame(self.fiches_frame)
-        item_frame.grid(row=row, column=0, sticky="ew", pady=2, padx=5)
-        item_frame.grid_columnconfigure(0, weight=1)
-
-        # Informations du fichier
-        filepath = os.path.join(self.output_directory, filename)
-        file_stats = os.stat(filepath)
-        modification_time = datetime.fromtimestamp(file_stats.st_mtime)
+        item_frame.grid_columnconfigure(1, weight=1)
 
-        # Extraction des informations du nom de fichier
-        try:
-            # Format: Fiche_Prénom_Nom_AAAAMMJJ.pdf
-            parts = filename.replace('.pdf', '').split('_')
-            if len(parts) >= 4:
-                prenom = parts[1]
-                nom = parts[2]
-                date_str = parts[3]
-                client_name = f"{prenom} {nom}"
-            else:
-                client_name = filename.replace('.pdf', '')
-        except:
-            client_name = filename.replace('.pdf', '')
+        # Miniature de la première page (clic : aperçu agrandi)
+        thumb_label = ctk.CTkLabel(item_frame, text="", image=self.placeholder_image, cursor="hand2")
+        thumb_label.grid(row=0, column=0, padx=(6, 0), pady=4)
+        thumb_label.bind("<Button-1>", lambda _event: self._on_row_action(slot, self._show_preview))
 
         # Label d'information
-        info_text = f"📄 {client_name}\n📅 {modification_time.strftime('%d/%m/%Y %H:%M')}"
         info_label = ctk.CTkLabel(
             item_frame,
-            text=info_text,
+            text="",
             font=ctk.CTkFont(size=10),
             justify="left"
         )
-        info_label.grid(row=0, column=0, sticky="w", padx=10, pady=5)
+        info_label.grid(row=0, column=1, sticky="w", padx=10, pady=5)
 
         # Boutons d'action
         buttons_frame = ctk.CTkFrame(item_frame)
-        buttons_frame.grid(row=0, column=1, padx=10, pady=5)
+        buttons_frame.grid(row=0, column=2, padx=10, pady=5)
 
         open_button = ctk.CTkButton(
             buttons_frame,
@@ -275,7 +543,7 @@ class PDFPreview(ctk.CTkFrame):
             width=60,
             height=25,
             font=ctk.CTkFont(size=10),
-            command=lambda f=filename: self._open_pdf(f)
+            command=lambda: self._on_row_action(slot, self._open_pdf)
         )
         open_button.pack(side="left", padx=2)
 
@@ -287,18 +555,25 @@ class PDFPreview(ctk.CTkFrame):
             font=ctk.CTkFont(size=10),
             fg_color="red",
             hover_color="darkred",
-            command=lambda f=filename: self._delete_pdf(f)
+            command=lambda: self._on_row_action(slot, self._delete_pdf)
         )
         delete_button.pack(side="left", padx=2)
 
-    def _open_pdf(self, filename: str):
+        for widget in (item_frame, thumb_label, info_label, buttons_frame):
+            self._bind_mouse_wheel(widget)
+        return item_frame, info_label, thumb_label
+
+    def _fiche_path(self, fiche: FicheMetadata) -> str:
+        return fiche.chemin or os.path.join(self.output_directory, fiche.nom_fichier)
+
+    def _open_pdf(self, fiche: FicheMetadata):
         """
         Ouvre un fichier PDF avec l'application par défaut
 
         Args:
-            filename: Nom du fichier à ouvrir
+            fiche: Fiche à ouvrir
         """
-        filepath = os.path.join(self.output_directory, filename)
+        filepath = self._fiche_path(fiche)
         try:
             if platform.system() == 'Darwin':  # macOS
                 subprocess.call(['open', filepath])
@@ -309,24 +584,26 @@ class PDFPreview(ctk.CTkFrame):
         except Exception as e:
             print(f"Erreur lors de l'ouverture du PDF: {e}")
 
-    def _delete_pdf(self, filename: str):
+    def _delete_pdf(self, fiche: FicheMetadata):
         """
         Supprime un fichier PDF après confirmation
 
         Args:
-            filename: Nom du fichier à supprimer
+            fiche: Fiche à supprimer
         """
         # Boîte de dialogue de confirmation
         result = ctk.CTkInputDialog(
-            text=f"Voulez-vous vraiment supprimer '{filename}'?\nTapez 'OUI' pour confirmer:",
+            text=f"Voulez-vous vraiment supprimer '{fiche.nom_fichier}'?\nTapez 'OUI' pour confirmer:",
             title="Confirmation de suppression"
         )
 
         if result.get_input() == "OUI":
             try:
-                filepath = os.path.join(self.output_directory, filename)
-                os.remove(filepath)
-                self._refresh_pdf_list()
+                filepath = self._fiche_path(fiche)
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                self.fiche_index.remove_fiche(filepath)
+                self.refresh_fiches()
             except Exception as e:
                 print(f"Erreur lors de la suppression: {e}")
 
@@ -0,0 +1,105 @@
+"""
+Fenêtre « tableau de sensibilité » : effet de l'activité et de l'objectif
+calorique sur les besoins d'un client, lu dans sa grille précalculée
+"""
+
+import customtkinter as ctk
+from typing import Optional
+
+from core.data_models import NIVEAUX_ACTIVITE
+from core.whatif_grid import CHAMPS_SENSIBILITE, WhatIfGrid
+
+
+# Colonnes du tableau (kcal/jour)
+DEFICITS_AFFICHES = (-1000, -750, -500, -250, 0, 250, 500, 750, 1000)
+
+
+class SensitivityTable(ctk.CTkToplevel):
+    """Tableau activité x objectif calorique pour le coaching"""
+
+    def __init__(self, parent, grid: WhatIfGrid, client_label: str = "",
+                 activite: Optional[float] = None, deficit: Optional[float] = None):
+        """
+        Initialise la fenêtre
+
+        Args:
+            parent: Fenêtre parente
+            grid: Grille précalculée du client
+            client_label: Nom du client affiché dans le titre
+            activite: Activité courante (ligne mise en évidence)
+            deficit: Objectif courant (colonne mise en évidence)
+        """
+        super().__init__(parent)
+        self.grid_data = grid
+        self.activite = activite
+        self.deficit = deficit
+        self.cells = []
+
+        self.title(f"Tableau de sensibilité {client_label}".strip())
+        self.geometry("900x330")
+        self.transient(parent)
+
+        self.champ_combo = ctk.CTkComboBox(
+            self,
+            values=list(CHAMPS_SENSIBILITE.values()),
+            state="readonly",
+            command=lambda _: self._fill(),
+            width=260
+        )
+        self.champ_combo.set(CHAMPS_SENSIBILITE["calories_objectif"])
+        self.champ_combo.pack(anchor="w", padx=15, pady=(15, 5))
+
+        self.table_frame = ctk.CTkFrame(self, fg_color="white")
+        self.table_frame.pack(fill="both", expand=True, padx=15, pady=(5, 15))
+        self._build_headers()
+        self._fill()
+
+    def _selected_field(self) -> str:
+        selected = self.champ_combo.get()
+        for field, label in CHAMPS_SENSIBILITE.items():
+            if label == selected:
+                return field
+        return "calories_objectif"
+
+    def _build_headers(self):
+        """En-têtes : objectifs en colonnes, niveaux d'activité en lignes"""
+        ctk.CTkLabel(
+            self.table_frame, text="Activité \\ Objectif",
+            font=ctk.CTkFont(size=11, weight="bold")
+        ).grid(row=0, column=0, padx=6, pady=4, sticky="w")
+
+        for column, deficit in enumerate(DEFICITS_AFFICHES, start=1):
+            ctk.CTkLabel(
+                self.table_frame, text=f"{deficit:+d}",
+                font=ctk.CTkFont(size=11, weight="bold")
+            ).grid(row=0, column=column, padx=6, pady=4)
+
+        for row, (factor, description) in enumerate(NIVEAUX_ACTIVITE.items(), start=1):
+            ctk.CTkLabel(
+                self.table_frame, text=f"{factor} - {description.split(' (')[0]}",
+                font=ctk.CTkFont(size=11)
+            ).grid(row=row, column=0, padx=6, pady=2, sticky="w")
+
+            cells_row = []
+            for column in range(1, len(DEFICITS_AFFICHES) + 1):
+                cell = ctk.CTkLabel(self.table_frame, text="", font=ctk.CTkFont(size=11), corner_radius=4)
+                cell.grid(row=row, column=column, padx=3, pady=2, sticky="ew")
+                cells_row.append(cell)
+            self.cells.append(cells_row)
+
+    def _fill(self):
+        """Remplit les cellules avec le champ sélectionné"""
+        field = self._selected_field()
+        values = self.grid_data.sensitivity_table(field, list(NIVEAUX_ACTIVITE), DEFICITS_AFFICHES)
+        decimals = 1 if field.endswith("_g") else 0
+
+        for row, factor in enumerate(NIVEAUX_ACTIVITE):
+            for column, deficit in enumerate(DEFICITS_AFFICHES):
+                current = (
+                    self.activite is not None and abs(factor - self.activite) < 0.1
+                    and self.deficit is not None and abs(deficit - self.deficit) < 125
+                )
+                self.cells[row][column].configure(
+                    text=f"{values[row][column]:.{decimals}f}",
+                    fg_color="#d6eaf8" if current else "transparent"
+                )
@@ -0,0 +1,196 @@
+"""
+Modèle de la liste des fiches (virtualisée) de l'interface
+Lit l'index par pages autour de la zone visible et détecte les changements
+sans parcourir toute l'archive
+"""
+
+import os
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.data_models import FicheMetadata
+from core.fiche_index import FicheIndex
+
+
+# Fiches lues par requête à l'index
+FICHES_PAR_PAGE = 50
+
+# Pages gardées en mémoire (les plus récemment affichées)
+PAGES_EN_CACHE = 20
+
+# Filtres de date proposés : libellé -> nombre de jours (None = pas de filtre)
+PERIODES: Dict[str, Optional[int]] = {
+    "Toutes les dates": None,
+    "Aujourd'hui": 0,
+    "7 derniers jours": 7,
+    "30 derniers jours": 30,
+    "12 derniers mois": 365,
+}
+
+
+def period_start(days: Optional[int], now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Début d'une période de PERIODES
+
+    Args:
+        days: Nombre de jours avant aujourd'hui (0 = aujourd'hui, None = aucune limite)
+        now: Instant de référence (défaut: maintenant)
+
+    Returns:
+        Minuit du premier jour de la période, ou None
+    """
+    if days is None:
+        return None
+    today = (now or datetime.now()).date()
+    return datetime.combine(today - timedelta(days=days), time())
+
+
+class FicheListModel:
+    """
+    Fenêtre de lecture de l'index pour une liste virtualisée
+
+    - `rows(start, count)` ne lit que les pages couvrant la zone demandée ;
+      une page suivant une page déjà lue est obtenue par clé (sans offset)
+    - `set_filters()` applique une recherche client / une période ; le total
+      et les pages sont relus à la demande
+    - `poll()` surveille le dossier de sortie (date de modification) et la
+      version de l'index : seule la zone visible est relue après un changement ;
+      avec `poll(sync=False)`, la synchronisation du dossier est laissée à
+      l'appelant (thread de fond, voir `directory_changed`)
+    """
+
+    def __init__(self, index: FicheIndex, directory: Optional[str] = None,
+                 page_size: int = FICHES_PAR_PAGE, max_pages: int = PAGES_EN_CACHE):
+        """
+        Initialise le modèle
+
+        Args:
+            index: Index des fiches
+            directory: Dossier de sortie surveillé (None = index seul)
+            page_size: Fiches par requête
+            max_pages: Pages gardées en mémoire
+        """
+        self.index = index
+        self.directory = directory
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.filters: Dict[str, Any] = {}
+        self.queries = 0  # Requêtes de pages envoyées à l'index
+
+        self._pages: "OrderedDict[int, List[FicheMetadata]]" = OrderedDict()
+        self._anchors: Dict[int, Tuple[str, int]] = {}  # Page -> clé de sa dernière fiche
+        self._total: Optional[int] = None
+        self._version = index.version()
+        self._directory_mtime: Optional[int] = None
+
+    def set_filters(self, client: str = "", date_from: Optional[datetime] = None,
+                    date_to: Optional[datetime] = None) -> None:
+        """
+        Restreint la liste
+
+        Args:
+            client: Début du nom et/ou du prénom (vide = tous les clients)
+            date_from: Date minimale (incluse)
+            date_to: Date maximale (exclue)
+        """
+        filters = {"client": client.strip() or None, "date_from": date_from, "date_to": date_to}
+        if filters != self.filters:
+            self.filters = filters
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Oublie les pages lues (relues à la prochaine demande)"""
+        self._pages.clear()
+        self._anchors.clear()
+        self._total = None
+
+    @property
+    def total(self) -> int:
+        """Nombre de fiches correspondant aux filtres"""
+        if self._total is None:
+            self._total = self.index.count(**self.filters)
+        return self._total
+
+    def rows(self, start: int, count: int) -> List[FicheMetadata]:
+        """
+        Fiches des positions [start, start + count)
+
+        Args:
+            start: Première position (0 = plus récente)
+            count: Nombre de fiches
+
+        Returns:
+            Fiches disponibles dans la zone (moins en fin de liste)
+        """
+        start = max(0, start)
+        end = min(start + count, self.total)
+        fiches: List[FicheMetadata] = []
+        if end <= start:
+            return fiches
+        for page_number in range(start // self.page_size, (end - 1) // self.page_size + 1):
+            base = page_number * self.page_size
+            fiches.extend(self._page(page_number)[max(0, start - base):end - base])
+        return fiches
+
+    def _page(self, page_number: int) -> List[FicheMetadata]:
+        page = self._pages.get(page_number)
+        if page is not None:
+            self._pages.move_to_end(page_number)
+            return page
+
+        anchor = self._anchors.get(page_number - 1)
+        if anchor is not None:
+            page = self.index.query(limit=self.page_size, after=anchor, **self.filters)
+        else:
+            page = self.index.query(limit=self.page_size, offset=page_number * self.page_size,
+                                    **self.filters)
+        self.queries += 1
+
+        if len(page) == self.page_size:
+            self._anchors[page_number] = page[-1].sort_key
+        self._pages[page_number] = page
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def directory_changed(self) -> bool:
+        """
+        Indique si le dossier surveillé a changé depuis le dernier appel
+
+        Returns:
+            True si sa date de modification a changé (dossier existant)
+        """
+        if not self.directory:
+            return False
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._directory_mtime:
+            return False
+        self._directory_mtime = mtime
+        return mtime is not None
+
+    def poll(self, sync: bool = True) -> bool:
+        """
+        Prend en compte les fiches ajoutées ou supprimées depuis le dernier appel
+
+        Le dossier n'est relu (sync_directory) que si sa date de modification
+        a changé ; l'index n'est interrogé que par son jeton de version.
+
+        Args:
+            sync: False pour ne consulter que l'index (synchronisation faite ailleurs)
+
+        Returns:
+            True si la liste a changé et doit être réaffichée
+        """
+        if sync and self.directory_changed():
+            self.index.sync_directory(self.directory)
+
+        version = self.index.version()
+        if version == self._version:
+            return False
+        self._version = version
+        self.invalidate()
+        return True
@@ -0,0 +1,228 @@
+"""
+File de génération des fiches PDF hors du thread Tk
+Pool de threads borné, entrées figées par tâche, progression, annulation
+et regroupement des demandes identiques
+"""
+
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import astuple, dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.data_models import ClientData, NutritionParams, NutritionResults
+
+
+# États d'une tâche
+EN_ATTENTE = "en_attente"
+EN_COURS = "en_cours"
+TERMINEE = "terminee"
+ANNULEE = "annulee"
+ERREUR = "erreur"
+
+# Écart minimal de progression transmis à l'interface (évite d'inonder la boucle Tk)
+PAS_PROGRESSION = 0.05
+
+
+class JobCancelled(Exception):
+    """Levée dans le thread de travail quand la tâche a été annulée"""
+
+
+class QueueFullError(RuntimeError):
+    """Trop de générations en attente"""
+
+
+@dataclass(frozen=True)
+class GenerationRequest:
+    """Entrées d'une génération, copiées au moment de la demande"""
+    client: ClientData
+    results: NutritionResults
+    params: NutritionParams
+    conseils: Tuple[str, ...] = ()
+    variante: str = "sublime"
+
+    @classmethod
+    def snapshot(cls, client: ClientData, results: NutritionResults, params: NutritionParams,
+                 conseils: Optional[List[str]] = None, variante: str = "sublime") -> "GenerationRequest":
+        """Copie les entrées : une modification ultérieure du formulaire n'affecte pas la tâche"""
+        return cls(replace(client), replace(results), replace(params),
+                   tuple(conseils or ()), variante)
+
+    @property
+    def key(self) -> tuple:
+        """Identité des entrées (demandes identiques regroupées)"""
+        return (astuple(self.client), astuple(self.params), self.variante)
+
+
+@dataclass(eq=False)
+class GenerationJob:
+    """Génération suivie par la file"""
+    job_id: int
+    request: GenerationRequest
+    state: str = EN_ATTENTE
+    stage: str = ""
+    progress: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+    listeners: List[Dict[str, Optional[Callable]]] = field(default_factory=list)
+    _cancel: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self.state in (TERMINEE, ANNULEE, ERREUR)
+
+
+class GenerationQueue:
+    """
+    File de générations pour l'interface
+
+    - `submit()` (thread Tk) fige les entrées et planifie la tâche sur un
+      pool de `max_workers` threads ; au-delà de `max_pending` tâches non
+      terminées, la demande est refusée (QueueFullError)
+    - une demande identique à une tâche non terminée la rejoint au lieu
+      d'en créer une nouvelle
+    - `run(request, report)` s'exécute dans le pool ; `report(stage, fraction)`
+      publie la progression et lève JobCancelled si la tâche est annulée
+    - les rappels on_progress / on_done / on_error / on_cancel sont exécutés
+      dans le thread Tk via `after()`
+    """
+
+    def __init__(self, widget, run: Callable[[GenerationRequest, Callable[[str, float], None]], Any],
+                 max_workers: int = 2, max_pending: int = 8):
+        """
+        Initialise la file
+
+        Args:
+            widget: Widget Tk fournissant after()
+            run: Génération (thread de travail), retourne le résultat (chemin du PDF)
+            max_workers: Générations simultanées
+            max_pending: Tâches non terminées au maximum (en attente + en cours)
+        """
+        self.widget = widget
+        self.run = run
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="generation")
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._active: Dict[tuple, GenerationJob] = {}  # Clé des entrées -> tâche non terminée
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    def submit(self, request: GenerationRequest,
+               on_progress: Optional[Callable[[GenerationJob], None]] = None,
+               on_done: Optional[Callable[[GenerationJob], None]] = None,
+               on_error: Optional[Callable[[GenerationJob], None]] = None,
+               on_cancel: Optional[Callable[[GenerationJob], None]] = None) -> GenerationJob:
+        """
+        Planifie une génération (ou rejoint une génération identique en cours)
+
+        Args:
+            request: Entrées figées (GenerationRequest.snapshot)
+            on_progress: Progression (job.stage, job.progress)
+            on_done: Succès (job.result)
+            on_error: Échec (job.error)
+            on_cancel: Annulation
+
+        Returns:
+            Tâche suivie
+
+        Raises:
+            QueueFullError: Trop de tâches non terminées
+        """
+        listener = {"progress": on_progress, "done": on_done,
+                    "error": on_error, "cancel": on_cancel}
+        with self._lock:
+            job = self._active.get(request.key)
+            if job is not None and not job.cancelled:
+                job.listeners.append(listener)
+                self.coalesced += 1
+                return job
+            if len(self._active) >= self.max_pending:
+                raise QueueFullError(
+                    f"{len(self._active)} générations déjà en cours, réessayez dans un instant"
+                )
+            job = GenerationJob(next(self._ids), request, listeners=[listener])
+            self._active[request.key] = job
+            self.submitted += 1
+
+        self._executor.submit(self._execute, job)
+        return job
+
+    def cancel(self, job: GenerationJob) -> None:
+        """Demande l'annulation (effective au prochain point de progression)"""
+        if not job.done:
+            job._cancel.set()
+
+    def cancel_all(self) -> None:
+        with self._lock:
+            jobs = list(self._active.values())
+        for job in jobs:
+            self.cancel(job)
+
+    def active_jobs(self) -> List[GenerationJob]:
+        """Tâches non terminées, par ordre de soumission"""
+        with self._lock:
+            return sorted(self._active.values(), key=lambda job: job.job_id)
+
+    def shutdown(self) -> None:
+        """Annule les tâches et libère le pool (fermeture de la fenêtre)"""
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
+
+    def _execute(self, job: GenerationJob) -> None:
+        last = {"stage": None, "progress": -1.0}
+
+        def report(stage: str, fraction: float) -> None:
+            if job.cancelled:
+                raise JobCancelled()
+            if stage == last["stage"] and fraction - last["progress"] < PAS_PROGRESSION:
+                return
+            last["stage"], last["progress"] = stage, fraction
+            job.stage, job.progress = stage, fraction
+            self._notify(job, "progress")
+
+        try:
+            if job.cancelled:
+                raise JobCancelled()
+            job.state = EN_COURS
+            job.result = self.run(job.request, report)
+            state, event = TERMINEE, "done"
+        except Exception as exc:
+            if job.cancelled:
+                state, event = ANNULEE, "cancel"
+            else:
+                job.error = str(exc)
+                state, event = ERREUR, "error"
+
+        with self._lock:
+            if self._active.get(job.request.key) is job:
+                del self._active[job.request.key]
+            if state == ANNULEE:
+                self.cancelled += 1
+        job.state = state
+        self._notify(job, event)
+
+    def _notify(self, job: GenerationJob, event: str) -> None:
+        def deliver():
+            for listener in list(job.listeners):
+                callback = listener.get(event)
+                if callback:
+                    callback(job)
+        self.widget.after(0, deliver)
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            active = len(self._active)
+        return {
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "active": active,
+        }
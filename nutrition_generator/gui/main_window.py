@@ -4,17 +4,41 @@ Fenêtre principale de l'application de génération de fiches nutritionnelles
 
 import os
 import json
+import tempfile
 import threading
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple
 import customtkinter as ctk
 
 from gui.components.client_form import ClientForm
 from gui.components.calculations_panel import CalculationsPanel
 from gui.components.pdf_preview import PDFPreview
+from gui.recalc_scheduler import RecalcScheduler
+from gui.generation_queue import GenerationQueue, GenerationRequest, QueueFullError
 from core.data_models import ClientData, NutritionResults, NutritionParams
 from core.calculations import NutritionCalculator
-from core.pdf_generator import PDFGenerator
+from core.fiche_index import get_fiche_index
+from core.thumbnail_cache import file_digest, get_thumbnail_cache
+
+# core.pdf_generator (matplotlib, ReportLab, numpy) est importé à la demande,
+# après l'affichage de la fenêtre, pour accélérer le démarrage
+
+
+# Délai avant le préchargement en arrière-plan de la pile PDF (ms)
+PREWARM_DELAY_MS = 300
+
+# Générations de PDF simultanées / non terminées au maximum
+GENERATIONS_SIMULTANEES = 2
+GENERATIONS_EN_ATTENTE_MAX = 8
+
+# Libellés des étapes de génération (barre de statut)
+ETAPES_GENERATION = {
+    "preparation": "préparation",
+    "sections": "construction des sections",
+    "mise_en_page": "mise en page",
+    "enregistrement": "enregistrement",
+}
 
 
 class MainWindow(ctk.CTk):
@@ -42,15 +66,69 @@ class MainWindow(ctk.CTk):
 
         # Initialisation des composants métier
         self.calculator = NutritionCalculator()
-        self.pdf_generator = PDFGenerator(self._get_config_path())
+        self.fiche_index = get_fiche_index()
+        self.thumbnail_cache = get_thumbnail_cache()
+        self._pdf_generator = None
+        self._pdf_generator_lock = threading.Lock()
+        self.on_prewarm_done: Optional[Callable[[float], None]] = None
 
         # Configuration de l'interface
         self._setup_ui()
         self._setup_layout()
 
+        # Recalcul différé : une rafale de frappes -> un seul calcul hors thread Tk
+        self.recalc_scheduler = RecalcScheduler(
+            self,
+            snapshot=self._capture_inputs,
+            compute=self._compute_results,
+            on_result=self._on_recalc_result,
+            on_error=lambda e: self._update_status(f"Erreur de calcul: {e}")
+        )
+
+        # Verrous de publication par fichier de sortie (voir _run_generation)
+        self._output_locks: Dict[str, threading.Lock] = {}
+        self._output_locks_guard = threading.Lock()
+
+        # File de génération : pool borné, progression et annulation
+        self.generation_queue = GenerationQueue(
+            self,
+            run=self._run_generation,
+            max_workers=GENERATIONS_SIMULTANEES,
+            max_pending=GENERATIONS_EN_ATTENTE_MAX
+        )
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
         # Chargement de la configuration
         self._load_config()
 
+    @property
+    def pdf_generator(self):
+        """Générateur PDF, créé au premier accès (import des bibliothèques lourdes)"""
+        with self._pdf_generator_lock:
+            if self._pdf_generator is None:
+                from core.pdf_generator import PDFGenerator
+                self._pdf_generator = PDFGenerator(self._get_config_path())
+            return self._pdf_generator
+
+    def _start_prewarm(self):
+        """Précharge la pile PDF dans un thread une fois la fenêtre affichée"""
+        def prewarm():
+            start = time.perf_counter()
+            try:
+                self.pdf_generator
+            except Exception as e:
+                # L'erreur sera de nouveau signalée à la génération du PDF
+                print(f"Préchargement du générateur PDF impossible: {e}")
+                return
+            if self.on_prewarm_done:
+                duration = time.perf_counter() - start
+                self.after(0, lambda: self.on_prewarm_done(duration))
+
+        thread = threading.Thread(target=prewarm)
+        thread.daemon = True
+        thread.start()
+
     def _get_config_path(self) -> str:
         """Retourne le chemin vers le fichier de configuration"""
         return os.path.join("nutrition_generator", "config", "settings.json")
@@ -146,6 +224,8 @@ class MainWindow(ctk.CTk):
         self.pdf_preview = PDFPreview(
             self.main_container,
             on_generate_pdf=self._generate_pdf,
+            fiche_index=self.fiche_index,
+            thumbnail_cache=self.thumbnail_cache,
             fg_color="white",
             border_color="#bdc3c7",
             border_width=1,
@@ -181,22 +261,55 @@ class MainWindow(ctk.CTk):
         self.bind("<Control-s>", lambda e: self._save_as_template())
         self.bind("<F1>", lambda e: self._show_help())
         self.bind("<F5>", lambda e: self._load_example_data())
+        self.bind("<F2>", lambda e: self._show_latency_metrics())
 
     def _on_client_data_change(self):
-        """Gestionnaire de changement des données client"""
-        # Récupérer les nouvelles données client
-        client_data = self.client_form.get_client_data()
+        """Gestionnaire de changement des données client (à chaque frappe)"""
+        self.recalc_scheduler.request()
+
+    def _capture_inputs(self):
+        """Capture client + paramètres dans le thread Tk (validation unique)"""
+        _, client_data = self.client_form.validate()
 
         if client_data:
             self.current_client = client_data
             # Transmettre au panneau de calculs
             self.calculations_panel.set_client_data(client_data)
-            # Auto-calcul si possible
-            self.calculations_panel.auto_calculate_if_ready()
             self._update_status("Données client mises à jour")
-        else:
-            self.current_client = None
-            self._update_status("Données client incomplètes")
+            return client_data, self.calculations_panel.get_current_params()
+
+        self.current_client = None
+        self._update_status("Données client incomplètes")
+        return None, None
+
+    def _compute_results(self, snapshot) -> Optional[NutritionResults]:
+        """Calcul nutritionnel (thread de travail)"""
+        client_data, params = snapshot
+        if client_data is None or params is None:
+            return None
+        return self.calculator.calculate_complete_nutrition(client_data, params)
+
+    def _on_recalc_result(self, snapshot, results: Optional[NutritionResults]):
+        """Affiche le résultat d'un recalcul encore à jour"""
+        if results is None:
+            return
+        _, params = snapshot
+        if params != self.calculations_panel.get_current_params():
+            # Curseurs déplacés depuis la capture : l'aperçu de la grille est plus récent
+            return
+        self.calculations_panel.current_results = results
+        self._on_calculation_update(results, params)
+
+    def _show_latency_metrics(self):
+        """Affiche les latences frappe -> affichage dans la barre de statut"""
+        metrics = self.recalc_scheduler.metrics()
+        latency = metrics["latency"]
+        cache = self.calculator.cache.stats()
+        self._update_status(
+            f"Latence saisie: p50 {latency['p50_ms']} ms, p95 {latency['p95_ms']} ms "
+            f"({metrics['requests']} frappes, {metrics['computations']} calculs, "
+            f"{metrics['stale_dropped']} périmés, {cache['hits']} résultats en cache)"
+        )
 
     def _on_calculation_update(self, results: Optional[NutritionResults],
                               params: Optional[NutritionParams]):
@@ -222,25 +335,16 @@ class MainWindow(ctk.CTk):
 
     def _generate_pdf(self) -> bool:
         """
-        Génère le PDF de la fiche nutritionnelle
+        Planifie la génération du PDF de la fiche nutritionnelle
 
         Returns:
-            True si succès, False sinon
+            True si la génération est planifiée, False sinon
         """
         if not self.current_client or not self.current_results or not self.current_params:
             self._show_error("Données incomplètes pour générer le PDF")
             return False
 
         try:
-            self._update_status("Génération du PDF en cours...")
-
-            # Génération du nom de fichier
-            filename = self.pdf_generator.generate_filename(self.current_client)
-            output_path = os.path.join("output", "fiches", filename)
-
-            # Créer le dossier de sortie
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
             # Génération des conseils personnalisés
             objectif_type = self.calculator.get_objectif_description(
                 self.current_params.deficit_surplus_kcal
@@ -251,55 +355,137 @@ class MainWindow(ctk.CTk):
                 objectif_type
             )
 
-            # Paramètres pour le PDF
-            params_dict = {
-                'formule_metabolisme': self.current_params.formule_metabolisme,
-                'facteur_activite': self.current_params.facteur_activite,
-                'deficit_surplus_kcal': self.current_params.deficit_surplus_kcal,
-                'proteines_g_par_kg': self.current_params.proteines_g_par_kg,
-                'lipides_g_par_kg': self.current_params.lipides_g_par_kg
-            }
+            # Copie des entrées : le formulaire peut être modifié pendant le rendu
+            request = GenerationRequest.snapshot(
+                self.current_client, self.current_results, self.current_params, conseils
+            )
+            job = self.generation_queue.submit(
+                request,
+                on_progress=self._on_generation_progress,
+                on_done=lambda job: self._on_pdf_generated_success(*job.result),
+                on_error=lambda job: self._on_pdf_generated_error(job.error),
+                on_cancel=self._on_generation_cancelled
+            )
+            self.pdf_preview.show_generation(job, self.generation_queue.cancel)
+            self._update_status("Génération du PDF en cours...")
+            return True
 
-            # Génération en thread pour ne pas bloquer l'interface
-            def generate_in_thread():
-                try:
-                    self.pdf_generator.generate_premium_pdf(
-                        self.current_client,
-                        self.current_results,
-                        params_dict,
-                        output_path,
-                        conseils
-                    )
+        except QueueFullError as e:
+            self._show_error(str(e))
+            return False
+        except Exception as e:
+            self._show_error(f"Erreur lors de la génération: {str(e)}")
+            return False
 
-                    # Mise à jour de l'interface dans le thread principal
-                    self.after(0, lambda: self._on_pdf_generated_success(filename))
+    def _run_generation(self, request: GenerationRequest,
+                        report: Callable[[str, float], None]) -> Tuple[str, Any]:
+        """
+        Rend une fiche (thread de la file de génération)
 
+        Args:
+            request: Entrées figées
+            report: Progression (lève JobCancelled si la tâche est annulée)
+
+        Returns:
+            Nom du fichier généré et sections recalculées (SectionReport)
+        """
+        report("preparation", 0.0)
+        # Le premier accès attend la fin du préchargement si besoin
+        pdf_generator = self.pdf_generator
+        from core.thumbnails import FirstPageLayout  # ReportLab, déjà chargé par le générateur
+
+        first_page = FirstPageLayout()  # Relevé de la page 1 pour la vignette
+
+        filename = pdf_generator.generate_filename(request.client)
+        output_dir = os.path.join("output", "fiches")
+        output_path = os.path.join(output_dir, filename)
+        os.makedirs(output_dir, exist_ok=True)
+
+        # Fichier temporaire propre à la tâche : une fiche annulée ne laisse pas de
+        # PDF partiel, et deux fiches du même client le même jour n'écrivent pas
+        # dans le même fichier
+        fd, part_path = tempfile.mkstemp(
+            dir=output_dir, prefix=f"{os.path.splitext(filename)[0]}.", suffix=".pdf.part"
+        )
+        try:
+            with os.fdopen(fd, "wb") as handler:
+                pdf_generator.render_to_stream(
+                    request.client,
+                    request.results,
+                    request.params.to_dict(),
+                    handler,
+                    list(request.conseils),
+                    request.variante,
+                    progress=report,
+                    first_page=first_page
+                )
+            sections = pdf_generator.last_section_report
+            report("enregistrement", 1.0)
+            os.chmod(part_path, 0o644)  # mkstemp crée le fichier en 0600
+
+            # Publication, vignette et index à la suite pour un même fichier :
+            # la dernière fiche publiée est aussi celle de la vignette et de l'index
+            with self._output_lock(output_path):
+                os.replace(part_path, output_path)
+                # Une erreur ici n'annule pas la fiche
+                self._store_thumbnail(output_path, first_page)
+                try:
+                    self.fiche_index.record_fiche(output_path, request.client, request.params, request.results)
                 except Exception as e:
-                    error_msg = str(e)
-                    self.after(0, lambda: self._on_pdf_generated_error(error_msg))
+                    print(f"Erreur lors de l'indexation de la fiche: {e}")
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        return filename, sections
 
-            thread = threading.Thread(target=generate_in_thread)
-            thread.daemon = True
-            thread.start()
+    def _output_lock(self, output_path: str) -> threading.Lock:
+        """Verrou de publication d'un fichier de sortie (un par chemin)"""
+        with self._output_locks_guard:
+            return self._output_locks.setdefault(output_path, threading.Lock())
 
-            return True
+    def _store_thumbnail(self, output_path: str, first_page) -> None:
+        """Dessine la vignette depuis la mise en page relevée et la range sous l'empreinte du PDF"""
+        from core.thumbnails import render_thumbnail
 
+        try:
+            self.thumbnail_cache.put(file_digest(output_path), render_thumbnail(first_page))
         except Exception as e:
-            self._show_error(f"Erreur lors de la génération: {str(e)}")
-            return False
+            print(f"Erreur lors de la création de la vignette: {e}")
 
-    def _on_pdf_generated_success(self, filename: str):
+    def _on_generation_progress(self, job):
+        """Progression d'une génération (thread Tk)"""
+        self.pdf_preview.update_generation(job)
+        label = ETAPES_GENERATION.get(job.stage, job.stage)
+        self._update_status(f"Génération du PDF: {label} ({int(job.progress * 100)}%)")
+
+    def _on_generation_cancelled(self, job):
+        """Génération annulée (thread Tk)"""
+        self.pdf_preview.finish_generation(job)
+        self._update_status("Génération du PDF annulée")
+
+    def _on_pdf_generated_success(self, filename: str, sections=None):
         """Gestionnaire de succès de génération PDF"""
-        self._update_status(f"PDF généré avec succès: {filename}")
+        self.pdf_preview.finish_generation()
+        if sections is not None and sections.reused:
+            total = len(sections.recomputed) + len(sections.reused)
+            self._update_status(
+                f"PDF généré avec succès: {filename} "
+                f"({len(sections.recomputed)}/{total} sections recalculées)"
+            )
+        else:
+            self._update_status(f"PDF généré avec succès: {filename}")
+        self.pdf_preview.refresh_fiches()
         self._show_info(f"Fiche générée avec succès!\n\nFichier: {filename}")
 
     def _on_pdf_generated_error(self, error_message: str):
         """Gestionnaire d'erreur de génération PDF"""
+        self.pdf_preview.finish_generation()
         self._update_status("Erreur lors de la génération du PDF")
         self._show_error(f"Erreur lors de la génération du PDF:\n{error_message}")
 
     def _reset_all(self):
         """Remet à zéro tous les formulaires"""
+        self.recalc_scheduler.cancel()
         self.client_form.clear_form()
         self.calculations_panel._reset_values()
         self.pdf_preview.clear_results()
@@ -332,6 +518,7 @@ class MainWindow(ctk.CTk):
 • Ctrl+R : Réinitialiser tous les formulaires
 • F1 : Afficher cette aide
 • F5 : Charger des données d'exemple
+• F2 : Afficher la latence de saisie
 
 💡 CONSEILS:
 • Les champs marqués * sont obligatoires
@@ -388,7 +575,14 @@ class MainWindow(ctk.CTk):
         y = (dialog.winfo_screenheight() // 2) - (dialog.winfo_height() // 2)
         dialog.geometry(f"+{x}+{y}")
 
+    def _on_close(self):
+        """Fermeture : annule les générations en cours puis détruit la fenêtre"""
+        self.recalc_scheduler.cancel()
+        self.generation_queue.shutdown()
+        self.destroy()
+
     def run(self):
         """Lance l'application"""
         self._update_status("Application démarrée - Prête à l'emploi")
+        self.after(PREWARM_DELAY_MS, self._start_prewarm)
         self.mainloop()
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Recalcul différé (debounce) hors du thread Tk
+Regroupe les rafales de frappes en un seul calcul et ignore les résultats périmés
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+class LatencyStats:
+    """Fenêtre glissante de latences (ms) avec percentiles"""
+
+    def __init__(self, max_samples: int = 500):
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+
+    def add(self, latency_ms: float) -> None:
+        self.samples.append(latency_ms)
+
+    def percentile(self, pct: float) -> float:
+        """Percentile par rang le plus proche (0 si aucune mesure)"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[rank]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": len(self.samples),
+            "p50_ms": round(self.percentile(50), 1),
+            "p95_ms": round(self.percentile(95), 1),
+            "max_ms": round(max(self.samples), 1) if self.samples else 0.0,
+        }
+
+
+class RecalcScheduler:
+    """
+    Planificateur de recalcul pour l'interface
+
+    - request() à chaque frappe : relance un délai de `delay_ms`
+    - à l'échéance, `snapshot()` lit le formulaire (thread Tk)
+    - `compute(snapshot)` s'exécute dans un thread, un seul à la fois
+    - `on_result(snapshot, result)` est rappelé dans le thread Tk, sauf si une
+      frappe plus récente a rendu le résultat périmé
+    """
+
+    def __init__(self, widget, snapshot: Callable[[], Any],
+                 compute: Callable[[Any], Any],
+                 on_result: Callable[[Any, Any], None],
+                 on_error: Optional[Callable[[Exception], None]] = None,
+                 delay_ms: int = 150):
+        """
+        Initialise le planificateur
+
+        Args:
+            widget: Widget Tk fournissant after/after_cancel/after_idle
+            snapshot: Capture immuable des entrées (thread Tk)
+            compute: Calcul à partir de la capture (thread de travail)
+            on_result: Affichage du résultat (thread Tk)
+            on_error: Gestion d'une erreur de calcul (thread Tk)
+            delay_ms: Délai d'inactivité avant calcul
+        """
+        self.widget = widget
+        self.snapshot = snapshot
+        self.compute = compute
+        self.on_result = on_result
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+
+        self._after_id = None
+        self._generation = 0  # Incrémenté à chaque demande
+        self._running = False  # Un calcul est en cours dans un thread
+        self._rerun = False  # Une demande est arrivée pendant le calcul
+        self._last_request = 0.0  # Instant de la dernière frappe
+
+        self.latency = LatencyStats()
+        self.compute_time = LatencyStats()
+        self.requests = 0
+        self.computations = 0
+        self.stale_dropped = 0
+
+    def request(self) -> None:
+        """Signale un changement d'entrée (à appeler à chaque frappe)"""
+        self.requests += 1
+        self._generation += 1
+        self._last_request = time.perf_counter()
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(self.delay_ms, self._fire)
+
+    def flush(self) -> None:
+        """Lance immédiatement le calcul en attente"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._fire()
+
+    def cancel(self) -> None:
+        """Abandonne le calcul en attente et invalide celui en cours"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._generation += 1
+        self._rerun = False
+
+    def _fire(self) -> None:
+        self._after_id = None
+        if self._running:
+            # Regroupé : relancé avec une capture fraîche à la fin du calcul
+            self._rerun = True
+            return
+
+        generation = self._generation
+        requested_at = self._last_request
+        snapshot = self.snapshot()
+        self._running = True
+        self.computations += 1
+
+        def work():
+            start = time.perf_counter()
+            try:
+                result, error = self.compute(snapshot), None
+            except Exception as exc:
+                result, error = None, exc
+            duration_ms = (time.perf_counter() - start) * 1000
+            self.widget.after(0, lambda: self._deliver(
+                generation, requested_at, snapshot, result, error, duration_ms
+            ))
+
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+
+    def _deliver(self, generation: int, requested_at: float, snapshot: Any,
+                 result: Any, error: Optional[Exception], duration_ms: float) -> None:
+        self._running = False
+        self.compute_time.add(duration_ms)
+
+        if generation != self._generation:
+            # Une frappe plus récente existe : résultat périmé
+            self.stale_dropped += 1
+        elif error is not None:
+            if self.on_error:
+                self.on_error(error)
+        else:
+            self.on_result(snapshot, result)
+            # Mesure après le rafraîchissement effectif de l'affichage
+            self.widget.after_idle(lambda: self.latency.add(
+                (time.perf_counter() - requested_at) * 1000
+            ))
+
+        if self._rerun:
+            self._rerun = False
+            if self._after_id is None:
+                self._fire()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Compteurs et latences frappe -> affichage (ms)"""
+        return {
+            "requests": self.requests,
+            "computations": self.computations,
+            "stale_dropped": self.stale_dropped,
+            "latency": self.latency.summary(),
+            "compute": self.compute_time.summary(),
+        }
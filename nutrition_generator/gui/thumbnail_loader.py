@@ -0,0 +1,129 @@
+"""
+Chargement des vignettes de fiches hors du thread Tk
+Empreinte du PDF, lecture du cache disque et décodage sur un thread dédié ;
+le défilement de la liste n'attend jamais une vignette
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from core.thumbnail_cache import ThumbnailCache, file_digest
+
+
+class ThumbnailLoader:
+    """
+    Vignettes des fiches pour l'interface
+
+    - `request(path, callback)` (thread Tk) : `callback(path, image)` est
+      rappelé aussitôt si la vignette est en mémoire, sinon dans le thread Tk
+      une fois lue (image None : pas de vignette pour ce PDF)
+    - `forget_pending()` abandonne les lectures pas encore commencées
+      (défilement rapide : seules les lignes visibles sont chargées)
+    - les images décodées (PIL) sont gardées en mémoire, par chemin, pour
+      les `max_images` fiches les plus récemment demandées (y compris
+      l'absence de vignette)
+    """
+
+    def __init__(self, widget, cache: ThumbnailCache, max_images: int = 200):
+        """
+        Initialise le chargeur
+
+        Args:
+            widget: Widget Tk fournissant after()
+            cache: Cache disque des vignettes
+            max_images: Images décodées gardées en mémoire
+        """
+        self.widget = widget
+        self.cache = cache
+        self.max_images = max_images
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vignettes")
+        self._lock = threading.Lock()
+        self._images: "OrderedDict[str, Any]" = OrderedDict()  # Chemin -> image ou None
+        self._pending: Dict[str, List[Callable[[str, Any], None]]] = {}
+        self._generation = 0  # Incrémenté par forget_pending
+
+    def request(self, path: str, callback: Callable[[str, Any], None]) -> bool:
+        """
+        Demande la vignette d'une fiche
+
+        Args:
+            path: Chemin du PDF
+            callback: Rappel (path, image PIL ou None)
+
+        Returns:
+            True si la vignette était en mémoire (rappel déjà exécuté)
+        """
+        with self._lock:
+            known = path in self._images
+            if known:
+                self._images.move_to_end(path)
+                image = self._images[path]
+            else:
+                callbacks = self._pending.get(path)
+                if callbacks is not None:
+                    callbacks.append(callback)
+                    return False
+                self._pending[path] = [callback]
+                generation = self._generation
+        if known:
+            callback(path, image)
+        else:
+            self._executor.submit(self._load, path, generation)
+        return known
+
+    def forget_pending(self) -> None:
+        """Abandonne les lectures non commencées (leurs rappels ne seront pas appelés)"""
+        with self._lock:
+            self._generation += 1
+            self._pending.clear()
+
+    def forget(self, path: Optional[str] = None) -> None:
+        """Oublie l'image en mémoire d'une fiche (toutes si path est None)"""
+        with self._lock:
+            if path is None:
+                self._images.clear()
+            else:
+                self._images.pop(path, None)
+
+    def shutdown(self) -> None:
+        self.forget_pending()
+        self._executor.shutdown(wait=False)
+
+    def _load(self, path: str, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            known = path in self._images
+            image = self._images.get(path)
+
+        if not known:
+            try:
+                data = self.cache.get(file_digest(path))
+                if data is not None:
+                    image = self._decode(data)
+            except OSError:
+                pass  # PDF supprimé entre-temps
+            except Exception as e:
+                print(f"Erreur lors de la lecture de la vignette: {e}")
+
+        with self._lock:
+            self._images[path] = image
+            while len(self._images) > self.max_images:
+                self._images.popitem(last=False)
+            callbacks = self._pending.pop(path, []) if generation == self._generation else []
+
+        if callbacks:
+            def deliver():
+                for callback in callbacks:
+                    callback(path, image)
+            self.widget.after(0, deliver)
+
+    @staticmethod
+    def _decode(data: bytes) -> Any:
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as picture:
+            return picture.convert("RGB")
@@ -5,8 +5,41 @@ Application complète avec interface CustomTkinter pour coaches sportifs
 
 import os
 import sys
+import time
 import logging
+import importlib.util
 from datetime import datetime
+from typing import List, Tuple
+
+# Modules lourds qui ne doivent pas être chargés avant l'affichage de la fenêtre
+HEAVY_MODULES = ("matplotlib", "numpy", "reportlab", "PIL")
+
+
+class StartupProfiler:
+    """Mesure des étapes du démarrage (option --startup-profile)"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, label: str):
+        """Enregistre la fin d'une étape"""
+        self.marks.append((label, time.perf_counter()))
+
+    def report(self) -> str:
+        """Rapport lisible des durées par étape et des modules chargés"""
+        lines = ["Profil de démarrage:"]
+        previous = self.start
+        for label, timestamp in self.marks:
+            lines.append(
+                f"   {label:<32} {(timestamp - previous) * 1000:8.1f} ms"
+                f"  (cumul {(timestamp - self.start) * 1000:8.1f} ms)"
+            )
+            previous = timestamp
+
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        lines.append(f"   Modules lourds chargés: {', '.join(loaded) if loaded else 'aucun'}")
+        return "\n".join(lines)
 
 # Configuration du logging
 def setup_logging():
@@ -38,10 +71,9 @@ def check_dependencies():
 
     missing_packages = []
 
+    # Vérification de présence sans importer les paquets (démarrage rapide)
     for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
+        if importlib.util.find_spec(package) is None:
             missing_packages.append(package)
 
     if missing_packages:
@@ -108,9 +140,13 @@ def main():
     print("Générateur de Fiches Nutritionnelles - Coach Pro")
     print("=" * 50)
 
+    profiler = StartupProfiler() if "--startup-profile" in sys.argv else None
+
     # Configuration du logging
     setup_logging()
     logger = logging.getLogger(__name__)
+    if profiler:
+        profiler.mark("Logging")
 
     try:
         # Vérifications préliminaires
@@ -119,6 +155,8 @@ def main():
             sys.exit(1)
 
         print("Toutes les dépendances sont installées")
+        if profiler:
+            profiler.mark("Vérification des dépendances")
 
         # Vérification et création des dossiers
         print("Vérification des dossiers...")
@@ -127,15 +165,33 @@ def main():
         # Création des assets de démonstration
         print("Préparation des assets...")
         create_placeholder_assets()
+        if profiler:
+            profiler.mark("Dossiers et assets")
 
         # Import et lancement de l'application
         print("Lancement de l'application...")
         logger.info("Démarrage de l'application")
 
         from gui.main_window import MainWindow
+        if profiler:
+            profiler.mark("Import de l'interface")
 
         # Lancer l'application
         app = MainWindow()
+        if profiler:
+            profiler.mark("Construction de la fenêtre")
+
+            def report_startup():
+                profiler.mark("Fenêtre affichée")
+                report = profiler.report()
+                print(report)
+                logger.info(report)
+
+            app.after_idle(report_startup)
+            app.on_prewarm_done = lambda duration: print(
+                f"Pile PDF préchargée en arrière-plan en {duration * 1000:.1f} ms"
+            )
+
         app.run()
 
         logger.info("Application fermée normalement")
@@ -0,0 +1,482 @@
+"""
+Service HTTP local de génération de fiches (asyncio, bibliothèque standard)
+Usage: python -m nutrition_generator serve --port 8765 --workers 2
+
+- POST /fiches : {"client": {...}, "params": {...}, "variante": "sublime"}
+  -> PDF (application/pdf)
+- GET /metrics : histogramme des latences et compteurs (JSON)
+- GET /health : état du service
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import astuple
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from core.calculations import NutritionCalculator
+from core.data_models import ClientData, NutritionParams
+from core.roster import parse_row
+
+
+# Variantes rendues en mémoire (config/layouts.json)
+VARIANTES_SERVICE = ("sublime", "enriched", "clean")
+
+# Bornes des classes de l'histogramme des latences (ms) ; la dernière classe est ouverte
+BORNES_LATENCE_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Taille maximale du corps d'une requête (octets)
+TAILLE_MAX_REQUETE = 64 * 1024
+
+# Connexion inactive fermée après ce délai (secondes)
+DELAI_INACTIVITE_S = 15
+
+# Délai maximal de préchauffage d'un processus de rendu (secondes)
+DELAI_PRECHAUFFAGE_S = 120
+
+_STATUTS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+# Lettres sans décomposition Unicode, repliées à la main dans les noms de fichier ASCII
+_REPLI_ASCII = str.maketrans({
+    "Ł": "L", "ł": "l", "Ø": "O", "ø": "o", "Đ": "D", "đ": "d",
+    "ß": "ss", "Æ": "AE", "æ": "ae", "Œ": "OE", "œ": "oe",
+})
+
+# Client de préchauffage (chaque variante est rendue une fois par processus)
+_CLIENT_PRECHAUFFAGE = {
+    "nom": "Prechauffage", "prenom": "Service", "age": 30, "taille_cm": 175, "poids_kg": 75,
+}
+
+
+class HTTPError(Exception):
+    """Réponse d'erreur (statut et message renvoyés en JSON)"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class LatencyHistogram:
+    """Histogramme cumulatif des latences, à classes fixes (coût constant par requête)"""
+
+    def __init__(self, bounds_ms: Tuple[float, ...] = BORNES_LATENCE_MS):
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, duration_ms: float) -> None:
+        position = len(self.bounds_ms)
+        for index, bound in enumerate(self.bounds_ms):
+            if duration_ms <= bound:
+                position = index
+                break
+        self.counts[position] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Borne supérieure de la classe contenant le quantile (max pour la classe ouverte)"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds_ms[index] if index < len(self.bounds_ms) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = []
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            bound = self.bounds_ms[index] if index < len(self.bounds_ms) else "+Inf"
+            buckets.append({"le_ms": bound, "count": cumulative})
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "max_ms": round(self.max_ms, 1),
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+# État propre à chaque processus du pool
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_service_worker(config_path: Optional[str], ready) -> None:
+    """Prépare un processus de rendu : générateur, imports et une fiche par variante"""
+    from core.pdf_generator import PremiumPDFGenerator
+
+    generator = PremiumPDFGenerator(config_path)
+    client, params = parse_row(_CLIENT_PRECHAUFFAGE)
+    results = NutritionCalculator().calculate_complete_nutrition(client, params)
+    for variante in VARIANTES_SERVICE:
+        generator.render_to_bytes(client, results, params.to_dict(), None, variante)
+    _worker_state["generator"] = generator
+    ready.put(os.getpid())
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+def _render_in_worker(client: ClientData, results, params_dict: Dict[str, Any],
+                      conseils: List[str], variante: str) -> Tuple[bytes, float]:
+    """Rend une fiche dans un processus du pool ; retourne (PDF, durée du rendu en s)"""
+    start = time.perf_counter()
+    pdf_bytes = _worker_state["generator"].render_to_bytes(client, results, params_dict,
+                                                           conseils, variante)
+    return pdf_bytes, time.perf_counter() - start
+
+
+def fiche_filename(client: ClientData) -> str:
+    prenom_clean = "".join(c for c in client.prenom if c.isalnum())
+    nom_clean = "".join(c for c in client.nom if c.isalnum())
+    return f"Fiche_{prenom_clean}_{nom_clean}.pdf"
+
+
+def content_disposition(client: ClientData) -> str:
+    """
+    En-tête Content-Disposition de la fiche
+
+    Les en-têtes sont envoyés en latin-1 : `filename` reçoit le nom replié en
+    ASCII, `filename*` (RFC 5987) le nom complet encodé en UTF-8.
+    """
+    filename = fiche_filename(client)
+    folded = unicodedata.normalize("NFKD", filename.translate(_REPLI_ASCII))
+    ascii_name = folded.encode("ascii", "ignore").decode("ascii")
+    return f"inline; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
+
+
+class RenderService:
+    """
+    Génération de fiches à la demande
+
+    - les calculs nutritionnels sont faits dans la boucle asyncio (quelques µs)
+    - le rendu passe par un pool de `workers` processus préchauffés par
+      `start()` : chacun a importé matplotlib / ReportLab et rendu une fiche
+      de chaque variante avant que le service n'accepte des requêtes
+    - une requête identique à un rendu en cours (mêmes client, paramètres et
+      variante) attend ce rendu au lieu d'en lancer un autre
+    - au-delà de `max_pending` rendus distincts en cours, la requête est
+      refusée (429, en-tête Retry-After)
+    - si un processus meurt (BrokenProcessPool), le pool est recréé et
+      préchauffé, puis le rendu est relancé une fois
+    """
+
+    def __init__(self, workers: int = 2, max_pending: Optional[int] = None,
+                 config_path: Optional[str] = None,
+                 defaults: Optional[Dict[str, Any]] = None):
+        """
+        Initialise le service
+
+        Args:
+            workers: Processus de rendu
+            max_pending: Rendus distincts en cours au maximum (défaut: 2 x workers)
+            config_path: Chemin vers settings.json
+            defaults: Paramètres nutritionnels par défaut (colonnes de la liste)
+        """
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending or 2 * self.workers)
+        self.config_path = config_path
+        self.defaults = defaults or {}
+        self.calculator = NutritionCalculator()
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.ready = False
+        self._inflight: Dict[tuple, asyncio.Future] = {}  # Clé des entrées -> rendu en cours
+
+        self.latency = LatencyHistogram()  # POST /fiches réussis, de la lecture à l'envoi
+        self.render_latency = LatencyHistogram()  # Rendu seul, dans le processus
+        self.statuses: Dict[int, int] = {}
+        self.rendered = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.pool_restarts = 0
+        self._restart_lock: Optional[asyncio.Lock] = None
+
+    async def start(self) -> None:
+        """Lance et préchauffe les processus de rendu"""
+        self._restart_lock = asyncio.Lock()
+        await self._start_pool()
+
+    async def _start_pool(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Pas de fork : un pool recréé en service hériterait des sockets des
+        # connexions ouvertes, que writer.close() ne fermerait plus côté client
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        ready = context.Queue()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                            initializer=_init_service_worker,
+                                            initargs=(self.config_path, ready))
+        # Une tâche par processus : le pool les démarre tous immédiatement
+        warmups = [loop.run_in_executor(self.executor, _worker_pid) for _ in range(self.workers)]
+        deadline = time.monotonic() + DELAI_PRECHAUFFAGE_S
+        waiting = self.workers
+        while waiting:
+            try:
+                await loop.run_in_executor(None, ready.get, True, 0.5)
+                waiting -= 1
+            except queue.Empty:
+                failed = [warmup for warmup in warmups if warmup.done() and warmup.exception()]
+                if failed:
+                    raise RuntimeError("Échec du préchauffage des processus de rendu") \
+                        from failed[0].exception()
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Préchauffage des processus de rendu trop long")
+        await asyncio.gather(*warmups)
+        self.ready = True
+
+    def close(self) -> None:
+        self.ready = False
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Remplace un pool cassé (une seule fois si plusieurs rendus l'ont constaté)"""
+        async with self._restart_lock:
+            if self.executor is not broken:
+                return
+            self.ready = False
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool_restarts += 1
+            await self._start_pool()
+
+    async def _render_in_pool(self, client: ClientData, results, params_dict: Dict[str, Any],
+                              conseils: List[str], variante: str) -> Tuple[bytes, float]:
+        """Rend une fiche dans le pool ; relance une fois après la mort d'un processus"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self.executor
+            try:
+                return await loop.run_in_executor(executor, _render_in_worker, client, results,
+                                                  params_dict, conseils, variante)
+            except BrokenProcessPool:
+                if attempt:
+                    raise
+                await self._restart_pool(executor)
+
+    def parse_payload(self, body: bytes) -> Tuple[ClientData, NutritionParams, str]:
+        """
+        Valide le corps d'une requête POST /fiches
+
+        Raises:
+            HTTPError: JSON illisible, champ manquant ou hors limites (400)
+        """
+        try:
+            payload = json.loads(body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise HTTPError(400, f"JSON invalide: {exc}")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Le corps doit être un objet JSON")
+        client_raw = payload.get("client")
+        params_raw = payload.get("params") or {}
+        if not isinstance(client_raw, dict) or not isinstance(params_raw, dict):
+            raise HTTPError(400, "'client' (objet) est obligatoire, 'params' doit être un objet")
+        variante = payload.get("variante", "sublime")
+        if variante not in VARIANTES_SERVICE:
+            raise HTTPError(400, f"Variante inconnue: {variante}")
+        try:
+            client, params = parse_row({**client_raw, **params_raw}, self.defaults)
+        except ValueError as exc:
+            raise HTTPError(400, str(exc))
+        return client, params, variante
+
+    async def render(self, client: ClientData, params: NutritionParams,
+                     variante: str) -> Tuple[bytes, bool]:
+        """
+        Calcule puis rend une fiche (ou rejoint un rendu identique en cours)
+
+        Returns:
+            Tuple (PDF, True si la requête a rejoint un rendu en cours)
+
+        Raises:
+            HTTPError: Service non prêt (503) ou trop de rendus en cours (429)
+        """
+        if not self.ready:
+            raise HTTPError(503, "Service en cours de démarrage")
+        key = (astuple(client), astuple(params), variante)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            pdf_bytes, _ = await asyncio.shield(future)
+            return pdf_bytes, True
+        if len(self._inflight) >= self.max_pending:
+            self.rejected += 1
+            raise HTTPError(429, f"{len(self._inflight)} fiches déjà en cours, réessayez dans un instant",
+                            {"Retry-After": "1"})
+
+        results = self.calculator.calculate_complete_nutrition(client, params)
+        objectif_type = self.calculator.get_objectif_description(params.deficit_surplus_kcal)
+        conseils = self.calculator.get_conseils_nutritionnels(client, results, objectif_type)
+
+        future = asyncio.ensure_future(self._render_in_pool(client, results, params.to_dict(),
+                                                            conseils, variante))
+        self._inflight[key] = future
+        try:
+            pdf_bytes, duration_s = await asyncio.shield(future)
+        finally:
+            del self._inflight[key]
+        self.rendered += 1
+        self.render_latency.record(duration_s * 1000)
+        return pdf_bytes, False
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": len(self._inflight),
+            "rendered": self.rendered,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "pool_restarts": self.pool_restarts,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "latency": self.latency.to_dict(),
+            "render_latency": self.render_latency.to_dict(),
+        }
+
+    # ------------------------------------------------------------------
+    # HTTP/1.1 minimal (connexions persistantes, corps par Content-Length)
+    # ------------------------------------------------------------------
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), DELAI_INACTIVITE_S)
+                except HTTPError as exc:
+                    await self._send_error(writer, exc, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._dispatch(writer, method, path, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Lit une requête ; None si le client a fermé la connexion"""
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise HTTPError(400, "Ligne de requête invalide")
+        method, path, _ = parts
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Content-Length invalide")
+        if length > TAILLE_MAX_REQUETE:
+            raise HTTPError(413, f"Corps limité à {TAILLE_MAX_REQUETE} octets")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path.split("?", 1)[0], headers, body
+
+    async def _dispatch(self, writer: asyncio.StreamWriter, method: str, path: str,
+                        body: bytes, keep_alive: bool) -> None:
+        if path == "/fiches":
+            if method != "POST":
+                await self._send_error(writer, HTTPError(405, "Méthode non autorisée"), keep_alive)
+                return
+            start = time.perf_counter()
+            try:
+                client, params, variante = self.parse_payload(body)
+                pdf_bytes, coalesced = await self.render(client, params, variante)
+            except HTTPError as exc:
+                status = await self._send_error(writer, exc, keep_alive)
+            except Exception as exc:
+                status = await self._send_error(writer, HTTPError(500, f"Erreur de rendu: {exc}"),
+                                                keep_alive)
+            else:
+                status = await self._send(writer, 200, pdf_bytes, "application/pdf", keep_alive, {
+                    "Content-Disposition": content_disposition(client),
+                    "X-Coalesced": "1" if coalesced else "0",
+                })
+                self.latency.record((time.perf_counter() - start) * 1000)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        elif path in ("/metrics", "/health") and method == "GET":
+            data = self.metrics() if path == "/metrics" else {
+                "status": "ok" if self.ready else "starting", "workers": self.workers,
+            }
+            await self._send_json(writer, 200 if self.ready else 503, data, keep_alive)
+        elif path in ("/metrics", "/health"):
+            await self._send_error(writer, HTTPError(405, "Méthode non autorisée"), keep_alive)
+        else:
+            await self._send_error(writer, HTTPError(404, f"Ressource inconnue: {path}"), keep_alive)
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, body: bytes,
+                    content_type: str, keep_alive: bool,
+                    headers: Optional[Dict[str, str]] = None) -> int:
+        lines = [
+            f"HTTP/1.1 {status} {_STATUTS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        return status
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, data: Any,
+                         keep_alive: bool, headers: Optional[Dict[str, str]] = None) -> int:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        return await self._send(writer, status, body, "application/json; charset=utf-8",
+                                keep_alive, headers)
+
+    async def _send_error(self, writer: asyncio.StreamWriter, error: HTTPError,
+                          keep_alive: bool) -> int:
+        return await self._send_json(writer, error.status, {"error": error.message},
+                                     keep_alive, error.headers)
+
+
+async def serve(service: RenderService, host: str = "127.0.0.1", port: int = 8765) -> None:
+    """Préchauffe le service puis répond aux requêtes jusqu'à l'annulation"""
+    started = time.perf_counter()
+    await service.start()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Service prêt en {time.perf_counter() - started:.1f}s sur http://{address[0]}:{address[1]} "
+          f"({service.workers} processus, {service.max_pending} rendus en cours au maximum)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
@@ -45,6 +45,50 @@ def test_calculations():
     print(f"Hydratation: {results.hydratation_ml} ml/jour")
     print("Calculs OK")
 
+def test_calculation_cache():
+    """Test de la mémoïsation des calculs (clés figées, LRU, résultats immuables)"""
+    print("\n=== Test du cache des calculs ===")
+
+    from dataclasses import FrozenInstanceError
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import CalculationCache, NutritionCalculator
+
+    cache = CalculationCache(max_entries=2)
+    calculator = NutritionCalculator(cache)
+    client = ClientData(nom="Dupont", prenom="Jean", age=35, taille_cm=180, poids_kg=80.0)
+    params = NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)
+
+    results = calculator.calculate_complete_nutrition(client, params)
+    assert calculator.calculate_complete_nutrition(client, params) is results
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # Instantané des entrées : modifier le client donne un nouveau calcul
+    client.poids_kg = 90.0
+    heavier = calculator.calculate_complete_nutrition(client, params)
+    assert heavier is not results and heavier.bmr > results.bmr
+    uncached = NutritionCalculator(CalculationCache(enabled=False))
+    assert heavier == uncached.calculate_complete_nutrition(client, params)
+
+    # Les entrées partagées ne peuvent pas être modifiées
+    def set_macro():
+        results.macros_pourcentages["proteines"] = 0
+
+    for mutate in (lambda: setattr(results, "bmr", 0), set_macro):
+        try:
+            mutate()
+            assert False, "Résultat en cache modifiable"
+        except (FrozenInstanceError, TypeError):
+            pass
+    assert results.to_dict()["macros_pourcentages"] == dict(results.macros_pourcentages)
+
+    # LRU borné
+    client.poids_kg = 100.0
+    calculator.calculate_complete_nutrition(client, params)
+    assert cache.stats() == {"hits": 1, "misses": 3, "evictions": 1, "size": 2}
+
+    print("Cache des calculs OK")
+
+
 def test_pdf_generation():
     """Test de génération PDF"""
     print("\n=== Test de génération PDF ===")
@@ -103,6 +147,1200 @@ def test_pdf_generation():
         import traceback
         traceback.print_exc()
 
+def test_batch_calculations():
+    """Test du calcul vectorisé contre le calcul scalaire"""
+    print("\n=== Test des calculs vectorisés ===")
+
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.batch_calculations import BatchNutritionCalculator
+
+    clients = [
+        ClientData("Dupont", "Marie", 28, 165, 60.0, "female"),
+        ClientData("Martin", "Paul", 45, 182, 91.35, "male", 22.5),
+        ClientData("Durand", "Lea", 19, 158, 47.25, "female", 18.0),
+    ]
+    params = [
+        NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0),
+        NutritionParams("katch_mcardle", 1.725, 250, 2.2, 0.8),
+        NutritionParams("harris_benedict", 1.375, -1000, 3.9, 1.95),
+    ]
+
+    calculator = NutritionCalculator()
+    batch = BatchNutritionCalculator().calculate_roster(clients, params)
+
+    for i, (client, param) in enumerate(zip(clients, params)):
+        assert batch.row(i) == calculator.calculate_complete_nutrition(client, param)
+
+    # Katch-McArdle sans % de graisse : ligne invalide au lieu d'une exception
+    sans_graisse = BatchNutritionCalculator().calculate_roster(
+        clients[:1], [NutritionParams("katch_mcardle", 1.55, 0, 1.8, 1.0)]
+    )
+    assert not sans_graisse.valide[0]
+    print(f"{len(batch)} clients calculés, identiques au calcul scalaire")
+    print("Calculs vectorisés OK")
+
+def test_weight_simulation():
+    """Test de la projection du poids (métabolisme recalculé, adaptation)"""
+    print("\n=== Test de la projection du poids ===")
+
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.weight_simulation import WeightSimulator
+
+    client = ClientData(nom="Dupont", prenom="Jean", age=35, taille_cm=180, poids_kg=90.0)
+    params = NutritionParams("mifflin_st_jeor", 1.55, -500, 1.8, 1.0)
+    weights = WeightSimulator().simulate_client(client, params.to_dict(), 26).row(0)
+
+    # Semaine 1 : même valeur que l'ancienne droite déficit x 7 / 7700
+    assert len(weights) == 27
+    assert abs(weights[1] - (90.0 - 500 * 7 / 7700)) < 1e-9
+
+    # Référence : BMR recalculé avec le poids de chaque semaine
+    calculator = NutritionCalculator()
+    intake = calculator.calculate_bmr(client, "mifflin_st_jeor") * 1.55 - 500
+    weight = 90.0
+    for week in range(1, 27):
+        current = ClientData(nom="Dupont", prenom="Jean", age=35, taille_cm=180, poids_kg=weight)
+        bmr = calculator.calculate_bmr(current, "mifflin_st_jeor")
+        weight += (intake - bmr * 1.55) * 7 / 7700
+        assert abs(weights[week] - weight) < 1e-6
+    assert weights[26] - 90.0 > 26 * (-500 * 7 / 7700)  # La perte ralentit
+
+    # L'adaptation métabolique réduit encore la variation
+    adapted = WeightSimulator(adaptation=0.2).simulate_client(client, params.to_dict(), 26)
+    assert adapted.row(0)[26] > weights[26]
+
+    # Katch-McArdle sans % de graisse : trajectoire non calculable
+    katch = NutritionParams("katch_mcardle", 1.55, -500, 1.8, 1.0).to_dict()
+    try:
+        WeightSimulator().simulate_client(client, katch).row(0)
+        assert False, "Projection Katch-McArdle sans % de graisse"
+    except ValueError:
+        pass
+
+    # Effectif complet : mêmes trajectoires que client par client
+    clients = [client, ClientData("Martin", "Anne", 28, 165, 62.0, "female", 27.0)]
+    roster_params = [params, NutritionParams("katch_mcardle", 1.375, 300, 1.8, 1.0)]
+    roster = WeightSimulator().simulate_roster(clients, roster_params, 26)
+    for index, (c, p) in enumerate(zip(clients, roster_params)):
+        single = WeightSimulator().simulate_client(c, p.to_dict(), 26)
+        assert roster.row(index) == single.row(0)
+    assert roster.kg_par_semaine[1] > 0 and abs(roster.bilan_kcal[0, 0] + 500) < 1e-6
+
+    print("Projection du poids OK")
+
+
+def test_chart_cache():
+    """Test du cache de graphiques (mémoire LRU + disque)"""
+    print("\n=== Test du cache de graphiques ===")
+
+    import tempfile
+    from nutrition_generator.core.chart_cache import ChartCache
+
+    renders = []
+
+    def render():
+        renders.append(1)
+        return b"x" * 400
+
+    with tempfile.TemporaryDirectory() as disk_dir:
+        cache = ChartCache(memory_budget_bytes=1000, disk_dir=disk_dir)
+        cache.get_or_render("pie", (480, 540, 1200), render)
+        cache.get_or_render("pie", (480.0, 540.0, 1200.0), render)
+        assert len(renders) == 1 and cache.stats()["memory_hits"] == 1
+
+        # Budget de 1000 octets : la 3e image évince la plus ancienne
+        cache.get_or_render("pie", (1, 2, 3), render)
+        cache.get_or_render("pie", (4, 5, 6), render)
+        assert cache.stats()["memory_bytes"] <= 1000
+
+        # Un nouveau cache relit le disque sans recalculer
+        other = ChartCache(memory_budget_bytes=1000, disk_dir=disk_dir)
+        other.get_or_render("pie", (480, 540, 1200), render)
+        assert len(renders) == 3 and other.stats()["disk_hits"] == 1
+
+        # Budget disque de 1000 octets : les images les moins récemment lues sont supprimées
+        small = ChartCache(memory_budget_bytes=1000, disk_dir=disk_dir, disk_budget_bytes=1000)
+        for i in range(5):
+            small.put(small.make_key("pie", (i,)), b"y" * 400)
+        on_disk = [os.path.join(root, name) for root, _, names in os.walk(disk_dir) for name in names]
+        assert sum(os.path.getsize(path) for path in on_disk) <= 1000
+        assert small.stats()["disk_evictions"] > 0
+
+        # Graphique propre à un client : mémoire seulement
+        small.get_or_render("weight", (1, 2, 3), render, persist=False)
+        assert not os.path.exists(small._disk_path(small.make_key("weight", (1, 2, 3))))
+
+    print(f"Compteurs: {cache.stats()}")
+    print("Cache de graphiques OK")
+
+def test_roster_reading():
+    """Test de la lecture en flux des listes de clients (CSV et JSON lignes)"""
+    print("\n=== Test de la lecture des listes de clients ===")
+
+    import tempfile
+    from nutrition_generator.core.roster import iter_roster
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, "clients.csv")
+        with open(csv_path, "w", encoding="utf-8") as handler:
+            handler.write("prenom,nom,age,taille_cm,poids_kg,facteur_activite\n")
+            handler.write("Jean,Dupont,30,180,80,1.4\n")
+            handler.write("Trop,Jeune,5,180,80,\n")
+
+        rows = list(iter_roster(csv_path))
+        assert rows[0].ok and rows[0].params.facteur_activite == 1.4
+        assert rows[0].params.formule_metabolisme == "mifflin_st_jeor"
+        assert not rows[1].ok and rows[1].line == 3 and rows[1].error_fields == ("age",)
+
+        jsonl_path = os.path.join(tmp_dir, "clients.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as handler:
+            handler.write('{"id": "a1", "prenom": "Marie", "nom": "Curie", "age": 45, '
+                          '"taille_cm": 165, "poids_kg": 60, "sexe": "female"}\n')
+            handler.write("pas du json\n")
+
+        rows = list(iter_roster(jsonl_path))
+        assert rows[0].ok and rows[0].row_id == "a1" and rows[0].client.sexe == "female"
+        assert not rows[1].ok
+
+    print("Lecture des listes OK")
+
+class _CrashingClient:
+    """Tue le processus de rendu qui reçoit la fiche (simule un plantage natif)"""
+
+    def __reduce__(self):
+        return (os._exit, (1,))
+
+def test_batch_rendering():
+    """Test du rendu en lot (bilan, fichiers .part, processus de rendu perdu)"""
+    print("\n=== Test du rendu en lot ===")
+
+    import tempfile
+    from nutrition_generator.cli import BatchRun
+    from nutrition_generator.core.batch_renderer import BatchPDFRenderer, RenderJob
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.fiche_index import FicheIndex
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        roster_path = os.path.join(tmp_dir, "clients.csv")
+        with open(roster_path, "w", encoding="utf-8") as handler:
+            handler.write("id,prenom,nom,age,taille_cm,poids_kg\n")
+            handler.write("c1,Jean,Dupont,30,180,80\n")
+            handler.write("c2,Trop,Jeune,5,180,80\n")
+            handler.write("c3,Marie,Curie,45,165,60\n")
+            handler.write("c1,Paul,Martin,40,175,70\n")  # id déjà utilisé
+        output_dir = os.path.join(tmp_dir, "fiches")
+        os.makedirs(output_dir)
+        stale = os.path.join(output_dir, "Fiche_c9_Ancien_Lot.pdf.part")  # Exécution interrompue
+        open(stale, "wb").close()
+
+        index = FicheIndex(":memory:")
+        summary = BatchRun(roster_path, output_dir, workers=2, progress_every=0, index=index).run()
+        assert (summary["rows"], summary["rendered"], summary["invalid"], summary["failed"]) == (4, 2, 2, 0)
+        assert [row["id"] for row in summary["invalid_rows"]] == ["c2", "c1"] and not summary["aborted"]
+        assert summary["invalid_by_field"]["id"] == 1
+        assert sorted(os.listdir(output_dir)) == ["Fiche_c1_Jean_Dupont.pdf", "Fiche_c3_Marie_Curie.pdf"]
+        # Chaque fiche indexée sous son propre client
+        assert sorted((f.client_nom, f.nom_fichier) for f in index.query()) == [
+            ("Curie", "Fiche_c3_Marie_Curie.pdf"), ("Dupont", "Fiche_c1_Jean_Dupont.pdf")
+        ]
+
+        # Processus tué : la fiche en cours échoue, le pool est recréé pour la suivante
+        client = ClientData(nom="Dupont", prenom="Jean", age=30, taille_cm=180, poids_kg=80.0)
+        params = NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)
+        jobs = [RenderJob(_CrashingClient(), params, os.path.join(output_dir, "plante.pdf"), "plante"),
+                RenderJob(client, params, os.path.join(output_dir, "suivante.pdf"), "suivante")]
+        renderer = BatchPDFRenderer(max_workers=1, max_in_flight=1)
+        results = {result.job_id: result for result in renderer.iter_render(jobs)}
+        assert not results["plante"].ok and "interrompu" in results["plante"].error
+        assert results["suivante"].ok and renderer.pool_restarts == 1
+
+        # Sans redémarrage autorisé, le lot s'arrête sans consommer la suite
+        renderer = BatchPDFRenderer(max_workers=1, max_in_flight=1, max_pool_restarts=0)
+        results = list(renderer.iter_render(iter(jobs)))
+        assert [result.job_id for result in results] == ["plante"] and renderer.aborted
+        assert not any(name.endswith(".part") for name in os.listdir(output_dir))
+
+    print("Rendu en lot OK")
+
+
+def test_fiche_index():
+    """Test de l'index SQLite des fiches (écriture, pages, filtres, synchronisation)"""
+    print("\n=== Test de l'index des fiches ===")
+
+    import tempfile
+    from datetime import datetime, timedelta
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.fiche_index import FicheIndex
+
+    calculator = NutritionCalculator()
+    index = FicheIndex(":memory:")
+    start = datetime(2025, 1, 1)
+
+    entries = []
+    for i in range(120):
+        client = ClientData(nom=f"Nom{i % 10}", prenom="Client", age=30, taille_cm=175, poids_kg=75.0)
+        params = NutritionParams("mifflin_st_jeor", 1.55, -300 if i % 2 else 0, 1.8, 1.0)
+        results = calculator.calculate_complete_nutrition(client, params)
+        entries.append((f"/tmp/fiches/fiche_{i}.pdf", client, params, results, start + timedelta(days=i)))
+    index.record_fiches(entries)
+
+    assert index.count() == 120
+    page = index.query(limit=50, offset=50)
+    assert len(page) == 50 and page[0].date_creation == start + timedelta(days=69)
+    assert index.count(objectif_type="perte") == 60
+    assert index.count(client="Nom3") == 12
+    assert index.count(date_from=start + timedelta(days=100)) == 20
+    assert index.get_details("/tmp/fiches/fiche_1.pdf")["params"]["deficit_surplus_kcal"] == -300
+
+    # Homonymes : un client par fiche sans identifiant, partagé avec identifiant
+    def client_rows(nom):
+        return index._conn.execute("SELECT poids_kg FROM clients WHERE nom = ? ORDER BY id", (nom,)).fetchall()
+
+    for poids, chemin in ((60.0, "/tmp/fiches/martin_a.pdf"), (95.0, "/tmp/fiches/martin_b.pdf")):
+        homonyme = ClientData(nom="Martin", prenom="Paul", age=30, taille_cm=175, poids_kg=poids)
+        index.record_fiche(chemin, homonyme, params, calculator.calculate_complete_nutrition(homonyme, params))
+    assert [row["poids_kg"] for row in client_rows("Martin")] == [60.0, 95.0]
+    for poids in (80.0, 78.0):
+        suivi = ClientData(nom="Suivi", prenom="Paul", age=30, taille_cm=175, poids_kg=poids)
+        index.record_fiche(f"/tmp/fiches/suivi_{poids}.pdf", suivi, params,
+                           calculator.calculate_complete_nutrition(suivi, params), identifiant="c42")
+    assert [row["poids_kg"] for row in client_rows("Suivi")] == [78.0]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        open(os.path.join(tmp_dir, "Fiche_Premium_Marie_Dupont_20250926.pdf"), "wb").close()
+        assert index.sync_directory(tmp_dir) == {"added": 1, "removed": 0}
+        fiche = index.query(dossier=tmp_dir)[0]
+        assert (fiche.client_prenom, fiche.client_nom) == ("Marie", "Dupont")
+        # Objectif inconnu : exclue des filtres par objectif
+        assert fiche.objectif_type is None and index.count(objectif_type="maintenance") == 60
+
+        os.remove(fiche.chemin)
+        assert index.sync_directory(tmp_dir) == {"added": 0, "removed": 1}
+        assert not client_rows("Dupont")
+
+    print("Index des fiches OK")
+
+
+def test_fiche_list():
+    """Test de la liste virtualisée des fiches (pages par clé, recherche, surveillance)"""
+    print("\n=== Test de la liste des fiches ===")
+
+    import tempfile
+    import threading
+    from datetime import datetime, timedelta
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.fiche_index import FicheIndex
+    from nutrition_generator.gui.fiche_list import FicheListModel, period_start
+
+    calculator = NutritionCalculator()
+    index = FicheIndex(":memory:")
+    start = datetime(2025, 1, 1)
+    params = NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)
+    entries = []
+    for i in range(120):
+        client = ClientData(nom=f"Nom{i % 10}", prenom=f"Client{i % 3}", age=30, taille_cm=175, poids_kg=75.0)
+        results = calculator.calculate_complete_nutrition(client, params)
+        entries.append((f"/tmp/fiches/fiche_{i}.pdf", client, params, results, start + timedelta(days=i)))
+    index.record_fiches(entries)
+
+    # La page suivante lue par clé est identique à la lecture par offset
+    first_page = index.query(limit=50)
+    assert index.query(limit=50, after=first_page[-1].sort_key) == index.query(limit=50, offset=50)
+
+    # Recherche par début de nom / prénom, chaque mot filtrant
+    assert index.count(client="nom3") == 12
+    assert index.count(client="client1 nom3") == 4
+    assert index.count(client="om3") == 0
+
+    model = FicheListModel(index, page_size=10)
+    window = model.rows(0, 25)
+    assert [f.chemin for f in window] == [f.chemin for f in first_page[:25]]
+    assert model.queries == 3
+    assert model.rows(20, 5) == window[20:]  # Pages en cache
+    assert model.rows(30, 5)[0] == first_page[30] and model.queries == 4  # Page suivante par clé
+    assert model.rows(118, 10) == index.query(limit=2, offset=118)
+
+    model.set_filters(client="Nom3", date_from=start + timedelta(days=100))
+    assert model.total == 2 and all(f.client_nom == "Nom3" for f in model.rows(0, 5))
+    assert period_start(7, datetime(2025, 3, 10, 15, 30)) == datetime(2025, 3, 3)
+    assert period_start(None) is None
+
+    # Fiche enregistrée puis fichier ajouté dans le dossier surveillé
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model = FicheListModel(index, directory=tmp_dir)
+        assert model.poll() is False and model.total == 120
+        index.record_fiche("/tmp/fiches/nouvelle.pdf", entries[0][1], params, entries[0][3],
+                           start + timedelta(days=200))
+        assert model.poll() is True and model.rows(0, 1)[0].nom_fichier == "nouvelle.pdf"
+        assert model.poll() is False
+
+        open(os.path.join(tmp_dir, "Fiche_Premium_Marie_Dupont_20250926.pdf"), "wb").close()
+        assert model.poll() is True and model.total == 122
+
+        # Synchronisation laissée à un autre thread : poll(sync=False) ne lit que l'index
+        os.utime(tmp_dir, ns=(0, 0))
+        open(os.path.join(tmp_dir, "Fiche_Premium_Paul_Martin_20250927.pdf"), "wb").close()
+        assert model.directory_changed() is True and model.directory_changed() is False
+        assert model.poll(sync=False) is False
+        worker = threading.Thread(target=index.sync_directory, args=(tmp_dir,))
+        worker.start()
+        worker.join()
+        assert model.poll(sync=False) is True and model.total == 123
+
+    print("Liste des fiches OK")
+
+
+def test_recalc_scheduler():
+    """Test du recalcul différé (regroupement des frappes, résultats périmés)"""
+    print("\n=== Test du recalcul différé ===")
+
+    import threading
+    import time
+    from nutrition_generator.gui.recalc_scheduler import RecalcScheduler
+
+    class FakeTk:
+        """Boucle d'événements minimale : les délais sont déclenchés à la main"""
+
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.timers = {}
+            self.queue = []
+            self.next_id = 0
+
+        def after(self, ms, callback):
+            with self.lock:
+                self.next_id += 1
+                if ms == 0:
+                    self.queue.append(callback)
+                else:
+                    self.timers[self.next_id] = callback
+                return self.next_id
+
+        def after_cancel(self, after_id):
+            with self.lock:
+                self.timers.pop(after_id, None)
+
+        def after_idle(self, callback):
+            self.after(0, callback)
+
+        def fire_timers(self):
+            with self.lock:
+                timers, self.timers = list(self.timers.values()), {}
+            for callback in timers:
+                callback()
+
+        def pump(self, until, timeout=5.0):
+            deadline = time.time() + timeout
+            while not until() and time.time() < deadline:
+                with self.lock:
+                    queue, self.queue = self.queue, []
+                for callback in queue:
+                    callback()
+                time.sleep(0.001)
+
+    tk = FakeTk()
+    inputs = {"value": 0}
+    release = threading.Event()
+    release.set()
+    displayed = []
+
+    def compute(snapshot):
+        release.wait()
+        return snapshot * 10
+
+    scheduler = RecalcScheduler(tk, lambda: inputs["value"], compute,
+                                lambda snapshot, result: displayed.append(result))
+
+    # Une rafale de 5 frappes -> un seul calcul
+    for value in range(1, 6):
+        inputs["value"] = value
+        scheduler.request()
+    assert len(tk.timers) == 1
+    tk.fire_timers()
+    tk.pump(lambda: scheduler.latency.samples)
+    assert displayed == [50] and scheduler.computations == 1
+
+    # Frappe pendant un calcul : l'ancien résultat est ignoré, le nouveau affiché
+    release.clear()
+    inputs["value"] = 7
+    scheduler.request()
+    tk.fire_timers()
+    inputs["value"] = 8
+    scheduler.request()
+    tk.fire_timers()
+    release.set()
+    tk.pump(lambda: len(displayed) == 2)
+    assert displayed == [50, 80] and scheduler.stale_dropped == 1
+
+    print(f"Métriques: {scheduler.metrics()}")
+    print("Recalcul différé OK")
+
+
+def test_generation_queue():
+    """Test de la file de génération (entrées figées, regroupement, annulation)"""
+    print("\n=== Test de la file de génération ===")
+
+    import queue
+    import threading
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.gui.generation_queue import (
+        ANNULEE, TERMINEE, GenerationQueue, GenerationRequest, QueueFullError
+    )
+
+    class FakeTk:
+        """after(0) depuis n'importe quel thread ; pump() exécute les rappels"""
+
+        def __init__(self):
+            self.callbacks = queue.Queue()
+
+        def after(self, ms, callback):
+            self.callbacks.put(callback)
+
+        def pump(self, until, timeout=5.0):
+            while not until():
+                self.callbacks.get(timeout=timeout)()
+
+    client = ClientData(nom="Dupont", prenom="Marie", age=28, taille_cm=165, poids_kg=60.0, sexe="female")
+    params = NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)
+    results = NutritionCalculator().calculate_complete_nutrition(client, params)
+
+    request = GenerationRequest.snapshot(client, results, params, ["Boire"])
+    client.poids_kg = 99.0  # Modification du formulaire pendant le rendu
+    assert request.client.poids_kg == 60.0 and request.client is not client
+
+    release = threading.Event()
+    runs = []
+
+    def run(request, report):
+        runs.append(request)
+        for step in range(100):
+            report("mise_en_page", step / 100)
+            release.wait(0.01)
+        return "fiche.pdf"
+
+    tk = FakeTk()
+    generation_queue = GenerationQueue(tk, run, max_workers=1, max_pending=2)
+    events = []
+    job = generation_queue.submit(request, on_progress=lambda j: events.append(j.progress),
+                                  on_done=lambda j: events.append(j.result))
+    assert generation_queue.submit(request) is job and generation_queue.coalesced == 1
+
+    other = GenerationRequest.snapshot(client, results, params)
+    cancelled = generation_queue.submit(other, on_cancel=lambda j: events.append("annulee"))
+    try:
+        generation_queue.submit(GenerationRequest.snapshot(client, results, params, variante="clean"))
+        assert False, "File pleine acceptée"
+    except QueueFullError:
+        pass
+
+    generation_queue.cancel(cancelled)
+    release.set()
+    tk.pump(lambda: job.done and cancelled.done and "annulee" in events)
+    assert job.state == TERMINEE and "fiche.pdf" in events and cancelled.state == ANNULEE
+    assert 1 < len([e for e in events if isinstance(e, float)]) <= 21  # Progression regroupée
+    assert len(runs) == 1 and generation_queue.metrics()["active"] == 0
+    generation_queue.shutdown()
+
+    print(f"Métriques: {generation_queue.metrics()}")
+    print("File de génération OK")
+
+
+def test_render_to_bytes():
+    """Test du rendu en mémoire (octets, flux, document multi-clients)"""
+    print("\n=== Test du rendu en mémoire ===")
+
+    import io
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.pdf_generator import PDFGenerator
+    from nutrition_generator.core.pdf_stream import LazyStory
+
+    generator = PDFGenerator()
+    generator.chart_backend = "vector"  # Plus rapide, même structure
+    calculator = NutritionCalculator()
+    client = ClientData(nom="Dupont", prenom="Marie", age=28, taille_cm=165, poids_kg=60.0, sexe="female")
+    params = NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)
+    results = calculator.calculate_complete_nutrition(client, params)
+
+    pdf_bytes = generator.render_to_bytes(client, results, params.to_dict())
+    assert pdf_bytes.startswith(b"%PDF") and pdf_bytes.rstrip().endswith(b"%%EOF")
+
+    stream = io.BytesIO()
+    generator.render_clients_to_stream(
+        ((client, results, params.to_dict(), None) for _ in range(2)), stream
+    )
+    assert stream.getvalue().count(b"/Type /Page\n") == 6
+    assert stream.getvalue().count(b"/Title (Marie Dupont)") == 2  # Un signet par client
+
+    # Toutes les variantes proposées par binder ont une mise en page ("premium" -> sublime)
+    import tempfile
+    from nutrition_generator.cli import main
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        roster_path = os.path.join(tmp_dir, "clients.csv")
+        with open(roster_path, "w", encoding="utf-8") as handler:
+            handler.write("prenom,nom,age,taille_cm,poids_kg\nMarie,Dupont,28,165,60\n")
+        binder_path = os.path.join(tmp_dir, "classeur.pdf")
+        assert main(["binder", roster_path, "-o", binder_path, "--variante", "premium"]) == 0
+        with open(binder_path, "rb") as handler:
+            assert handler.read().count(b"/Type /Page\n") == 3
+
+    # La story paresseuse ne tire que ce dont la mise en page a besoin
+    story = LazyStory(iter(range(100)), lookahead=4)
+    assert len(story) == 4 and story.pulled == 4
+    del story[0]
+    assert story[0] == 1 and story.pulled == 4
+
+    print(f"Fiche en mémoire: {len(pdf_bytes)} octets")
+    print("Rendu en mémoire OK")
+
+
+def test_render_context():
+    """Test du contexte de rendu partagé entre générateurs"""
+    print("\n=== Test du contexte de rendu partagé ===")
+
+    import os
+    import shutil
+    import tempfile
+    from nutrition_generator.core.pdf_generator import PDFGenerator
+
+    first, second = PDFGenerator(), PDFGenerator()
+    assert first.render_context is second.render_context
+    assert first.styles["section_title"] is second.styles["section_title"]
+    assert first.render_context.logo_png is None or first.render_context.logo_png.startswith(b"\x89PNG")
+
+    # Une instance peut redéfinir un style sans toucher au contexte partagé
+    first.styles["section_title"] = None
+    assert second.styles["section_title"] is not None
+
+    # Une config modifiée sur disque reconstruit le contexte
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "settings.json")
+        shutil.copy(os.path.join("nutrition_generator", "config", "settings.json"), config_path)
+        context = PDFGenerator(config_path).render_context
+        assert PDFGenerator(config_path).render_context is context
+
+        stats = os.stat(config_path)
+        os.utime(config_path, ns=(stats.st_atime_ns, stats.st_mtime_ns + 1_000_000_000))
+        assert PDFGenerator(config_path).render_context is not context
+
+    print("Contexte de rendu partagé OK")
+
+
+def test_layouts():
+    """Test des mises en page déclaratives (layouts.json compilé en plan)"""
+    print("\n=== Test des mises en page déclaratives ===")
+
+    import json
+    import os
+    import shutil
+    import tempfile
+    import threading
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.layouts import validate_layouts
+    from nutrition_generator.core.pdf_generator import PDFGenerator
+
+    generator = PDFGenerator()
+    client = ClientData(nom="Dupont", prenom="Marie", age=28, taille_cm=165, poids_kg=60.0, sexe="female")
+    params = NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)
+    results = NutritionCalculator().calculate_complete_nutrition(client, params)
+
+    # Plan compilé une fois par thread ; éléments fixes copiés à chaque fiche
+    plan = generator._render_plan("sublime")
+    assert generator._render_plan("sublime") is plan and plan.sections == 6
+    first = generator._build_story(plan, client, results, params.to_dict())
+    second = generator._build_story(plan, client, results, params.to_dict())
+    assert len(first) == len(second) and not set(map(id, first)) & set(map(id, second))
+    other = []
+    thread = threading.Thread(target=lambda: other.append(generator._render_plan("sublime")))
+    thread.start()
+    thread.join()
+    assert other[0] is not plan
+
+    # Le logo de l'en-tête fixe reste compté dans le bilan de chaque fiche
+    generator.render_to_bytes(client, results, params.to_dict(), variante="sublime")
+    assert generator.last_image_report.images == plan.images.images + 2
+
+    for invalid in ({}, {"x": {"title": "X", "pages": [[{"spacer": 1, "text": "a"}]]}},
+                    {"x": {"title": "X", "pages": [[{"section": "f", "inputs": ["poids"]}]]}}):
+        try:
+            validate_layouts(invalid)
+            assert False, f"Description acceptée: {invalid}"
+        except ValueError:
+            pass
+
+    # layouts.json à côté d'une config : nouvelle variante sans code
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "settings.json")
+        shutil.copy(os.path.join("nutrition_generator", "config", "settings.json"), config_path)
+        with open(os.path.join(tmp, "layouts.json"), "w", encoding="utf-8") as handler:
+            json.dump({"resume": {"title": "Résumé", "pages": [[
+                {"static": "create_perfect_header"},
+                {"title": "Objectif sur {weeks} semaines", "style": "section_title"},
+                {"section": "create_cards_with_colored_borders", "inputs": ["results", "params"]},
+            ]]}}, handler)
+        custom = PDFGenerator(config_path)
+        pdf = custom.render_to_bytes(client, results, params.to_dict(), variante="resume")
+        assert pdf.count(b"/Type /Page\n") == 1
+        fixed = custom._render_plan("resume").steps[0].fixed
+        assert fixed[-1].getPlainText() == "Objectif sur 12 semaines"
+        try:
+            custom.render_to_bytes(client, results, params.to_dict(), variante="sublime")
+            assert False, "Variante absente de layouts.json"
+        except ValueError:
+            pass
+
+    print("Mises en page déclaratives OK")
+
+
+def test_section_cache():
+    """Test du re-rendu incrémental (sections reprises selon leurs dépendances)"""
+    print("\n=== Test du cache des sections ===")
+
+    import threading
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.image_pipeline import ImageReport
+    from nutrition_generator.core.pdf_generator import PDFGenerator
+    from nutrition_generator.core.section_cache import SectionCache
+
+    generator = PDFGenerator()
+    generator.section_cache = SectionCache()
+    calculator = NutritionCalculator()
+    client = ClientData(nom="Dupont", prenom="Jean", age=35, taille_cm=180, poids_kg=90.0)
+
+    def render(ratio, poids=90.0):
+        client.poids_kg = poids
+        params = NutritionParams("mifflin_st_jeor", 1.55, -500, ratio, 1.0)
+        results = calculator.calculate_complete_nutrition(client, params)
+        pdf = generator.render_to_bytes(client, results, params.to_dict(), variante="enriched")
+        return pdf, generator.last_section_report, generator.last_image_report
+
+    first, report, images = render(1.8)
+    assert len(report.recomputed) == 10 and not report.reused
+
+    # Seul le ratio de protéines change : macros et conseils reconstruits
+    _, report, _ = render(2.2)
+    assert report.recomputed == ["create_macro_section_side_by_side", "add_macro_breakdown",
+                                 "create_conseils_with_colored_borders"]
+    assert "_create_weight_chart_with_grid" in report.reused and "create_enriched_profile" in report.reused
+
+    # Mêmes entrées : tout est repris, fiche et bilan des images identiques
+    again, report, again_images = render(1.8)
+    assert not report.recomputed and again_images == images
+    assert len(again) == len(first)
+
+    # Le poids change la projection, donc la courbe
+    _, report, _ = render(1.8, poids=85.0)
+    assert "_create_weight_chart_with_grid" in report.recomputed
+
+    # Une section empruntée par un rendu en cours n'est pas partagée avec un autre thread
+    cache = SectionCache(max_entries=1)
+    entry = cache.store("a", ["x"], ImageReport())
+    other = []
+    thread = threading.Thread(target=lambda: other.append(cache.acquire("a")))
+    thread.start()
+    thread.join()
+    assert other == [None] and cache.stats()["busy"] == 1
+    cache.store("b", ["y"], ImageReport())  # Plein, mais "a" est empruntée : pas d'éviction
+    assert cache.stats()["size"] == 2
+    cache.release([entry])
+    assert cache.stats()["size"] == 1 and cache.acquire("b") is not None
+
+    print("Cache des sections OK")
+
+
+def test_benchmark_baseline():
+    """Test de la comparaison des benchmarks à leur référence"""
+    print("\n=== Test des références de benchmarks ===")
+
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(
+        "bench_suite", os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "suite.py")
+    )
+    suite = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(suite)
+
+    # Effectif reproductible
+    first, second = suite.roster_columns(50), suite.roster_columns(50)
+    assert (first["poids_kg"] == second["poids_kg"]).all()
+    assert len(list(suite.iter_clients(first, limit=5))) == 5
+
+    baseline = {"cases": {"pdf.sublime": {"wall_s": 1.0, "cpu_s": 1.0, "peak_rss_kb": 100000, "output_bytes": 5000}}}
+    report = {"cases": {"pdf.sublime": {"wall_s": 1.1, "cpu_s": 1.6, "peak_rss_kb": 100000, "output_bytes": 5000}}}
+    regressions = suite.compare_reports(report, baseline, threshold=0.25)
+    assert len(regressions) == 1 and "cpu_s" in regressions[0]
+
+    print("Références de benchmarks OK")
+
+
+def test_tracing():
+    """Test de l'instrumentation du rendu PDF"""
+    print("\n=== Test du traçage du rendu ===")
+
+    import json
+    import tempfile
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.pdf_generator import PDFGenerator
+    from nutrition_generator.core.tracing import Tracer
+    # Le générateur importe core.tracing (chemin du paquet) : même traceur que lui
+    from core.tracing import get_tracer
+
+    # Désactivé : span partagé, rien n'est enregistré
+    idle = Tracer()
+    assert idle.span("a") is idle.span("b")
+    with idle.span("a"):
+        pass
+    assert idle.records == []
+
+    generator = PDFGenerator()
+    generator.chart_backend = "vector"
+    client = ClientData(nom="Dupont", prenom="Marie", age=28, taille_cm=165, poids_kg=60.0, sexe="female")
+    params = NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)
+    results = NutritionCalculator().calculate_complete_nutrition(client, params)
+
+    tracer = get_tracer()
+    tracer.clear()
+    tracer.enable()
+    try:
+        generator.render_to_bytes(client, results, params.to_dict(), variante="clean")
+    finally:
+        tracer.disable()
+
+    summary = tracer.summary()
+    for name in ("render", "_build_story", "create_clean_profile_table", "doc_build", "layout_Table"):
+        assert name in summary, name
+    render = next(record for record in tracer.records if record["name"] == "render")
+    assert render["depth"] == 0 and render["args"]["variante"] == "clean"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        chrome_path = os.path.join(tmp, "trace.json")
+        count = tracer.export_chrome_trace(chrome_path)
+        with open(chrome_path, encoding="utf-8") as handler:
+            events = json.load(handler)["traceEvents"]
+        assert len(events) == count and all(event["ph"] == "X" for event in events)
+    tracer.clear()
+
+    # Commande trace sur chaque variante proposée ("premium" -> mise en page sublime)
+    from nutrition_generator.cli import main
+    with tempfile.TemporaryDirectory() as tmp:
+        roster_path = os.path.join(tmp, "clients.csv")
+        with open(roster_path, "w", encoding="utf-8") as handler:
+            handler.write("prenom,nom,age,taille_cm,poids_kg\nMarie,Dupont,28,165,60\n")
+        assert main(["trace", roster_path, "--variante", "premium", "-o", tmp]) == 0
+        with open(os.path.join(tmp, "trace.jsonl"), encoding="utf-8") as handler:
+            names = {json.loads(line)["name"] for line in handler}
+        assert {"render", "_build_story", "create_cards_with_colored_borders"} <= names
+    tracer.clear()
+
+    print(f"{count} spans pour une fiche")
+    print("Traçage du rendu OK")
+
+
+def test_whatif_grid():
+    """Test de la grille « et si » des curseurs activité / objectif"""
+    print("\n=== Test de la grille « et si » ===")
+
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.whatif_grid import WhatIfGrid
+
+    calculator = NutritionCalculator()
+    client = ClientData(nom="Dupont", prenom="Marie", age=28, taille_cm=165, poids_kg=60.0, sexe="female")
+    params = NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)
+    grid = WhatIfGrid(client, params)
+
+    # Crans des curseurs : identique au calcul scalaire
+    for activite in (1.2, 1.4, 1.55, 2.0):
+        for deficit in (-1000, -500, -300, 0, 450):
+            expected = calculator.calculate_complete_nutrition(
+                client, NutritionParams("mifflin_st_jeor", activite, deficit, 1.8, 1.0)
+            )
+            assert grid.lookup(activite, deficit) == expected
+
+    # Entre deux nœuds : interpolation
+    expected = calculator.calculate_complete_nutrition(
+        client, NutritionParams("mifflin_st_jeor", 1.4612, -312, 1.8, 1.0)
+    )
+    assert abs(grid.lookup(1.4612, -312).calories_objectif - expected.calories_objectif) <= 2
+
+    # Invalidation : client ou macros modifiés
+    assert grid.matches(client, NutritionParams("mifflin_st_jeor", 1.9, 500, 1.8, 1.0))
+    assert not grid.matches(client, NutritionParams("mifflin_st_jeor", 1.55, -300, 2.0, 1.0))
+    heavier = ClientData(nom="Dupont", prenom="Marie", age=28, taille_cm=165, poids_kg=61.0, sexe="female")
+    assert not grid.matches(heavier, params)
+
+    table = grid.sensitivity_table("calories_objectif", [1.2, 1.55], [-500, 0, 500])
+    assert len(table) == 2 and table[0][2] - table[0][0] == 1000
+
+    print(f"Grille {grid.shape[0]}x{grid.shape[1]} OK")
+
+
+def test_bulk_validation():
+    """Test de la table de règles et de la validation en masse"""
+    print("\n=== Test de la validation en masse ===")
+
+    import numpy as np
+    from nutrition_generator.core.data_models import ClientData
+    from nutrition_generator.core.validation import (
+        CLIENT_RULES, RULES_BY_FIELD, validate_columns, validate_record
+    )
+
+    # Saisie texte (formulaire) : vide autorisé, valeur illisible, hors limites
+    age = RULES_BY_FIELD["age"]
+    assert age.parse("") == (None, None)
+    assert age.parse("abc") == (None, "L'âge doit être un nombre entier")
+    assert age.parse("5") == (5, "L'âge doit être entre 10 et 100 ans")
+    assert RULES_BY_FIELD["pourcentage_graisse"].parse("12.5") == (12.5, None)
+
+    columns = {
+        "age": np.array([30, 5, np.nan, 45.9]),
+        "taille_cm": np.array([180, 180, 180, 260]),
+        "poids_kg": np.array([80, 80, 80, 80]),
+        "sexe": np.array(["male", "femme", "female", "female"]),
+        "pourcentage_graisse": np.array([np.nan, 12, 60, np.nan]),
+    }
+    validation = validate_columns(columns, CLIENT_RULES)
+    assert list(validation.invalid) == [False, True, True, True]
+    assert list(validation.invalid_rows()) == [1, 2, 3]
+    assert validation.counts() == {"age": 2, "taille_cm": 1, "sexe": 1, "pourcentage_graisse": 1}
+    assert validation.row_errors(2) == ["L'âge doit être un nombre entier",
+                                        "Le % de graisse doit être entre 3 et 50%"]
+
+    # Mêmes messages que la validation des modèles
+    client = ClientData(nom="A", prenom="B", age=30, taille_cm=180, poids_kg=80.0)
+    client.age, client.sexe = 5, "femme"
+    assert validate_record(CLIENT_RULES, client) == validation.row_errors(1)
+    try:
+        ClientData(nom="A", prenom="B", age=30, taille_cm=180, poids_kg=80.0, pourcentage_graisse=60)
+        assert False, "Pourcentage de graisse hors limites accepté"
+    except ValueError as exc:
+        assert str(exc) == "Le % de graisse doit être entre 3 et 50%"
+
+    print(f"{len(validation.invalid_rows())} lignes invalides détectées OK")
+
+
+def test_image_pipeline():
+    """Test de la réduction des images à leur taille de placement"""
+    print("\n=== Test du pipeline d'images ===")
+
+    import io
+    import numpy as np
+    from PIL import Image as PILImage
+    from nutrition_generator.core.image_pipeline import ImagePipeline, ImageReport
+
+    def png(image):
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    pipeline = ImagePipeline(target_dpi=150)
+    # Aplats opaques en RGBA (cas des graphiques matplotlib) : PNG réduit, sans alpha
+    chart = PILImage.new("RGBA", (1500, 1500), (255, 255, 255, 255))
+    chart.paste((231, 76, 60, 255), (200, 200, 900, 900))
+    chart_png = png(chart)
+    prepared = pipeline.prepare(chart_png, 72, 72)  # 1 pouce à 150 dpi
+    assert prepared.format == "png" and prepared.size_px == (150, 150)
+    assert PILImage.open(io.BytesIO(prepared.data)).mode == "P"
+    assert pipeline.prepare(chart_png, 72, 72) is prepared  # Cache par empreinte
+
+    # Contenu photographique : JPEG
+    noise = np.random.default_rng(0).integers(0, 256, (300, 300, 3), dtype=np.uint8)
+    photo = pipeline.prepare(png(PILImage.fromarray(noise)), 144, 144)
+    assert photo.format == "jpeg" and photo.saved_bytes > 0
+
+    # Jamais agrandie ni alourdie
+    tiny = png(PILImage.new("RGB", (10, 10), "white"))
+    assert pipeline.prepare(tiny, 500, 500).data == tiny
+
+    report = ImageReport()
+    report.add(prepared)
+    report.add(photo)
+    assert report.to_dict()["bytes_saved"] == prepared.saved_bytes + photo.saved_bytes > 0
+
+    print(f"Image réduite: {len(chart_png)} -> {len(prepared.data)} octets OK")
+
+
+def test_thumbnails():
+    """Test des vignettes (mise en page relevée, cache disque, chargement en arrière-plan)"""
+    print("\n=== Test des vignettes ===")
+
+    import io
+    import queue
+    import tempfile
+    from PIL import Image as PILImage
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.pdf_generator import PDFGenerator
+    from nutrition_generator.core.thumbnails import LARGEUR_VIGNETTE, FirstPageLayout, render_thumbnail
+    from nutrition_generator.core.thumbnail_cache import ThumbnailCache, file_digest, pdf_digest
+    from nutrition_generator.gui.thumbnail_loader import ThumbnailLoader
+
+    client = ClientData(nom="Dupont", prenom="Marie", age=28, taille_cm=165, poids_kg=60.0, sexe="female")
+    params = NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)
+    results = NutritionCalculator().calculate_complete_nutrition(client, params)
+
+    # Vignette dessinée à partir de la mise en page de la page 1, sans relire le PDF
+    first_page = FirstPageLayout()
+    stream = io.BytesIO()
+    PDFGenerator().render_to_stream(client, results, params.to_dict(), stream, first_page=first_page)
+    assert first_page.placements and first_page.page_size[1] > first_page.page_size[0]
+    thumbnail = PILImage.open(io.BytesIO(render_thumbnail(first_page))).convert("RGB")
+    assert thumbnail.size == (LARGEUR_VIGNETTE, round(LARGEUR_VIGNETTE * 842 / 595))
+    assert thumbnail.getpixel((LARGEUR_VIGNETTE // 2, 15)) != (255, 255, 255)  # Bandeau d'en-tête
+
+    class FakeTk:
+        def __init__(self):
+            self.callbacks = queue.Queue()
+
+        def after(self, ms, callback):
+            self.callbacks.put(callback)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "fiche.pdf")
+        with open(pdf_path, "wb") as handler:
+            handler.write(stream.getvalue())
+        assert file_digest(pdf_path) == pdf_digest(stream.getvalue())
+
+        cache = ThumbnailCache(os.path.join(tmp_dir, "vignettes"), max_bytes=4000)
+        cache.put(file_digest(pdf_path), b"x" * 1500)
+        assert cache.get(file_digest(pdf_path)) == b"x" * 1500
+        for key in ("a", "b", "c"):
+            cache.put(key, b"y" * 1500)
+        assert cache.evictions >= 1 and cache.get(file_digest(pdf_path)) is None  # Plus ancienne évincée
+
+        cache.put(file_digest(pdf_path), render_thumbnail(first_page))
+        tk = FakeTk()
+        loader = ThumbnailLoader(tk, cache)
+        loaded = []
+        assert loader.request(pdf_path, lambda path, image: loaded.append(image)) is False
+        tk.callbacks.get(timeout=5)()  # Lecture terminée, rappel dans le thread « Tk »
+        assert loaded[0].size == thumbnail.size
+        assert loader.request(pdf_path, lambda path, image: loaded.append(image)) is True  # En mémoire
+        missing_path = os.path.join(tmp_dir, "absente.pdf")
+        assert loader.request(missing_path, lambda path, image: loaded.append(image)) is False
+        tk.callbacks.get(timeout=5)()
+        assert loaded[-1] is None
+        loader.shutdown()
+
+    print("Vignettes OK")
+
+
+def test_render_service():
+    """Test du service HTTP (préchauffage, regroupement, 429, histogramme)"""
+    print("\n=== Test du service HTTP ===")
+
+    import asyncio
+    import json
+    from concurrent.futures.process import BrokenProcessPool
+    from nutrition_generator.server import LatencyHistogram, RenderService
+
+    histogram = LatencyHistogram((10, 100))
+    for duration_ms in (5, 50, 60, 500):
+        histogram.record(duration_ms)
+    summary = histogram.to_dict()
+    assert [bucket["count"] for bucket in summary["buckets"]] == [1, 3, 4]
+    assert summary["p50_ms"] == 100 and summary["p99_ms"] == 500
+
+    def payload(age, **client):
+        return json.dumps({
+            "client": {"nom": "Dupont", "prenom": "Jean", "age": age, "taille_cm": 180,
+                       "poids_kg": 80, **client},
+            "params": {"deficit_surplus_kcal": -300},
+        }).encode()
+
+    async def post(port, body, path="/fiches"):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, content = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), head.decode("latin-1"), content
+
+    async def scenario():
+        service = RenderService(workers=1, max_pending=1)
+        await service.start()  # Préchauffage : les requêtes ne paient pas les imports
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, _, content = await post(port, payload(35))
+            assert status == 200 and content.startswith(b"%PDF")
+
+            # Demandes identiques simultanées : un seul rendu
+            responses = await asyncio.gather(*(post(port, payload(40)) for _ in range(3)))
+            assert [status for status, _, _ in responses] == [200, 200, 200]
+            assert sum("X-Coalesced: 1" in head for _, head, _ in responses) == 2
+
+            # Au-delà de max_pending rendus distincts : 429
+            responses = await asyncio.gather(post(port, payload(41)), post(port, payload(42)))
+            assert sorted(status for status, _, _ in responses) == [200, 429]
+            assert any("Retry-After: 1" in head for _, head, _ in responses)
+
+            # Nom hors latin-1 : nom ASCII et nom UTF-8 (RFC 5987)
+            status, head, content = await post(port, payload(36, nom="Wałęsa", prenom="Łukasz"))
+            assert status == 200 and content.startswith(b"%PDF")
+            assert 'filename="Fiche_Lukasz_Walesa.pdf"' in head
+            assert "filename*=UTF-8''Fiche_%C5%81ukasz_Wa%C5%82%C4%99sa.pdf" in head
+
+            # Processus de rendu tué : pool recréé et rendu relancé
+            try:
+                await asyncio.wrap_future(service.executor.submit(os._exit, 1))
+            except BrokenProcessPool:
+                pass
+            status, _, content = await post(port, payload(37))
+            assert status == 200 and content.startswith(b"%PDF")
+
+            status, _, content = await post(port, payload(5))
+            assert status == 400 and "âge" in json.loads(content)["error"]
+            status, _, _ = await post(port, b"{", "/inconnu")
+            assert status == 404
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+        return service.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["rendered"] == 5 and metrics["coalesced"] == 2 and metrics["rejected"] == 1
+    assert metrics["latency"]["count"] == 7 and metrics["statuses"]["429"] == 1
+    assert metrics["pool_restarts"] == 1 and "500" not in metrics["statuses"]
+    print(f"Rendu p50 <= {metrics['render_latency']['p50_ms']} ms")
+    print("Service HTTP OK")
+
+
+def test_columnar_store():
+    """Test des enregistrements compacts et du stockage en colonnes"""
+    print("\n=== Test du stockage en colonnes ===")
+
+    import pickle
+    from dataclasses import FrozenInstanceError
+    # Mêmes modules que ceux importés par columnar (comparaison des dataclasses)
+    from core.data_models import ClientData, NutritionParams
+    from core.calculations import NutritionCalculator
+    from core.columnar import ClientColumns, ClientRecord, ParamsRecord, ResultsRecord
+
+    calculator = NutritionCalculator()
+    rows = [
+        (ClientData(nom="Dupont", prenom="Élodie", age=28, taille_cm=165, poids_kg=60.25, sexe="female"),
+         NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)),
+        (ClientData(nom="Martin", prenom="Paul", age=45, taille_cm=182, poids_kg=91.0, sexe="male",
+                    pourcentage_graisse=18.5),
+         NutritionParams("katch_mcardle", 1.725, 250, 2.2, 0.8)),
+    ]
+
+    # Enregistrements : conversions sans perte, immuables, sans __dict__
+    client, params = rows[1]
+    results = calculator.calculate_complete_nutrition(client, params)
+    record = ResultsRecord.from_dataclass(results)
+    assert ClientRecord.from_dataclass(client).to_dataclass() == client
+    assert ParamsRecord.from_dataclass(params).to_dict() == params.to_dict()
+    assert record.to_dataclass() == results and record.to_dict() == results.to_dict()
+    assert record.macros_pourcentages is record.macros_pourcentages
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert not hasattr(record, "__dict__")
+    try:
+        record.bmr = 0
+        assert False, "Enregistrement modifiable"
+    except FrozenInstanceError:
+        pass
+
+    # Colonnes : vues de ligne et calcul vectorisé
+    store = ClientColumns.from_rows(rows)
+    assert len(store) == 2
+    for index, (client, params) in enumerate(rows):
+        assert store.client(index) == client and store.params(index) == params
+    assert store[0].prenom == "Élodie" and store[0].pourcentage_graisse is None
+    assert list(store.column("taille_cm")) == [165, 182]
+
+    store.calculate()
+    for index, (client, params) in enumerate(rows):
+        assert store[index].results() == calculator.calculate_complete_nutrition(client, params)
+    assert store.nbytes() < 200
+
+    print(f"Stockage en colonnes: {store.nbytes()} octets pour 2 clients")
+    print("Stockage en colonnes OK")
+
+
+def test_lazy_imports():
+    """Test du démarrage rapide (pile PDF non chargée avec l'interface)"""
+    print("\n=== Test des imports différés ===")
+
+    import subprocess
+    root = os.path.dirname(os.path.abspath(__file__))
+    code = (
+        "import sys; import nutrition_generator; "
+        "sys.path.insert(0, 'nutrition_generator'); "
+        "import gui.main_window; "
+        "print(','.join(m for m in ('matplotlib', 'reportlab') if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=root,
+        capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert output == "", f"Modules chargés au démarrage: {output}"
+
+    print("Imports différés OK")
+
+
+def test_generation_success_path():
+    """Test du bouton « Générer PDF » jusqu'à l'actualisation de la liste (sans affichage)"""
+    print("\n=== Test du chemin de génération réussie ===")
+
+    import types
+    from nutrition_generator.core.fiche_index import FicheIndex
+    from nutrition_generator.core.section_cache import SectionReport
+    from nutrition_generator.gui.components.pdf_preview import PDFPreview
+    from nutrition_generator.gui.fiche_list import FicheListModel
+    from nutrition_generator.gui.main_window import MainWindow
+
+    # Composants réduits aux attributs lus par les méthodes testées
+    index = FicheIndex(":memory:")
+    events = []
+    preview = types.SimpleNamespace(
+        current_results=object(),
+        fiche_list=FicheListModel(index),
+        thumbnail_loader=types.SimpleNamespace(forget=lambda: events.append("forget")),
+        _show_fiches=lambda: events.append("show"),
+        finish_generation=lambda job=None: events.append("finish"),
+    )
+    preview.refresh_fiches = lambda: PDFPreview.refresh_fiches(preview)
+    window = types.SimpleNamespace(
+        pdf_preview=preview,
+        _update_status=events.append,
+        _show_info=lambda message: events.append("info"),
+    )
+
+    def generate():
+        # Fin du rendu : fiche enregistrée dans l'index puis rappel de succès
+        index.record_fiche("/tmp/fiches/nouvelle.pdf", *sample_fiche())
+        MainWindow._on_pdf_generated_success(window, "nouvelle.pdf", SectionReport(["a"], ["b"]))
+        return True
+
+    preview.on_generate_pdf = generate
+    PDFPreview._on_generate_pdf(preview)
+    assert events == ["finish", "PDF généré avec succès: nouvelle.pdf (1/2 sections recalculées)",
+                      "forget", "show", "info"]
+    assert preview.fiche_list.rows(0, 1)[0].nom_fichier == "nouvelle.pdf"
+
+    print("Chemin de génération réussie OK")
+
+def sample_fiche():
+    """Client, paramètres et résultats d'une fiche de test"""
+    from nutrition_generator.core.calculations import NutritionCalculator
+    from nutrition_generator.core.data_models import ClientData, NutritionParams
+
+    client = ClientData(nom="Dupont", prenom="Jean", age=30, taille_cm=180, poids_kg=80.0)
+    params = NutritionParams("mifflin_st_jeor", 1.55, -300, 1.8, 1.0)
+    return client, params, NutritionCalculator().calculate_complete_nutrition(client, params)
+
 def test_gui_imports():
     """Test des imports GUI"""
     print("\n=== Test des imports GUI ===")
@@ -136,7 +1374,31 @@ if __name__ == "__main__":
 
     try:
         test_calculations()
+        test_calculation_cache()
         test_pdf_generation()
+        test_batch_calculations()
+        test_weight_simulation()
+        test_chart_cache()
+        test_roster_reading()
+        test_batch_rendering()
+        test_fiche_index()
+        test_fiche_list()
+        test_recalc_scheduler()
+        test_generation_queue()
+        test_render_to_bytes()
+        test_render_context()
+        test_layouts()
+        test_section_cache()
+        test_benchmark_baseline()
+        test_tracing()
+        test_whatif_grid()
+        test_columnar_store()
+        test_bulk_validation()
+        test_image_pipeline()
+        test_thumbnails()
+        test_render_service()
+        test_lazy_imports()
+        test_generation_success_path()
         test_gui_imports()
 
         print("\nTous les tests sont réussis!")